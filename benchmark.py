@@ -0,0 +1,530 @@
+import io
+import os
+import sys
+import gzip
+import json
+import time
+import random
+import argparse
+import requests
+import tempfile
+import threading
+import contextlib
+import tracemalloc
+import http.server
+import multiprocessing
+import concurrent.futures
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+import main
+
+
+CASES: list[str] = ['Nominative', 'Genitive', 'Dative', 'Accusative', 'Ablative', 'Vocative']
+STEM_LETTERS: str = 'abcdefgilmnopqrstuv'
+GLOSSES: list[str] = ['war', 'peace', 'rose', 'garland', 'road', 'journey', 'water', 'fire', 'house', 'home', 'law', 'right', 'king', 'queen', 'light', 'shadow', 'sea', 'shore', 'word', 'speech']
+
+
+def generate_corpus(corpus_dir: str, word_count: int = 500, dictionaries: list[int] = [1, 2, 4], seed: int = 0) -> int:
+    """
+    Generate a synthetic corpus of browse, definition and paradigm pages shaped like the website.
+
+    Words appear in one or two dictionaries and some share a paradigm page, so
+    link de-duplication and paradigm memoization are exercised as on the website.
+
+    :param corpus_dir: The directory to write the corpus to.
+    :param word_count: The number of definition pages to generate.
+    :param dictionaries: The dictionary numbers to generate browse pages for.
+    :param seed: The seed of the random generator.
+    :return int: The number of pages in the corpus.
+    """
+
+    generator: random.Random = random.Random(seed)
+    pages: dict = {}
+    browse_links: dict = {(letter, dictionary): [] for letter in 'abcdefghijklmnopqrstuvwxyz' for dictionary in dictionaries}
+
+    for i in range(word_count):
+        stem: str = ''.join(generator.choice(STEM_LETTERS) for _ in range(generator.randint(3, 8)))
+        orthography_id: int = 5000 + i - (i % 5 == 4)
+        link: str = f'definition.php?p1={1000 + i}&p2={stem}a'
+
+        for dictionary in generator.sample(dictionaries, generator.randint(1, min(2, len(dictionaries)))):
+            browse_links[(stem[0], dictionary)].append(link)
+
+        definitions: str = ''.join(f'<li>\n\t[{j + 1}] (of {generator.choice(GLOSSES)}) {", ".join(generator.sample(GLOSSES, generator.randint(1, 4)))}-  </li>' for j in range(generator.randint(1, 4)))
+
+        pages[main.canonical_link(link)] = f'''<html><head><title>{stem}a</title></head><body><div class="nav"><ul>{"<li><a href='index.php'>nav</a></li>" * 30}</ul></div>
+<div class="flash_card_title">\n\t{stem.upper()}A, {stem.upper()}AE, -{stem.upper()}- </div>
+<ol class="flash_card_english_def">{definitions}</ol>
+<div class="main_identification">Orthography ID = {orthography_id}</div><p>{"lorem ipsum " * 150}</p></body></html>'''
+
+        rows: str = '<tr><td></td><td>Singular</td><td>Plural</td></tr>' + ''.join(f'<tr><td>{case}</td><td>{stem}{ending}</td><td>{stem}{plural_ending}</td></tr>' for case, ending, plural_ending in zip(CASES, ['a', 'ae', 'ae', 'am', 'ā', 'a'], ['ae', 'ārum', 'īs', 'ās', 'īs', 'ae']))
+
+        pages[main.canonical_link(f'paradigms.php?p1={orthography_id}')] = f'<html><body><div>{"lorem ipsum " * 80}</div><div class="noun_paradigm_container"><table>{rows}</table></div></body></html>'
+
+    for (letter, dictionary), links in browse_links.items():
+        anchors: str = ''.join(f'<a href="{link}">{link}</a>' for link in links)
+        pages[main.canonical_link(f'browse_latin.php?p1={letter}&p2={dictionary}')] = f'<html><body><a href="index.php">home</a>{anchors}</body></html>'
+
+    write_corpus(corpus_dir, pages)
+
+    return len(pages)
+
+
+def record_corpus(url: str, corpus_dir: str, letters: str, dictionaries: list[int], limit: int, max_retry_count: int = 3) -> int:
+    """
+    Record a corpus of browse pages and some of their definition and paradigm pages from the website.
+
+    Links past the limit are not recorded and are served as 404 by the fixture server.
+
+    :param url: The base URL of the website.
+    :param corpus_dir: The directory to write the corpus to.
+    :param letters: The letters to record the browse pages of.
+    :param dictionaries: The dictionary numbers to record the browse pages of.
+    :param limit: The maximum number of definition pages to record.
+    :param max_retry_count: The maximum number of times to retry a connection before giving up.
+    :return int: The number of pages in the corpus.
+    """
+
+    session: requests.Session = requests.Session()
+    pages: dict = {}
+    word_links: list[str] = []
+
+    def record(link: str) -> str | None:
+        response: requests.Response | None = main.attempt_connection(f'{url}{link}', session, max_retry_count)
+
+        if response is None or response.status_code != 200:
+            return None
+
+        pages[link] = response.text
+
+        return response.text
+
+    for letter in letters:
+        for dictionary in dictionaries:
+            html: str | None = record(main.canonical_link(f'browse_latin.php?p1={letter}&p2={dictionary}'))
+
+            if html is not None:
+                word_links += [main.canonical_link(link) for link in main.parse_word_links(html)]
+
+    for link in list(dict.fromkeys(word_links))[:limit]:
+        html: str | None = record(link)
+
+        if html is None:
+            continue
+
+        orthography_id: int | None = main.parse_word_info(html).get('orthography_id')
+
+        if orthography_id is not None and main.canonical_link(f'paradigms.php?p1={orthography_id}') not in pages:
+            record(main.canonical_link(f'paradigms.php?p1={orthography_id}'))
+
+    write_corpus(corpus_dir, pages)
+
+    return len(pages)
+
+
+def write_corpus(corpus_dir: str, pages: dict) -> None:
+    """
+    Write a corpus as one file per page and an index.json mapping every canonical link to its file.
+
+    :param corpus_dir: The directory to write the corpus to.
+    :param pages: A dictionary mapping every canonical link to the HTML of its page.
+    :return None:
+    """
+
+    os.makedirs(os.path.join(corpus_dir, 'pages'), exist_ok=True)
+
+    index: dict = {}
+
+    for i, (link, html) in enumerate(sorted(pages.items())):
+        file_name: str = f'{i:06d}.html'
+        index[link] = file_name
+
+        with open(os.path.join(corpus_dir, 'pages', file_name), 'w', encoding='utf-8') as file:
+            file.write(html)
+
+    with open(os.path.join(corpus_dir, 'index.json'), 'w') as file:
+        json.dump(index, file, indent=4)
+
+
+def load_corpus(corpus_dir: str) -> dict:
+    """
+    Load a corpus written by write_corpus.
+
+    :param corpus_dir: The directory of the corpus.
+    :return dict: A dictionary mapping every canonical link to the HTML of its page.
+    """
+
+    with open(os.path.join(corpus_dir, 'index.json'), 'r') as file:
+        index: dict = json.load(file)
+
+    pages: dict = {}
+
+    for link, file_name in index.items():
+        with open(os.path.join(corpus_dir, 'pages', file_name), 'r', encoding='utf-8') as file:
+            pages[link] = file.read()
+
+    return pages
+
+
+class FixtureServer:
+    """
+    Serve a corpus over HTTP on localhost as a stand-in for the website, with injected latency and errors.
+
+    Pages are gzip-compressed for clients that accept it, like the website does.
+    """
+
+    def __init__(self, pages: dict, latency: float = 0.0, error_rate: float = 0.0, seed: int = 0) -> None:
+        """
+        Initialize the fixture server.
+
+        :param pages: A dictionary mapping every canonical link to the HTML of its page.
+        :param latency: The number of seconds to wait before every response.
+        :param error_rate: The fraction of requests answered with a 503 instead of the page.
+        :param seed: The seed of the error injection.
+        :return None:
+        """
+
+        self.pages: dict = {link: html.encode('utf-8') for link, html in pages.items()}
+        self.compressed_pages: dict = {}
+        self.latency: float = latency
+        self.error_rate: float = error_rate
+        self.status_counts: dict = {}
+
+        self._random: random.Random = random.Random(seed)
+        self._lock: threading.Lock = threading.Lock()
+        self._server: http.server.ThreadingHTTPServer = http.server.ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self._server.server_address[1]}/'
+
+    def _handler(self):
+        fixture: FixtureServer = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version: str = 'HTTP/1.1'
+            # headers and body are written separately, which stalls keep-alive connections on delayed ACKs otherwise
+            disable_nagle_algorithm: bool = True
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                if fixture.latency > 0:
+                    time.sleep(fixture.latency)
+
+                with fixture._lock:
+                    failed: bool = fixture._random.random() < fixture.error_rate
+
+                body: bytes | None = fixture.pages.get(main.canonical_link(self.path))
+                status: int = 503 if failed else 404 if body is None else 200
+
+                with fixture._lock:
+                    fixture.status_counts[status] = fixture.status_counts.get(status, 0) + 1
+
+                compressed: bool = status == 200 and 'gzip' in self.headers.get('Accept-Encoding', '')
+
+                if status != 200:
+                    body = b''
+                elif compressed:
+                    link: str = main.canonical_link(self.path)
+
+                    if link not in fixture.compressed_pages:
+                        fixture.compressed_pages[link] = gzip.compress(body)
+
+                    body = fixture.compressed_pages[link]
+
+                self.send_response(status)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+
+                if compressed:
+                    self.send_header('Content-Encoding', 'gzip')
+
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def start(self) -> None:
+        """
+        Start serving in a background thread.
+
+        :return None:
+        """
+
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop serving.
+
+        :return None:
+        """
+
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def run_pipeline(url: str, options: dict) -> dict:
+    """
+    Run the full main() pipeline against a fixture server and measure it, in a fresh process.
+
+    :param url: The URL of the fixture server.
+    :param options: Keyword arguments passed on to main.main.
+    :return dict: The wall time in seconds, the peak resident memory in megabytes and the number of exported words.
+    """
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        output_dir: str = os.path.join(work_dir, 'data')
+        os.makedirs(output_dir)
+
+        start_time: float = time.perf_counter()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            main.main(url, {'ALL': options.pop('dictionaries')}, 'ALL', output_dir, package=False, compression_type='zip', ssl_slowdown=False, cache_links=False, use_cache=False, **options)
+
+        seconds: float = time.perf_counter() - start_time
+        word_count: int = len(os.listdir(os.path.join(output_dir, 'dictionary')))
+
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak_rss: float | None = None
+
+    if resource is not None:
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1048576 if sys.platform == 'darwin' else 1024)
+
+    return {'seconds': seconds, 'peak_rss_mb': peak_rss, 'words': word_count}
+
+
+def benchmark_pipeline(pages: dict, latency: float, error_rate: float, options: dict) -> dict:
+    """
+    Benchmark the full pipeline against a fixture server serving a corpus.
+
+    :param pages: The corpus returned by load_corpus.
+    :param latency: The number of seconds the fixture server waits before every response.
+    :param error_rate: The fraction of requests the fixture server answers with a 503.
+    :param options: Keyword arguments passed on to main.main.
+    :return dict: The pipeline results.
+    """
+
+    server: FixtureServer = FixtureServer(pages, latency, error_rate)
+    server.start()
+
+    try:
+        with concurrent.futures.ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn')) as executor:
+            result: dict = executor.submit(run_pipeline, server.url, dict(options)).result()
+    finally:
+        server.stop()
+
+    served_pages: int = server.status_counts.get(200, 0)
+
+    return {
+        'pages': served_pages,
+        'requests': sum(server.status_counts.values()),
+        'words': result['words'],
+        'seconds': round(result['seconds'], 3),
+        'pages_per_second': round(served_pages / result['seconds'], 2),
+        'peak_rss_mb': round(result['peak_rss_mb'], 1) if result['peak_rss_mb'] is not None else None
+    }
+
+
+def time_calls(function, arguments: list[tuple], rounds: int) -> dict:
+    """
+    Time a function over a list of argument tuples and measure its peak traced memory.
+
+    :param function: The function to benchmark.
+    :param arguments: The argument tuples to call the function with.
+    :param rounds: The number of times to call the function with every argument tuple.
+    :return dict: The number of calls, the mean milliseconds per call and the peak traced memory in kilobytes.
+    """
+
+    start_time: float = time.perf_counter()
+
+    for _ in range(rounds):
+        for argument in arguments:
+            function(*argument)
+
+    seconds: float = time.perf_counter() - start_time
+
+    tracemalloc.start()
+
+    for argument in arguments:
+        function(*argument)
+
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {'calls': len(arguments), 'ms_per_call': round(seconds * 1000 / max(len(arguments) * rounds, 1), 4), 'peak_kb': round(peak / 1024, 1)}
+
+
+def benchmark_functions(pages: dict, rounds: int) -> dict:
+    """
+    Microbenchmark the page scrapers and the text cleaners on a corpus.
+
+    get_word_info and get_paradigm_info fetch from a fixture server without
+    latency, parse_word_info and parse_paradigm_info only parse, and the
+    cleaners run on the texts extracted from the definition pages.
+
+    :param pages: The corpus returned by load_corpus.
+    :param rounds: The number of times to run every benchmark over the corpus.
+    :return dict: The results of every benchmark.
+    """
+
+    definition_links: list[str] = [link for link in pages if link.startswith('definition.php')]
+    paradigm_links: list[str] = [link for link in pages if link.startswith('paradigms.php')]
+
+    title_texts: list[tuple] = []
+    definition_texts: list[tuple] = []
+
+    for link in definition_links:
+        title_text, texts, _ = main.extract_word_page(pages[link])
+
+        if title_text is not None:
+            title_texts.append((title_text,))
+
+        definition_texts += [(text.strip(),) for text in texts or []]
+
+    results: dict = {
+        'parse_word_info': time_calls(main.parse_word_info, [(pages[link],) for link in definition_links], rounds),
+        'parse_paradigm_info': time_calls(main.parse_paradigm_info, [(pages[link],) for link in paradigm_links], rounds),
+        'title_cleaner': time_calls(main.title_cleaner, title_texts, rounds * 10),
+        'definition_cleaner': time_calls(main.definition_cleaner, definition_texts, rounds * 10)
+    }
+
+    server: FixtureServer = FixtureServer(pages)
+    server.start()
+
+    try:
+        session: requests.Session = requests.Session()
+
+        results['get_word_info'] = time_calls(main.get_word_info, [(f'{server.url}{link}', session, 0) for link in definition_links], rounds)
+        results['get_paradigm_info'] = time_calls(main.get_paradigm_info, [(f'{server.url}{link}', session, 0) for link in paradigm_links], rounds)
+    finally:
+        server.stop()
+
+    return results
+
+
+def compare_baseline(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Compare benchmark results to a stored baseline.
+
+    :param results: The current benchmark results.
+    :param baseline: The baseline benchmark results.
+    :param tolerance: The fraction a metric may get worse by before it is reported.
+    :return list[str]: A description of every regression.
+    """
+
+    regressions: list[str] = []
+    higher_is_better: set = {'pages_per_second'}
+    compared: set = {'pages_per_second', 'peak_rss_mb', 'ms_per_call', 'peak_kb'}
+
+    for section in ['pipeline', 'functions']:
+        current_section: dict = results.get(section, {})
+        baseline_section: dict = baseline.get(section, {})
+
+        entries: list[tuple] = [(section, current_section, baseline_section)] if section == 'pipeline' else [(name, current_section[name], baseline_section.get(name, {})) for name in current_section]
+
+        for name, current, previous in entries:
+            for metric in compared:
+                if current.get(metric) is None or not previous.get(metric):
+                    continue
+
+                change: float = (current[metric] - previous[metric]) / previous[metric]
+
+                if metric in higher_is_better:
+                    change = -change
+
+                if change > tolerance:
+                    regressions.append(f'{name} {metric}: {previous[metric]} -> {current[metric]} ({change * 100:.0f}% worse)')
+
+    return regressions
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description='Benchmark the scraper offline against a local fixture server serving a recorded or generated corpus.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    generate_parser: argparse.ArgumentParser = subparsers.add_parser('generate', help='Generate a synthetic corpus')
+    generate_parser.add_argument('corpus_dir', help='Directory to write the corpus to')
+    generate_parser.add_argument('--words', type=int, default=500, help='Number of definition pages to generate')
+    generate_parser.add_argument('--seed', type=int, default=0, help='Seed of the random generator')
+
+    record_parser: argparse.ArgumentParser = subparsers.add_parser('record', help='Record a corpus from the website')
+    record_parser.add_argument('corpus_dir', help='Directory to write the corpus to')
+    record_parser.add_argument('--url', default='https://latinlexicon.org/', help='Base URL of the website')
+    record_parser.add_argument('--letters', default='a', help='Letters to record the browse pages of')
+    record_parser.add_argument('--limit', type=int, default=200, help='Maximum number of definition pages to record')
+
+    run_parser: argparse.ArgumentParser = subparsers.add_parser('run', help='Run the benchmarks on a corpus')
+    run_parser.add_argument('corpus_dir', help='Directory of the corpus')
+    run_parser.add_argument('--latency', type=float, default=0.05, help='Number of seconds the fixture server waits before every response')
+    run_parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests the fixture server answers with a 503')
+    run_parser.add_argument('--engine', choices=['thread', 'async'], default='thread', help='Crawl engine to benchmark')
+    run_parser.add_argument('--thread-count', type=int, default=os.cpu_count(), help='Number of threads to use for scraping')
+    run_parser.add_argument('--concurrency', type=int, default=100, help='Maximum number of requests in flight (only for async engine)')
+    run_parser.add_argument('--parse-processes', type=int, default=0, help='Number of processes to parse pages in')
+    run_parser.add_argument('--parser-backend', choices=main.PARSER_BACKENDS, default='html.parser', help='HTML parser backend')
+    run_parser.add_argument('--initial-rate', type=float, default=1000.0, help='Starting request rate in requests per second')
+    run_parser.add_argument('--rounds', type=int, default=3, help='Number of times to run every microbenchmark over the corpus')
+    run_parser.add_argument('--skip-pipeline', action='store_true', help='Only run the microbenchmarks')
+    run_parser.add_argument('--output', default=None, help='Path to write the results to (usable as a --baseline later)')
+    run_parser.add_argument('--baseline', default=None, help='Path of baseline results to check for regressions (exits with 1 on a regression)')
+    run_parser.add_argument('--tolerance', type=float, default=0.2, help='Fraction a metric may get worse by before it counts as a regression')
+
+    args = parser.parse_args()
+
+    if args.command == 'generate':
+        page_count: int = generate_corpus(args.corpus_dir, args.words, seed=args.seed)
+        print(f'Generated {page_count} pages into {args.corpus_dir}')
+        sys.exit(0)
+
+    if args.command == 'record':
+        page_count: int = record_corpus(args.url, args.corpus_dir, args.letters, [1, 2, 4], args.limit)
+        print(f'Recorded {page_count} pages into {args.corpus_dir}')
+        sys.exit(0)
+
+    pages: dict = load_corpus(args.corpus_dir)
+    results: dict = {}
+
+    if not args.skip_pipeline:
+        dictionaries: list[int] = sorted({int(link.split('p2=')[-1]) for link in pages if link.startswith('browse_latin.php')})
+        options: dict = {
+            'dictionaries': dictionaries,
+            'thread_count': args.thread_count,
+            'max_retry_count': 3,
+            'engine': args.engine,
+            'concurrency': args.concurrency,
+            'parse_processes': args.parse_processes,
+            'backend': args.parser_backend,
+            'initial_rate': args.initial_rate
+        }
+
+        results['pipeline'] = benchmark_pipeline(pages, args.latency, args.error_rate, options)
+        pipeline: dict = results['pipeline']
+
+        print(f'Pipeline: {pipeline["pages"]} pages in {pipeline["seconds"]} s | {pipeline["pages_per_second"]} pages/s | {pipeline["peak_rss_mb"]} MB peak RSS')
+
+    results['functions'] = benchmark_functions(pages, max(args.rounds, 1))
+
+    for name, function_results in results['functions'].items():
+        print(f'{name}: {function_results["ms_per_call"]:.4f} ms per call | {function_results["peak_kb"]} KB peak')
+
+    if args.output is not None:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=4)
+
+    if args.baseline is not None:
+        with open(args.baseline, 'r') as file:
+            regressions: list[str] = compare_baseline(results, json.load(file), args.tolerance)
+
+        for regression in regressions:
+            print(f'Regression: {regression}')
+
+        sys.exit(1 if regressions else 0)
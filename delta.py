@@ -0,0 +1,223 @@
+import os
+import json
+import hashlib
+import zipfile
+import argparse
+
+
+MANIFEST_NAME: str = 'manifest.json'
+DELTA_INFO_NAME: str = 'delta.json'
+
+
+def file_digest(path: str) -> str:
+    """
+    Hash the content of a file.
+
+    :param path: The path of the file.
+    :return str: The hex SHA-256 digest of the file.
+    """
+
+    digest = hashlib.sha256()
+
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1048576), b''):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def manifest_version(files: dict) -> str:
+    """
+    Identify a dictionary version by the hashes of all of its entries.
+
+    :param files: A dictionary mapping every entry path to its content hash.
+    :return str: The hex SHA-256 digest of the sorted entries.
+    """
+
+    return hashlib.sha256('\n'.join(f'{path} {files[path]}' for path in sorted(files)).encode('utf-8')).hexdigest()
+
+
+def build_manifest(output_dir: str) -> dict:
+    """
+    Hash every entry of a dictionary directory.
+
+    Entry paths are relative to the directory and use forward slashes, and the
+    manifest file itself is not an entry.
+
+    :param output_dir: The directory the dictionary was built in.
+    :return dict: The manifest, with the version and the content hash of every entry.
+    """
+
+    files: dict = {}
+
+    for dirpath, _, filenames in os.walk(output_dir):
+        for name in filenames:
+            path: str = os.path.relpath(os.path.join(dirpath, name), output_dir).replace(os.sep, '/')
+
+            if path != MANIFEST_NAME:
+                files[path] = file_digest(os.path.join(dirpath, name))
+
+    return {'version': manifest_version(files), 'files': files}
+
+
+def load_manifest(path: str) -> dict | None:
+    """
+    Load a manifest written by write_manifest.
+
+    :param path: The path of the manifest.
+    :return dict | None: The manifest, or None if there is none.
+    """
+
+    if not os.path.exists(path):
+        return None
+
+    with open(path, 'r') as file:
+        return json.load(file)
+
+
+def write_manifest(path: str, manifest: dict) -> None:
+    """
+    Write a manifest.
+
+    :param path: The path to write the manifest to.
+    :param manifest: The manifest returned by build_manifest.
+    :return None:
+    """
+
+    with open(path, 'w') as file:
+        json.dump(manifest, file, sort_keys=True)
+
+
+def diff_manifests(previous: dict, current: dict) -> dict:
+    """
+    Find the entries added, changed and removed between two dictionary versions.
+
+    :param previous: The manifest of the previous version.
+    :param current: The manifest of the current version.
+    :return dict: The delta information, with the content hash of every added and changed entry.
+    """
+
+    previous_files: dict = previous['files']
+    current_files: dict = current['files']
+
+    return {
+        'base': previous['version'],
+        'target': current['version'],
+        'added': {path: digest for path, digest in sorted(current_files.items()) if path not in previous_files},
+        'changed': {path: digest for path, digest in sorted(current_files.items()) if path in previous_files and previous_files[path] != digest},
+        'removed': sorted(path for path in previous_files if path not in current_files)
+    }
+
+
+def write_delta(file, output_dir: str, previous: dict, current: dict) -> dict:
+    """
+    Write a delta package holding the delta information and every added and changed entry.
+
+    :param file: The binary file object to write the zip package to.
+    :param output_dir: The directory the current version was built in.
+    :param previous: The manifest of the previous version.
+    :param current: The manifest of the current version.
+    :return dict: The delta information.
+    """
+
+    delta_info: dict = diff_manifests(previous, current)
+
+    with zipfile.ZipFile(file, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(DELTA_INFO_NAME, json.dumps(delta_info))
+
+        for path in list(delta_info['added']) + list(delta_info['changed']):
+            archive.write(os.path.join(output_dir, *path.split('/')), path)
+
+    return delta_info
+
+
+def apply_delta(delta_path: str, output_dir: str, force: bool = False) -> dict:
+    """
+    Update a dictionary directory to the version of a delta package.
+
+    The directory must hold the base version of the delta unless forced, and
+    the result is checked against the target version before its manifest is
+    written.
+
+    :param delta_path: The path of the delta package.
+    :param output_dir: The directory of the dictionary to update.
+    :param force: Whether to apply the delta even if the directory does not hold its base version.
+    :return dict: The delta information.
+    """
+
+    manifest: dict = build_manifest(output_dir)
+
+    with zipfile.ZipFile(delta_path, 'r') as archive:
+        delta_info: dict = json.loads(archive.read(DELTA_INFO_NAME))
+
+        if manifest['version'] == delta_info['target']:
+            return delta_info
+
+        if manifest['version'] != delta_info['base'] and not force:
+            raise ValueError(f'{output_dir} is not the base version of {delta_path} ({manifest["version"][:12]} instead of {delta_info["base"][:12]})')
+
+        for path in delta_info['removed']:
+            entry_path: str = os.path.join(output_dir, *path.split('/'))
+
+            if os.path.exists(entry_path):
+                os.remove(entry_path)
+
+            manifest['files'].pop(path, None)
+
+        for path, digest in list(delta_info['added'].items()) + list(delta_info['changed'].items()):
+            entry_path: str = os.path.join(output_dir, *path.split('/'))
+            data: bytes = archive.read(path)
+
+            if hashlib.sha256(data).hexdigest() != digest:
+                raise ValueError(f'{path} in {delta_path} is corrupted')
+
+            os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+
+            with open(entry_path, 'wb') as file:
+                file.write(data)
+
+            manifest['files'][path] = digest
+
+    manifest['version'] = manifest_version(manifest['files'])
+
+    if manifest['version'] != delta_info['target']:
+        raise ValueError(f'{output_dir} does not match the target version of {delta_path} after applying it')
+
+    write_manifest(os.path.join(output_dir, MANIFEST_NAME), manifest)
+
+    return delta_info
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description='Create and apply delta packages between dictionary versions.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    create_parser: argparse.ArgumentParser = subparsers.add_parser('create', help='Create a delta package from a previous manifest to a dictionary directory')
+    create_parser.add_argument('previous_manifest', help='Manifest of the previous version')
+    create_parser.add_argument('output_dir', help='Directory of the current version')
+    create_parser.add_argument('delta_path', help='Path of the delta package to write')
+
+    apply_parser: argparse.ArgumentParser = subparsers.add_parser('apply', help='Apply a delta package to a dictionary directory')
+    apply_parser.add_argument('delta_path', help='Path of the delta package')
+    apply_parser.add_argument('output_dir', help='Directory of the dictionary to update')
+    apply_parser.add_argument('--force', action='store_true', help='Apply the delta even if the directory does not hold its base version')
+
+    args = parser.parse_args()
+
+    if args.command == 'create':
+        previous: dict | None = load_manifest(args.previous_manifest)
+
+        if previous is None:
+            print(f'{args.previous_manifest} does not exist')
+            exit(1)
+
+        with open(args.delta_path, 'wb') as file:
+            delta_info: dict = write_delta(file, args.output_dir, previous, build_manifest(args.output_dir))
+    else:
+        try:
+            delta_info: dict = apply_delta(args.delta_path, args.output_dir, args.force)
+        except ValueError as error:
+            print(error)
+            exit(1)
+
+    print(f'{len(delta_info["added"])} added, {len(delta_info["changed"])} changed, {len(delta_info["removed"])} removed ({delta_info["base"][:12]} -> {delta_info["target"][:12]})')
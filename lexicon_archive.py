@@ -0,0 +1,233 @@
+import json
+import py7zr
+import zipfile
+import argparse
+import threading
+import collections
+
+import lexicon_pack
+
+
+HASHING_KEY_NAME: str = 'hashing_key.json'
+
+
+class LexiconArchive:
+    """
+    Read words straight from a packaged data.zip or data.7z without extracting it.
+
+    The headword index is built from the hashing_key.json member when the
+    archive is opened, and only the dictionary/ and paradigm/ members of the
+    words looked up are decompressed, behind a bounded LRU cache. Zip members
+    are read on their own. 7z packages are written in bounded solid blocks, so
+    a miss decompresses the block of the word rather than the whole archive,
+    and its other entries are cached. A package exported in the pack format is
+    loaded whole from its lexicon.pack member instead.
+    """
+
+    def __init__(self, archive_path: str, cache_size: int = 16384) -> None:
+        """
+        Open a packaged archive and build its headword index.
+
+        :param archive_path: The path of the data.zip or data.7z package.
+        :param cache_size: The maximum number of decompressed members to keep in memory.
+        :return None:
+        """
+
+        self.archive_path: str = archive_path
+        self.cache_size: int = cache_size
+        self.hits: int = 0
+        self.misses: int = 0
+
+        self._cache: collections.OrderedDict = collections.OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+        self._layout: dict | None = None
+        self._blocks: dict = {}
+
+        if zipfile.is_zipfile(archive_path):
+            self._archive = zipfile.ZipFile(archive_path, 'r')
+            self._names: set[str] = set(self._archive.namelist())
+        elif py7zr.is_7zfile(archive_path):
+            self._archive = py7zr.SevenZipFile(archive_path, 'r')
+            self._names: set[str] = set(self._archive.getnames())
+
+            # Every read scans the whole file list, so a missing entry is read
+            # along with the other entries of its solid block. py7zr has no public
+            # block of a file, so without the folder attribute of the pinned
+            # version every entry is read on its own.
+            blocks: dict = {}
+
+            for archive_file in self._archive.files:
+                folder = getattr(archive_file, 'folder', None)
+
+                if folder is not None and archive_file.filename.startswith(('dictionary/', 'paradigm/')):
+                    self._blocks[archive_file.filename] = blocks.setdefault(id(folder), [])
+                    self._blocks[archive_file.filename].append(archive_file.filename)
+        else:
+            raise ValueError(f'{archive_path} is neither a zip nor a 7z archive')
+
+        if HASHING_KEY_NAME in self._names:
+            hashing_key: dict = json.loads(self._read_raw_members([HASHING_KEY_NAME])[HASHING_KEY_NAME].decode('unicode-escape'))
+        elif lexicon_pack.PACK_NAME in self._names:
+            self._layout = lexicon_pack.unpack(self._read_raw_members([lexicon_pack.PACK_NAME])[lexicon_pack.PACK_NAME], f'{archive_path}:{lexicon_pack.PACK_NAME}')
+            hashing_key: dict = self._layout['hashing_key']
+        else:
+            raise ValueError(f'{archive_path} holds neither {HASHING_KEY_NAME} nor {lexicon_pack.PACK_NAME}')
+
+        self._hashes: dict = {}
+        self._titles_by_word: dict = {}
+
+        for title_hash, title in hashing_key.items():
+            self._hashes[title] = title_hash
+            self._titles_by_word.setdefault(title.lower(), []).append(title)
+
+    def titles(self) -> list[str]:
+        """
+        List every headword of the archive.
+
+        :return list[str]: The headwords, in the order of hashing_key.json.
+        """
+
+        return list(self._hashes)
+
+    def entry(self, title: str) -> dict | None:
+        """
+        Read the dictionary entry of a headword.
+
+        :param title: The exact headword.
+        :return dict | None: The word and its definitions, or None if the headword is not in the archive.
+        """
+
+        return self._entries(title, ['dictionary'])['dictionary']
+
+    def paradigm(self, title: str) -> dict | None:
+        """
+        Read the paradigm of a headword.
+
+        :param title: The exact headword.
+        :return dict | None: The paradigm information, or None if the headword has none.
+        """
+
+        return self._entries(title, ['paradigm'])['paradigm']
+
+    def lookup(self, word: str) -> list[dict]:
+        """
+        Read the dictionary entry and paradigm of every headword spelled like a word, ignoring case.
+
+        :param word: The word to look up.
+        :return list[dict]: The 'dictionary' entry and 'paradigm' of every matching headword.
+        """
+
+        return [self._entries(title, ['dictionary', 'paradigm']) for title in self._titles_by_word.get(word.strip().lower(), [])]
+
+    def summary(self) -> str:
+        """
+        Summarize the cache.
+
+        :return str: A one-line summary.
+        """
+
+        return f'Archive cache: {self.hits} hits | {self.misses} misses | {len(self._cache)}/{self.cache_size} members'
+
+    def close(self) -> None:
+        """
+        Close the archive.
+
+        :return None:
+        """
+
+        self._archive.close()
+
+    def __enter__(self) -> 'LexiconArchive':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _entries(self, title: str, sub_dirs: list[str]) -> dict:
+        title_hash: str | None = self._hashes.get(title)
+        entries: dict = {sub_dir: None for sub_dir in sub_dirs}
+
+        if title_hash is None:
+            return entries
+
+        if self._layout is not None:
+            return {sub_dir: self._layout[sub_dir].get(title_hash) for sub_dir in sub_dirs}
+
+        names: dict = {f'{sub_dir}/{title_hash}.json': sub_dir for sub_dir in sub_dirs if f'{sub_dir}/{title_hash}.json' in self._names}
+
+        for name, data in self._read_members(list(names)).items():
+            entries[names[name]] = data
+
+        return entries
+
+    def _read_members(self, names: list[str]) -> dict:
+        members: dict = {}
+        missing: list[str] = []
+
+        with self._lock:
+            for name in names:
+                if name in self._cache:
+                    self._cache.move_to_end(name)
+                    members[name] = self._cache[name]
+                    self.hits += 1
+                else:
+                    missing.append(name)
+
+        if missing != []:
+            raw_members: dict = self._read_raw_members(missing)
+
+            # The other entries of a 7z block were decompressed along with the
+            # missing ones, so they are cached as well.
+            with self._lock:
+                self.misses += len(missing)
+
+                for name, data in raw_members.items():
+                    self._cache[name] = data
+
+                    if len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+
+            members.update({name: raw_members[name] for name in missing})
+
+        # Members are written with the unicode-escape encoding by export_storage.
+        return {name: json.loads(data.decode('unicode-escape')) for name, data in members.items()}
+
+    def _read_raw_members(self, names: list[str]) -> dict:
+        with self._lock:
+            if isinstance(self._archive, zipfile.ZipFile):
+                return {name: self._archive.read(name) for name in names}
+
+            targets: set[str] = set(names)
+
+            for name in names:
+                targets.update(self._blocks.get(name, []))
+
+            self._archive.reset()
+
+            return {name: file.read() for name, file in self._archive.read(targets=sorted(targets)).items()}
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description='Look up words straight from a packaged data.zip or data.7z.')
+
+    parser.add_argument('archive_path', help='Path of the data.zip or data.7z package')
+    parser.add_argument('words', nargs='+', help='Words to look up')
+    parser.add_argument('--cache-size', type=int, default=16384, help='Maximum number of decompressed members to keep in memory')
+
+    args = parser.parse_args()
+
+    found: bool = False
+
+    with LexiconArchive(args.archive_path, max(args.cache_size, 1)) as archive:
+        for word in args.words:
+            results: list[dict] = archive.lookup(word)
+
+            if results == []:
+                print(f'{word} was not found')
+
+            for result in results:
+                found = True
+                print(json.dumps(result, ensure_ascii=False, indent=4))
+
+    if not found:
+        exit(1)
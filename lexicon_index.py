@@ -0,0 +1,616 @@
+import os
+import re
+import json
+import mmap
+import struct
+import argparse
+import unicodedata
+
+import lexicon_pack
+
+
+LEXICON_MAGIC: bytes = b'LEXIDX01'
+FORMS_MAGIC: bytes = b'FRMIDX01'
+DEFINITIONS_MAGIC: bytes = b'DEFIDX01'
+
+# magic, key count, record count, keys offset, records offset, strings offset
+HEADER_FORMAT: struct.Struct = struct.Struct('<8sIIQQQ')
+# key string offset, key length, first record, record count
+KEY_FORMAT: struct.Struct = struct.Struct('<IIII')
+# string offset, string length (a definition, a headword or a posting list)
+DEFINITION_FORMAT: struct.Struct = struct.Struct('<II')
+# lemma, column and row string offsets and lengths, table index
+FORM_FORMAT: struct.Struct = struct.Struct('<IIIIIII')
+
+TERM_PATTERN: re.Pattern = re.compile(r"[^\W_]+(?:'[^\W_]+)*")
+
+
+def load_entries(output_dir: str, sub_dir: str) -> list[dict]:
+    """
+    Load every entry of the per-title dictionary/ or paradigm/ layout, or of the
+    pack file of a directory exported in the pack format.
+
+    :param output_dir: The directory the dictionary was built in.
+    :param sub_dir: Either 'dictionary' or 'paradigm'.
+    :return list: A list of the loaded entries.
+    """
+
+    entries_dir: str = os.path.join(output_dir, sub_dir)
+    entries: list[dict] = []
+
+    pack_path: str = os.path.join(output_dir, lexicon_pack.PACK_NAME)
+
+    if not os.path.isdir(entries_dir) and os.path.exists(pack_path):
+        packed_entries: dict = lexicon_pack.load_pack(pack_path)[sub_dir]
+
+        return [packed_entries[title_hash] for title_hash in sorted(packed_entries)]
+
+    for file_name in sorted(os.listdir(entries_dir)):
+        if not file_name.endswith('.json'):
+            continue
+
+        with open(os.path.join(entries_dir, file_name), 'r', encoding='unicode-escape') as file:
+            entries.append(json.load(file))
+
+    return entries
+
+
+def load_dictionary(output_dir: str) -> dict:
+    """
+    Load every word and its definitions from the per-title dictionary/ layout.
+
+    :param output_dir: The directory the dictionary was built in.
+    :return dict: A dictionary mapping every word to its list of definitions.
+    """
+
+    return {entry.get('word', ''): entry.get('definitions', []) for entry in load_entries(output_dir, 'dictionary')}
+
+
+def normalize_form(form: str) -> str:
+    """
+    Normalize an inflected form for lookup by lowercasing it and removing vowel length marks.
+
+    :param form: The form to normalize.
+    :return str: The normalized form.
+    """
+
+    decomposed: str = unicodedata.normalize('NFD', form.strip().lower())
+
+    return unicodedata.normalize('NFC', ''.join(character for character in decomposed if not unicodedata.combining(character)))
+
+
+def write_sorted_index(index_path: str, magic: bytes, record_format: struct.Struct, keyed_records: dict) -> int:
+    """
+    Write a sorted binary index file.
+
+    The file holds a header, a table of keys sorted by their UTF-8 bytes, a
+    table of fixed-size records and a string table in which every distinct
+    string is stored once. Every string or bytes field of a record is written
+    as its offset and length in the string table.
+
+    :param index_path: The path of the index file to write.
+    :param magic: The magic bytes identifying the kind of index.
+    :param record_format: The struct of a record once its strings are expanded.
+    :param keyed_records: A dictionary mapping every key to its list of record tuples.
+    :return int: The number of keys in the index.
+    """
+
+    strings: bytearray = bytearray()
+    string_offsets: dict = {}
+
+    def intern(text: str | bytes) -> tuple[int, int]:
+        encoded: bytes = text.encode('utf-8') if isinstance(text, str) else text
+
+        if encoded not in string_offsets:
+            string_offsets[encoded] = len(strings)
+            strings.extend(encoded)
+
+        return string_offsets[encoded], len(encoded)
+
+    keys: bytearray = bytearray()
+    records: bytearray = bytearray()
+    record_count: int = 0
+
+    for key in sorted(keyed_records, key=lambda key: key.encode('utf-8')):
+        key_records: list[tuple] = keyed_records[key]
+
+        keys += KEY_FORMAT.pack(*intern(key), record_count, len(key_records))
+
+        for record in key_records:
+            fields: list[int] = []
+
+            for field in record:
+                if isinstance(field, (str, bytes)):
+                    fields.extend(intern(field))
+                else:
+                    fields.append(field)
+
+            records += record_format.pack(*fields)
+
+        record_count += len(key_records)
+
+    keys_offset: int = HEADER_FORMAT.size
+    records_offset: int = keys_offset + len(keys)
+    strings_offset: int = records_offset + len(records)
+
+    temporary_path: str = f'{index_path}.tmp'
+
+    with open(temporary_path, 'wb') as file:
+        file.write(HEADER_FORMAT.pack(magic, len(keyed_records), record_count, keys_offset, records_offset, strings_offset))
+        file.write(keys)
+        file.write(records)
+        file.write(strings)
+
+    os.replace(temporary_path, index_path)
+
+    return len(keyed_records)
+
+
+def build_index(output_dir: str, index_path: str) -> int:
+    """
+    Compile the scraped dictionary into a word to definitions index file.
+
+    :param output_dir: The directory the dictionary was built in.
+    :param index_path: The path of the index file to write.
+    :return int: The number of words in the index.
+    """
+
+    words: dict = load_dictionary(output_dir)
+
+    return write_sorted_index(index_path, LEXICON_MAGIC, DEFINITION_FORMAT, {word: [(definition,) for definition in definitions] for word, definitions in words.items()})
+
+
+def build_forms_index(output_dir: str, index_path: str) -> int:
+    """
+    Invert every paradigm table cell into an inflected form to lemma index file.
+
+    :param output_dir: The directory the dictionary was built in.
+    :param index_path: The path of the index file to write.
+    :return int: The number of distinct forms in the index.
+    """
+
+    forms: dict = {}
+
+    for paradigm_info in load_entries(output_dir, 'paradigm'):
+        lemma: str = paradigm_info.get('word', '')
+
+        for i in range(paradigm_info.get('forms', 0)):
+            for column, rows in paradigm_info.get(str(i), {}).items():
+                for row, cell_forms in rows.items():
+                    for form in cell_forms:
+                        record: tuple = (lemma, column, row, i)
+                        form_records: list[tuple] = forms.setdefault(normalize_form(form), [])
+
+                        if record not in form_records:
+                            form_records.append(record)
+
+    return write_sorted_index(index_path, FORMS_MAGIC, FORM_FORMAT, forms)
+
+
+def tokenize_definition(definition: str) -> list[str]:
+    """
+    Split an English definition into lowercase search terms.
+
+    :param definition: The definition to tokenize.
+    :return list[str]: The terms of the definition, in order.
+    """
+
+    return TERM_PATTERN.findall(definition.lower())
+
+
+def encode_postings(ids: list[int]) -> bytes:
+    """
+    Compress a sorted list of headword IDs into the gaps between them, each written as a varint.
+
+    :param ids: The sorted, distinct headword IDs.
+    :return bytes: The compressed posting list.
+    """
+
+    encoded: bytearray = bytearray()
+    previous: int = 0
+
+    for headword_id in ids:
+        gap: int = headword_id - previous
+        previous = headword_id
+
+        while gap >= 0x80:
+            encoded.append((gap & 0x7f) | 0x80)
+            gap >>= 7
+
+        encoded.append(gap)
+
+    return bytes(encoded)
+
+
+def decode_postings(encoded: bytes) -> list[int]:
+    """
+    Decompress a posting list written by encode_postings.
+
+    :param encoded: The compressed posting list.
+    :return list[int]: The sorted headword IDs.
+    """
+
+    ids: list[int] = []
+    current: int = 0
+    gap: int = 0
+    shift: int = 0
+
+    for byte in encoded:
+        gap |= (byte & 0x7f) << shift
+
+        if byte & 0x80:
+            shift += 7
+            continue
+
+        current += gap
+        ids.append(current)
+        gap = 0
+        shift = 0
+
+    return ids
+
+
+def build_definitions_index(output_dir: str, index_path: str) -> int:
+    """
+    Compile the definitions into an English term to headword inverted index file.
+
+    Every term maps to a single record holding its compressed posting list of
+    headword IDs. The headwords themselves, in ID order, are stored as the
+    records of the empty key, which no term can be.
+
+    :param output_dir: The directory the dictionary was built in.
+    :param index_path: The path of the index file to write.
+    :return int: The number of distinct terms in the index.
+    """
+
+    words: dict = load_dictionary(output_dir)
+    headwords: list[str] = sorted(words)
+    postings: dict = {}
+
+    for headword_id in range(len(headwords)):
+        for definition in words[headwords[headword_id]]:
+            for term in tokenize_definition(definition):
+                term_ids: list[int] = postings.setdefault(term, [])
+
+                if term_ids == [] or term_ids[-1] != headword_id:
+                    term_ids.append(headword_id)
+
+    keyed_records: dict = {term: [(encode_postings(ids),)] for term, ids in postings.items()}
+    keyed_records[''] = [(headword,) for headword in headwords]
+
+    write_sorted_index(index_path, DEFINITIONS_MAGIC, DEFINITION_FORMAT, keyed_records)
+
+    return len(postings)
+
+
+class SortedIndex:
+    """
+    Find keys in a memory-mapped index file written by write_sorted_index by binary search.
+    """
+
+    magic: bytes = b''
+    record_format: struct.Struct = DEFINITION_FORMAT
+
+    def __init__(self, index_path: str) -> None:
+        """
+        Open and memory-map an index file.
+
+        :param index_path: The path of the index file.
+        :return None:
+        """
+
+        self._file = open(index_path, 'rb')
+        self._map: mmap.mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.count, _, self._keys_offset, self._records_offset, self._strings_offset = HEADER_FORMAT.unpack_from(self._map, 0)
+
+        if magic != self.magic:
+            self.close()
+            raise ValueError(f'{index_path} is not a {type(self).__name__} file')
+
+    def __enter__(self) -> 'SortedIndex':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def close(self) -> None:
+        """
+        Unmap and close the index file.
+
+        :return None:
+        """
+
+        self._map.close()
+        self._file.close()
+
+    def _string(self, offset: int, length: int) -> bytes:
+        start: int = self._strings_offset + offset
+
+        return self._map[start:start + length]
+
+    def _key_entry(self, position: int) -> tuple[int, int, int, int]:
+        return KEY_FORMAT.unpack_from(self._map, self._keys_offset + position * KEY_FORMAT.size)
+
+    def _key(self, position: int) -> bytes:
+        key_offset, key_length, _, _ = self._key_entry(position)
+
+        return self._string(key_offset, key_length)
+
+    def _lower_bound(self, key: bytes) -> int:
+        low: int = 0
+        high: int = self.count
+
+        while low < high:
+            middle: int = (low + high) // 2
+
+            if self._key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        return low
+
+    def _find(self, key: str) -> int | None:
+        encoded: bytes = key.encode('utf-8')
+        position: int = self._lower_bound(encoded)
+
+        if position < self.count and self._key(position) == encoded:
+            return position
+
+        return None
+
+    def _records(self, position: int) -> list[tuple]:
+        _, _, first_record, record_count = self._key_entry(position)
+
+        return [self.record_format.unpack_from(self._map, self._records_offset + i * self.record_format.size) for i in range(first_record, first_record + record_count)]
+
+    def prefix(self, prefix: str, limit: int = 50) -> list[str]:
+        """
+        Get the keys starting with a prefix, in sorted order.
+
+        :param prefix: The prefix to look up.
+        :param limit: The maximum number of keys to return.
+        :return list[str]: The matching keys.
+        """
+
+        encoded: bytes = prefix.encode('utf-8')
+        position: int = self._lower_bound(encoded)
+        keys: list[str] = []
+
+        while position < self.count and len(keys) < limit:
+            key: bytes = self._key(position)
+
+            if not key.startswith(encoded):
+                break
+
+            keys.append(key.decode('utf-8'))
+            position += 1
+
+        return keys
+
+
+class LexiconIndex(SortedIndex):
+    """
+    Answer exact and prefix word queries from a word to definitions index file.
+    """
+
+    magic: bytes = LEXICON_MAGIC
+    record_format: struct.Struct = DEFINITION_FORMAT
+
+    def lookup(self, word: str) -> list[str] | None:
+        """
+        Get the definitions of a word.
+
+        :param word: The word to look up.
+        :return list[str] | None: The definitions of the word, or None if it is not in the index.
+        """
+
+        position: int | None = self._find(word.strip().lower())
+
+        if position is None:
+            return None
+
+        return [self._string(*record).decode('utf-8') for record in self._records(position)]
+
+    def prefix(self, prefix: str, limit: int = 50) -> list[str]:
+        return super().prefix(prefix.strip().lower(), limit)
+
+
+class FormsIndex(SortedIndex):
+    """
+    Lemmatize inflected forms with an inflected form to lemma index file.
+    """
+
+    magic: bytes = FORMS_MAGIC
+    record_format: struct.Struct = FORM_FORMAT
+
+    def lemmatize(self, form: str) -> list[tuple[str, str, str, int]]:
+        """
+        Get every paradigm cell an inflected form appears in.
+
+        :param form: The inflected form to look up (vowel length marks are ignored).
+        :return list: A list of (lemma, column, row, table index) tuples, e.g. ('rosa', 'plural', 'dative', 0).
+        """
+
+        position: int | None = self._find(normalize_form(form))
+
+        if position is None:
+            return []
+
+        return [(self._string(lemma_offset, lemma_length).decode('utf-8'), self._string(column_offset, column_length).decode('utf-8'), self._string(row_offset, row_length).decode('utf-8'), table) for lemma_offset, lemma_length, column_offset, column_length, row_offset, row_length, table in self._records(position)]
+
+    def lemmas(self, form: str) -> list[str]:
+        """
+        Get the distinct lemmas an inflected form belongs to.
+
+        :param form: The inflected form to look up.
+        :return list[str]: The lemmas, in index order.
+        """
+
+        return list(dict.fromkeys(lemma for lemma, _, _, _ in self.lemmatize(form)))
+
+    def lemmatize_tokens(self, tokens: list[str]) -> list[list[str]]:
+        """
+        Get the lemmas of every token of a text, looking up each distinct token only once.
+
+        :param tokens: The tokens to look up.
+        :return list: The lemmas of every token, in the order of the tokens.
+        """
+
+        memo: dict = {}
+
+        return [memo[token] if token in memo else memo.setdefault(token, self.lemmas(token)) for token in tokens]
+
+    def prefix(self, prefix: str, limit: int = 50) -> list[str]:
+        return super().prefix(normalize_form(prefix), limit)
+
+
+class DefinitionsIndex(SortedIndex):
+    """
+    Find the Latin headwords whose definitions contain English terms with an inverted index file.
+    """
+
+    magic: bytes = DEFINITIONS_MAGIC
+    record_format: struct.Struct = DEFINITION_FORMAT
+
+    def __init__(self, index_path: str) -> None:
+        """
+        Open and memory-map an index file and locate its headword table.
+
+        :param index_path: The path of the index file.
+        :return None:
+        """
+
+        super().__init__(index_path)
+
+        _, _, self._first_headword, self.headword_count = self._key_entry(0)
+
+    def headword(self, headword_id: int) -> str:
+        """
+        Get the headword with an ID.
+
+        :param headword_id: The ID of the headword.
+        :return str: The headword.
+        """
+
+        return self._string(*self.record_format.unpack_from(self._map, self._records_offset + (self._first_headword + headword_id) * self.record_format.size)).decode('utf-8')
+
+    def _postings(self, term: str) -> bytes:
+        position: int | None = self._find(term) if term != '' else None
+
+        if position is None:
+            return b''
+
+        return self._string(*self._records(position)[0])
+
+    def search(self, query: str, limit: int | None = None) -> list[str]:
+        """
+        Get the headwords whose definitions contain every term of a query.
+
+        :param query: The English terms to look up, e.g. 'make war'.
+        :param limit: The maximum number of headwords to return, or None for all of them.
+        :return list[str]: The matching headwords, in sorted order.
+        """
+
+        terms: list[str] = list(dict.fromkeys(tokenize_definition(query)))
+
+        if terms == []:
+            return []
+
+        # intersect starting from the shortest posting list so the candidate set only shrinks
+        postings: list[bytes] = sorted((self._postings(term) for term in terms), key=len)
+
+        if postings[0] == b'':
+            return []
+
+        ids: list[int] = decode_postings(postings[0])
+
+        for encoded in postings[1:]:
+            term_ids: set = set(decode_postings(encoded))
+            ids = [headword_id for headword_id in ids if headword_id in term_ids]
+
+            if ids == []:
+                break
+
+        return [self.headword(headword_id) for headword_id in ids[:limit]]
+
+    def prefix(self, prefix: str, limit: int = 50) -> list[str]:
+        return [term for term in super().prefix(prefix.strip().lower(), limit + 1) if term != ''][:limit]
+
+
+def lookup(index_path: str, word: str) -> list[str] | None:
+    """
+    Look up a single word in a word to definitions index file.
+
+    :param index_path: The path of the index file.
+    :param word: The word to look up.
+    :return list[str] | None: The definitions of the word, or None if it is not in the index.
+    """
+
+    with LexiconIndex(index_path) as index:
+        return index.lookup(word)
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description='Build and query memory-mapped lookup indexes of the scraped dictionary.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser: argparse.ArgumentParser = subparsers.add_parser('build', help='Compile the dictionary into a word index file')
+    build_parser.add_argument('output_dir', help='Directory the dictionary was built in')
+    build_parser.add_argument('index_path', help='Path of the index file to write')
+
+    build_forms_parser: argparse.ArgumentParser = subparsers.add_parser('build-forms', help='Compile the paradigm tables into an inflected form index file')
+    build_forms_parser.add_argument('output_dir', help='Directory the dictionary was built in')
+    build_forms_parser.add_argument('index_path', help='Path of the index file to write')
+
+    lookup_parser: argparse.ArgumentParser = subparsers.add_parser('lookup', help='Look up words in a word index file')
+    lookup_parser.add_argument('index_path', help='Path of the index file')
+    lookup_parser.add_argument('words', nargs='+', help='Words to look up')
+    lookup_parser.add_argument('--prefix', action='store_true', help='List the words starting with each given prefix instead')
+    lookup_parser.add_argument('--limit', type=int, default=50, help='Maximum number of words to list per prefix')
+
+    lemmatize_parser: argparse.ArgumentParser = subparsers.add_parser('lemmatize', help='Look up inflected forms in an inflected form index file')
+    lemmatize_parser.add_argument('index_path', help='Path of the index file')
+    lemmatize_parser.add_argument('forms', nargs='+', help='Inflected forms to look up')
+
+    build_definitions_parser: argparse.ArgumentParser = subparsers.add_parser('build-definitions', help='Compile the definitions into an English term index file')
+    build_definitions_parser.add_argument('output_dir', help='Directory the dictionary was built in')
+    build_definitions_parser.add_argument('index_path', help='Path of the index file to write')
+
+    search_parser: argparse.ArgumentParser = subparsers.add_parser('search', help='Find the Latin words whose definitions contain every given English term')
+    search_parser.add_argument('index_path', help='Path of the index file')
+    search_parser.add_argument('terms', nargs='+', help='English terms to look up')
+    search_parser.add_argument('--limit', type=int, default=None, help='Maximum number of words to list')
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        word_count: int = build_index(args.output_dir, args.index_path)
+        print(f'Indexed {word_count} words into {args.index_path}')
+    elif args.command == 'build-forms':
+        form_count: int = build_forms_index(args.output_dir, args.index_path)
+        print(f'Indexed {form_count} forms into {args.index_path}')
+    elif args.command == 'build-definitions':
+        term_count: int = build_definitions_index(args.output_dir, args.index_path)
+        print(f'Indexed {term_count} terms into {args.index_path}')
+    elif args.command == 'search':
+        with DefinitionsIndex(args.index_path) as index:
+            headwords: list[str] = index.search(' '.join(args.terms), args.limit)
+            print(', '.join(headwords) if headwords else 'not found')
+    elif args.command == 'lookup':
+        with LexiconIndex(args.index_path) as index:
+            for word in args.words:
+                if args.prefix:
+                    print(f'{word}: {", ".join(index.prefix(word, args.limit))}')
+                else:
+                    definitions: list[str] | None = index.lookup(word)
+                    print(f'{word}: {"; ".join(definitions) if definitions is not None else "not found"}')
+    else:
+        with FormsIndex(args.index_path) as index:
+            for form in args.forms:
+                cells: list[tuple[str, str, str, int]] = index.lemmatize(form)
+                print(f'{form}: {"; ".join(f"{lemma} ({row} {column}, table {table})" for lemma, column, row, table in cells) if cells else "not found"}')
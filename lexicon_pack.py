@@ -0,0 +1,439 @@
+import os
+import sys
+import json
+import time
+import array
+import struct
+import zipfile
+import argparse
+import tempfile
+import tracemalloc
+
+
+PACK_NAME: str = 'lexicon.pack'
+PACK_MAGIC: bytes = b'LEXPAK01'
+
+# magic, string table size in bytes, shape token count, value token count
+HEADER_FORMAT: struct.Struct = struct.Struct('<8sQQQ')
+
+# Every value is a stream of 32-bit tokens holding a tag in the low bits and a
+# payload above them: a string ID, an integer, the item count of a list, or
+# the shape of a dictionary, which is the interned tuple of its keys, so only
+# its values follow. Lists and dictionaries holding nothing but strings are
+# followed by bare string IDs.
+TAG_BITS: int = 4
+TAG_MASK: int = (1 << TAG_BITS) - 1
+MAX_PAYLOAD: int = (1 << (32 - TAG_BITS)) - 1
+
+STRING: int = 0
+INTEGER: int = 1
+NEGATIVE: int = 2
+LIST: int = 3
+DICTIONARY: int = 4
+STRING_LIST: int = 5
+STRING_DICTIONARY: int = 6
+CONSTANT: int = 7
+LITERAL: int = 8
+
+CONSTANTS: list = [None, False, True]
+
+
+def load_layout(output_dir: str) -> dict:
+    """
+    Load the per-title dictionary/ and paradigm/ layout and hashing_key.json.
+
+    :param output_dir: The directory the dictionary was built in.
+    :return dict: The 'dictionary' and 'paradigm' entries by title hash and the 'hashing_key'.
+    """
+
+    layout: dict = {}
+
+    for sub_dir in ['dictionary', 'paradigm']:
+        entries_dir: str = os.path.join(output_dir, sub_dir)
+        entries: dict = {}
+
+        for file_name in sorted(os.listdir(entries_dir)):
+            if not file_name.endswith('.json'):
+                continue
+
+            with open(os.path.join(entries_dir, file_name), 'r', encoding='unicode-escape') as file:
+                entries[file_name[:-len('.json')]] = json.load(file)
+
+        layout[sub_dir] = entries
+
+    with open(os.path.join(output_dir, 'hashing_key.json'), 'r', encoding='unicode-escape') as file:
+        layout['hashing_key'] = json.load(file)
+
+    return layout
+
+
+def encode_value(value, tokens: array.array, intern, intern_shape) -> None:
+    """
+    Append the tokens of a JSON value.
+
+    :param value: The value to encode.
+    :param tokens: The token array to append to.
+    :param intern: The function returning the ID of a string in the string table.
+    :param intern_shape: The function returning the ID of a tuple of dictionary keys in the shape table.
+    :return None:
+    """
+
+    if isinstance(value, str):
+        tokens.append(intern(value) << TAG_BITS | STRING)
+
+    elif isinstance(value, dict):
+        shape_id: int = intern_shape(tuple(value))
+
+        if all(isinstance(item, str) for item in value.values()):
+            tokens.append(shape_id << TAG_BITS | STRING_DICTIONARY)
+            tokens.extend(map(intern, value.values()))
+        else:
+            tokens.append(shape_id << TAG_BITS | DICTIONARY)
+
+            for item in value.values():
+                encode_value(item, tokens, intern, intern_shape)
+
+    elif isinstance(value, list):
+        if all(isinstance(item, str) for item in value):
+            tokens.append(len(value) << TAG_BITS | STRING_LIST)
+            tokens.extend(map(intern, value))
+        else:
+            tokens.append(len(value) << TAG_BITS | LIST)
+
+            for item in value:
+                encode_value(item, tokens, intern, intern_shape)
+
+    elif value is None or isinstance(value, bool):
+        tokens.append(CONSTANTS.index(value) << TAG_BITS | CONSTANT)
+
+    elif isinstance(value, int) and 0 <= value <= MAX_PAYLOAD:
+        tokens.append(value << TAG_BITS | INTEGER)
+
+    elif isinstance(value, int) and -MAX_PAYLOAD <= value < 0:
+        tokens.append((-value - 1) << TAG_BITS | NEGATIVE)
+
+    else:
+        tokens.append(intern(json.dumps(value)) << TAG_BITS | LITERAL)
+
+
+def write_pack(pack_path: str, layout: dict) -> int:
+    """
+    Write a dictionary layout to a pack file.
+
+    The file holds a header, a string table in which every distinct string
+    (headwords, definitions, paradigm keys and cells, title hashes) is stored
+    once, a table of the distinct key tuples of the dictionaries, and the
+    token stream of the layout.
+
+    :param pack_path: The path of the pack file to write.
+    :param layout: The 'dictionary' and 'paradigm' entries by title hash and the 'hashing_key', as returned by load_layout.
+    :return int: The number of distinct strings in the pack.
+    """
+
+    strings: list[str] = []
+    string_ids: dict = {}
+    shape_tokens: array.array = array.array('I')
+    shape_ids: dict = {}
+
+    def intern(text: str) -> int:
+        string_id: int | None = string_ids.get(text)
+
+        if string_id is None:
+            if '\x00' in text:
+                raise ValueError(f'{text!r} cannot be packed because it contains a NUL character')
+
+            string_id = string_ids[text] = len(strings)
+            strings.append(text)
+
+            if string_id > MAX_PAYLOAD:
+                raise ValueError(f'{pack_path} would hold more than {MAX_PAYLOAD} distinct strings')
+
+        return string_id
+
+    def intern_shape(keys: tuple) -> int:
+        shape_id: int | None = shape_ids.get(keys)
+
+        if shape_id is None:
+            shape_id = shape_ids[keys] = len(shape_ids)
+
+            shape_tokens.append(len(keys))
+            shape_tokens.extend(map(intern, keys))
+
+        return shape_id
+
+    tokens: array.array = array.array('I')
+
+    encode_value(layout, tokens, intern, intern_shape)
+
+    if sys.byteorder == 'big':
+        shape_tokens.byteswap()
+        tokens.byteswap()
+
+    string_table: bytes = '\x00'.join(strings).encode('utf-8')
+    temporary_path: str = f'{pack_path}.tmp'
+
+    with open(temporary_path, 'wb') as file:
+        file.write(HEADER_FORMAT.pack(PACK_MAGIC, len(string_table), len(shape_tokens), len(tokens)))
+        file.write(string_table)
+        file.write(shape_tokens.tobytes())
+        file.write(tokens.tobytes())
+
+    os.replace(temporary_path, pack_path)
+
+    return len(strings)
+
+
+def decode_value(tokens: list[int], strings: list[str], shapes: list[tuple]):
+    """
+    Decode the value at the start of a token stream.
+
+    Every string of the value is the shared object of the string table, so
+    repeated keys and definitions are only held in memory once.
+
+    :param tokens: The token stream.
+    :param strings: The string table.
+    :param shapes: The key tuples of the dictionaries, as strings.
+    :return: The decoded value.
+    """
+
+    position: int = 0
+    string_at = strings.__getitem__
+
+    def decode():
+        nonlocal position
+
+        token: int = tokens[position]
+        tag: int = token & TAG_MASK
+        payload: int = token >> TAG_BITS
+
+        position += 1
+
+        if tag == STRING:
+            return strings[payload]
+
+        if tag == STRING_DICTIONARY:
+            keys: tuple = shapes[payload]
+            position += len(keys)
+
+            return dict(zip(keys, map(string_at, tokens[position - len(keys):position])))
+
+        if tag == STRING_LIST:
+            position += payload
+
+            return list(map(string_at, tokens[position - payload:position]))
+
+        if tag == DICTIONARY or tag == LIST:
+            keys: tuple | None = shapes[payload] if tag == DICTIONARY else None
+            values: list = []
+
+            for _ in range(payload if keys is None else len(keys)):
+                item_token: int = tokens[position]
+                item_tag: int = item_token & TAG_MASK
+
+                # Strings and lists of strings (such as paradigm cells) are the
+                # most common items, so they are decoded without a call.
+                if item_tag == STRING:
+                    values.append(strings[item_token >> TAG_BITS])
+                    position += 1
+                elif item_tag == STRING_LIST:
+                    item_end: int = position + 1 + (item_token >> TAG_BITS)
+                    values.append(list(map(string_at, tokens[position + 1:item_end])))
+                    position = item_end
+                else:
+                    values.append(decode())
+
+            return values if keys is None else dict(zip(keys, values))
+
+        if tag == INTEGER:
+            return payload
+
+        if tag == NEGATIVE:
+            return -payload - 1
+
+        if tag == CONSTANT:
+            return CONSTANTS[payload]
+
+        return json.loads(strings[payload])
+
+    return decode()
+
+
+def load_pack(pack_path: str) -> dict:
+    """
+    Load a pack file written by write_pack.
+
+    :param pack_path: The path of the pack file.
+    :return dict: The 'dictionary' and 'paradigm' entries by title hash and the 'hashing_key'.
+    """
+
+    with open(pack_path, 'rb') as file:
+        return unpack(file.read(), pack_path)
+
+
+def unpack(data: bytes, name: str = PACK_NAME) -> dict:
+    """
+    Decode the content of a pack file, such as a member read from a packaged archive.
+
+    :param data: The content of the pack file.
+    :param name: The name of the pack file for error messages.
+    :return dict: The 'dictionary' and 'paradigm' entries by title hash and the 'hashing_key'.
+    """
+
+    magic, strings_size, shape_token_count, token_count = HEADER_FORMAT.unpack_from(data, 0)
+
+    if magic != PACK_MAGIC:
+        raise ValueError(f'{name} is not a lexicon pack')
+
+    position: int = HEADER_FORMAT.size + strings_size
+    strings: list[str] = data[HEADER_FORMAT.size:position].decode('utf-8').split('\x00')
+
+    token_arrays: list[array.array] = []
+
+    for count in [shape_token_count, token_count]:
+        token_array: array.array = array.array('I')
+        token_array.frombytes(data[position:position + count * token_array.itemsize])
+
+        if sys.byteorder == 'big':
+            token_array.byteswap()
+
+        token_arrays.append(token_array)
+        position += count * token_array.itemsize
+
+    shape_tokens: list[int] = token_arrays[0].tolist()
+    shapes: list[tuple] = []
+    shape_position: int = 0
+
+    while shape_position < len(shape_tokens):
+        key_count: int = shape_tokens[shape_position]
+        shapes.append(tuple(strings[string_id] for string_id in shape_tokens[shape_position + 1:shape_position + 1 + key_count]))
+        shape_position += key_count + 1
+
+    return decode_value(token_arrays[1].tolist(), strings, shapes)
+
+
+def convert(output_dir: str, pack_path: str) -> int:
+    """
+    Convert the per-title JSON layout of a dictionary directory into a pack file.
+
+    :param output_dir: The directory the dictionary was built in.
+    :param pack_path: The path of the pack file to write.
+    :return int: The number of distinct strings in the pack.
+    """
+
+    return write_pack(pack_path, load_layout(output_dir))
+
+
+def zipped_size(paths: list[tuple[str, str]]) -> int:
+    """
+    Measure the size of a deflated zip archive of files.
+
+    :param paths: The path of every file and its name in the archive.
+    :return int: The size of the archive in bytes.
+    """
+
+    with tempfile.TemporaryFile() as file:
+        with zipfile.ZipFile(file, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for path, name in paths:
+                archive.write(path, name)
+
+        return file.tell()
+
+
+def benchmark_loaders(output_dir: str, pack_path: str, rounds: int = 3) -> dict:
+    """
+    Compare the size, load time and memory of the per-title JSON layout and a pack file of the same dictionary.
+
+    :param output_dir: The directory the dictionary was built in.
+    :param pack_path: The path of the pack file converted from the directory.
+    :param rounds: The number of times to load each format.
+    :return dict: The results for the 'json' layout and the 'pack'.
+    """
+
+    layout_paths: list[tuple[str, str]] = [(os.path.join(output_dir, 'hashing_key.json'), 'hashing_key.json')]
+
+    for sub_dir in ['dictionary', 'paradigm']:
+        for file_name in sorted(os.listdir(os.path.join(output_dir, sub_dir))):
+            layout_paths.append((os.path.join(output_dir, sub_dir, file_name), f'{sub_dir}/{file_name}'))
+
+    formats: dict = {
+        'json': (load_layout, output_dir, layout_paths),
+        'pack': (load_pack, pack_path, [(pack_path, PACK_NAME)])
+    }
+
+    results: dict = {}
+
+    for name, (loader, path, paths) in formats.items():
+        timings: list[float] = []
+
+        for _ in range(rounds):
+            start_time: float = time.perf_counter()
+            loader(path)
+            timings.append(time.perf_counter() - start_time)
+
+        tracemalloc.start()
+        loaded: dict = loader(path)
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        results[name] = {
+            'entries': len(loaded['dictionary']) + len(loaded['paradigm']),
+            'files': len(paths),
+            'size_mb': round(sum(os.path.getsize(file_path) for file_path, _ in paths) / 1048576, 3),
+            'zip_mb': round(zipped_size(paths) / 1048576, 3),
+            'load_ms': round(min(timings) * 1000, 1),
+            'retained_mb': round(retained / 1048576, 2),
+            'peak_mb': round(peak / 1048576, 2)
+        }
+
+        del loaded
+
+    return results
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description='Convert a dictionary to the compact pack format and load or benchmark it.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    convert_parser: argparse.ArgumentParser = subparsers.add_parser('convert', help='Convert the dictionary/ and paradigm/ layout of a directory into a pack file')
+    convert_parser.add_argument('output_dir', help='Directory the dictionary was built in')
+    convert_parser.add_argument('pack_path', nargs='?', default=None, help=f'Path of the pack file (defaults to {PACK_NAME} in the directory)')
+
+    lookup_parser: argparse.ArgumentParser = subparsers.add_parser('lookup', help='Print the entries of a word from a pack file')
+    lookup_parser.add_argument('pack_path', help='Path of the pack file')
+    lookup_parser.add_argument('word', help='Word to look up')
+
+    benchmark_parser: argparse.ArgumentParser = subparsers.add_parser('benchmark', help='Compare the size, load time and memory of the JSON layout and a pack file')
+    benchmark_parser.add_argument('output_dir', help='Directory the dictionary was built in')
+    benchmark_parser.add_argument('pack_path', nargs='?', default=None, help='Path of the pack file (converted to a temporary file if not given)')
+    benchmark_parser.add_argument('--rounds', type=int, default=3, help='Number of times to load each format')
+
+    args = parser.parse_args()
+
+    if args.command == 'convert':
+        pack_path: str = args.pack_path or os.path.join(args.output_dir, PACK_NAME)
+        string_count: int = convert(args.output_dir, pack_path)
+
+        print(f'Wrote {pack_path} with {string_count} distinct strings ({os.path.getsize(pack_path) / 1048576:.2f} MB)')
+
+    elif args.command == 'lookup':
+        layout: dict = load_pack(args.pack_path)
+        title_hashes: list[str] = [title_hash for title_hash, title in layout['hashing_key'].items() if title.lower() == args.word.lower()]
+
+        if title_hashes == []:
+            print(f'{args.word} was not found')
+            exit(1)
+
+        for title_hash in title_hashes:
+            print(json.dumps({'dictionary': layout['dictionary'].get(title_hash), 'paradigm': layout['paradigm'].get(title_hash)}, ensure_ascii=False, indent=4))
+
+    else:
+        with tempfile.TemporaryDirectory() as temporary_dir:
+            pack_path: str = args.pack_path
+
+            if pack_path is None:
+                pack_path = os.path.join(temporary_dir, PACK_NAME)
+                convert(args.output_dir, pack_path)
+
+            results: dict = benchmark_loaders(args.output_dir, pack_path, max(args.rounds, 1))
+
+        print(json.dumps(results, indent=4))
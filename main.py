@@ -2,413 +2,3351 @@ import os
 import bs4
 import json
 import time
+import queue
 import py7zr
+import random
 import shutil
 import string
+import socket
+import sqlite3
+import tarfile
+import zipfile
+import asyncio
 import hashlib
+import urllib3
 import argparse
 import requests
 import threading
+import contextlib
+import collections
+import http.server
+import urllib.parse
+import multiprocessing
+import concurrent.futures
+
+import delta
+import page_archive
+import lexicon_pack
+import lexicon_index
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+PARSER_BACKENDS: list[str] = ['html.parser', 'strainer', 'lxml']
+
+parser_backend: str = 'html.parser'
+response_cache = None
+rate_controller = None
+run_metrics = None
+http_transport = None
+page_recorder = None
+request_timeout: float | None = 30.0
+
+JUNK_TOKENS: frozenset = frozenset(['-', '', ', ', ','])
+ACCEPT_ENCODING: str = 'gzip, deflate, br' if brotli is not None else 'gzip, deflate'
+LEASE_POLL_INTERVAL: float = 1.0
+
+
+def class_matcher(*class_names: str):
+    """
+    Build a SoupStrainer attribute matcher for elements having any of the given classes.
+
+    The strainer sees the raw class attribute, so multi-class values are split here.
+
+    :param class_names: The classes to match.
+    :return function: The matcher function.
+    """
+
+    wanted: set[str] = set(class_names)
+
+    def matches(value: str | list[str] | None) -> bool:
+        if value is None:
+            return False
+
+        if isinstance(value, str):
+            value = value.split()
+
+        return not wanted.isdisjoint(value)
+
+    return matches
+
+
+WORD_STRAINER: bs4.SoupStrainer = bs4.SoupStrainer(['div', 'ol'], attrs={'class': class_matcher('flash_card_title', 'flash_card_english_def', 'main_identification')})
+PARADIGM_STRAINER: bs4.SoupStrainer = bs4.SoupStrainer('div', attrs={'class': class_matcher('noun_paradigm_container')})
+LINK_STRAINER: bs4.SoupStrainer = bs4.SoupStrainer('a')
+
+
+def time_formatter(seconds: int) -> str:
+    """
+    Format the seconds into a human readable string.
+
+    :param seconds: The number of seconds to format.
+    :return str: The formatted time string.
+    """
+
+    #Assume singular seconds, minutes, hours
+    seconds_text: str = 'second'
+    minutes_text: str = 'minute'
+    hours_text: str = 'hour'
+
+    return_text: str = ''
+
+    minutes: int = int(seconds/60)
+    hours: int = int(seconds/3600)
+
+    if hours >= 1:
+        minutes: int = int((seconds%3600)/60)
+    
+    if minutes >= 1:
+        seconds: int = int(seconds%60)
+    
+    if minutes > 1:
+        minutes_text += 's'
+    if hours > 1:
+        hours_text += 's'
+    if seconds > 1:
+        seconds_text += 's'
+
+    if hours >= 1:
+        return_text += f'{hours} {hours_text}'
+    
+    if minutes >= 1:
+        if return_text != '':
+            return_text += ' & '
+
+        return_text += f'{minutes} {minutes_text}'
+    
+    if seconds >= 1 and hours == 0:
+        if return_text != '':
+            return_text += ' & '
+
+        return_text += f'{seconds} {seconds_text}'
+
+    return return_text
+
+
+def text_cleaner(text: str) -> str:
+    """
+    Clean the text string.
+
+    :param text: The text string to be cleaned.
+    :return str: The cleaned text string.
+    """
+
+    return text.strip().lower().replace('\n', ' ').replace('\t', ' ')
+
+
+def title_cleaner(title: str) -> list[str]:
+    """
+    Clean and split the title string.
+
+    Titles keep the order they appear in, so the result is the same on every run.
+    
+    :param title: The title string to be cleaned.
+    :return list[str]: A list of cleaned title strings.
+    """
+
+    cleaned_titles: dict = {}
+
+    for cleaned_title in text_cleaner(title).split(','):
+        cleaned_title = cleaned_title.strip()
+
+        if cleaned_title.endswith('-'):
+            cleaned_title = cleaned_title[0:-1]
+
+        if cleaned_title.startswith('-'):
+            cleaned_title = cleaned_title[1:]
+
+        if cleaned_title not in JUNK_TOKENS:
+            cleaned_titles[cleaned_title] = None
+
+    return list(cleaned_titles)
+
+
+def definition_cleaner(definition: str) -> list[str]:
+    """
+    Clean and split the definition string.
+
+    Definitions keep the order they appear in, so the result is the same on every run.
+
+    :param definition: The definition string to be cleaned.
+    :return list[str]: A list of cleaned definition strings.
+    """
+
+    definition: str = text_cleaner(definition)
+
+    # drop everything up to the first reference number ([1] ...) and the first note ((of ...) ...)
+    reference_end: int = definition.find(']') + 2
+
+    if reference_end > 1 and '[' in definition:
+        definition = definition[0:definition.index('[')] if reference_end >= len(definition) else definition[reference_end:]
+
+    note_start: int = definition.find('(')
+
+    if note_start != -1:
+        note_end: int = definition.find(')') + 2 if ')' in definition else len(definition)
+        definition = definition[0:note_start] if note_end >= len(definition) else definition[note_end:]
+
+    cleaned_definitions: dict = {}
+
+    for cleaned_definition in definition.split(', '):
+        cleaned_definition = cleaned_definition.strip()
+
+        if cleaned_definition.endswith('-'):
+            cleaned_definition = cleaned_definition[0:-1]
+
+        if cleaned_definition not in JUNK_TOKENS:
+            cleaned_definitions[cleaned_definition] = None
+
+    return list(cleaned_definitions)
+
+
+def definition_batch_cleaner(definitions: list[str]) -> list[list[str]]:
+    """
+    Clean every definition or paradigm cell of a page in one call.
+
+    :param definitions: The definition or paradigm cell strings to be cleaned.
+    :return list[list[str]]: The cleaned definition strings of every input, in the same order.
+    """
+
+    return [definition_cleaner(definition) for definition in definitions]
+
+
+class ResponseCache:
+    """
+    Cache response bodies on disk and revalidate them with conditional requests.
+
+    Bodies are stored once per SHA-256 digest, and an SQLite index maps every URL
+    to its body digest, ETag and Last-Modified headers.
+    """
+
+    def __init__(self, cache_dir: str, max_size: int) -> None:
+        """
+        Initialize the response cache.
+
+        :param cache_dir: The directory to store the cache in.
+        :param max_size: The maximum total size of the cached bodies in bytes.
+        :return None:
+        """
+
+        self.cache_dir: str = cache_dir
+        self.max_size: int = max_size
+        self.hits: int = 0
+        self.misses: int = 0
+        self.bytes_saved: int = 0
+
+        os.makedirs(os.path.join(cache_dir, 'bodies'), exist_ok=True)
+
+        self._lock: threading.Lock = threading.Lock()
+        self._connection: sqlite3.Connection = sqlite3.connect(os.path.join(cache_dir, 'index.db'), check_same_thread=False)
+
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.execute('CREATE TABLE IF NOT EXISTS responses (url TEXT PRIMARY KEY, digest TEXT NOT NULL, size INTEGER NOT NULL, content_type TEXT, etag TEXT, last_modified TEXT, accessed REAL NOT NULL)')
+        self._connection.commit()
+
+    def body_path(self, digest: str) -> str:
+        """
+        Get the path of a cached body.
+
+        :param digest: The SHA-256 digest of the body.
+        :return str: The path of the body file.
+        """
+
+        return os.path.join(self.cache_dir, 'bodies', digest[:2], digest)
+
+    def conditional_headers(self, url: str) -> dict:
+        """
+        Get the headers that revalidate the cached response for a URL.
+
+        :param url: The URL about to be requested.
+        :return dict: The If-None-Match and If-Modified-Since headers, empty if the URL is not cached.
+        """
+
+        with self._lock:
+            row: tuple | None = self._connection.execute('SELECT etag, last_modified, digest FROM responses WHERE url = ?', (url,)).fetchone()
+
+        if row is None or not os.path.exists(self.body_path(row[2])):
+            return {}
+
+        headers: dict = {}
+
+        if row[0]:
+            headers['If-None-Match'] = row[0]
+        if row[1]:
+            headers['If-Modified-Since'] = row[1]
+
+        return headers
+
+    def load(self, url: str) -> tuple[bytes, str | None] | None:
+        """
+        Load the cached body of a URL after the server answered 304 Not Modified.
+
+        :param url: The URL that was requested.
+        :return tuple: The cached body and its Content-Type, or None if it is no longer cached.
+        """
+
+        with self._lock:
+            row: tuple | None = self._connection.execute('SELECT digest, content_type FROM responses WHERE url = ?', (url,)).fetchone()
+
+            if row is not None:
+                self._connection.execute('UPDATE responses SET accessed = ? WHERE url = ?', (time.time(), url))
+
+        if row is None:
+            return None
+
+        try:
+            with open(self.body_path(row[0]), 'rb') as file:
+                body: bytes = file.read()
+        except OSError:
+            return None
+
+        with self._lock:
+            self.hits += 1
+            self.bytes_saved += len(body)
+
+        return body, row[1]
+
+    def store(self, url: str, body: bytes, headers: dict) -> None:
+        """
+        Store a full response body and its validators.
+
+        :param url: The URL that was requested.
+        :param body: The response body.
+        :param headers: The response headers.
+        :return None:
+        """
+
+        with self._lock:
+            self.misses += 1
+
+        etag: str | None = headers.get('ETag')
+        last_modified: str | None = headers.get('Last-Modified')
+
+        if etag is None and last_modified is None:
+            return
+
+        digest: str = hashlib.sha256(body).hexdigest()
+        body_path: str = self.body_path(digest)
+
+        if not os.path.exists(body_path):
+            os.makedirs(os.path.dirname(body_path), exist_ok=True)
+            temporary_path: str = f'{body_path}.{threading.get_ident()}.tmp'
+
+            with open(temporary_path, 'wb') as file:
+                file.write(body)
+
+            os.replace(temporary_path, body_path)
+
+        with self._lock:
+            self._connection.execute('INSERT OR REPLACE INTO responses (url, digest, size, content_type, etag, last_modified, accessed) VALUES (?, ?, ?, ?, ?, ?, ?)', (url, digest, len(body), headers.get('Content-Type'), etag, last_modified, time.time()))
+            self._connection.commit()
+
+    def forget(self, url: str) -> None:
+        """
+        Drop the validators of a URL, so it is requested again without conditional headers.
+
+        :param url: The URL whose cached body is gone.
+        :return None:
+        """
+
+        with self._lock:
+            self._connection.execute('DELETE FROM responses WHERE url = ?', (url,))
+            self._connection.commit()
+
+    def close(self) -> None:
+        """
+        Evict the least recently used bodies beyond the size limit and close the index.
+
+        :return None:
+        """
+
+        with self._lock:
+            digests: list[tuple[str, int]] = self._connection.execute('SELECT digest, MAX(size) FROM responses GROUP BY digest ORDER BY MAX(accessed) DESC').fetchall()
+            kept_digests: set[str] = set()
+            total_size: int = 0
+
+            for digest, size in digests:
+                total_size += size
+
+                if total_size > self.max_size:
+                    self._connection.execute('DELETE FROM responses WHERE digest = ?', (digest,))
+                else:
+                    kept_digests.add(digest)
+
+            self._connection.commit()
+            self._connection.close()
+
+        for root, _, files in os.walk(os.path.join(self.cache_dir, 'bodies'), topdown=False):
+            for file_name in files:
+                if file_name not in kept_digests:
+                    os.remove(os.path.join(root, file_name))
+
+            if root != os.path.join(self.cache_dir, 'bodies') and os.listdir(root) == []:
+                os.rmdir(root)
+
+    def summary(self) -> str:
+        """
+        Summarize the cache hits and misses of this run.
+
+        :return str: The summary text.
+        """
+
+        requests_count: int = self.hits + self.misses
+        hit_rate: float = self.hits / requests_count * 100 if requests_count > 0 else 0.0
+
+        return f'HTTP cache: {self.hits} hits, {self.misses} misses ({hit_rate:.1f}% hit rate) | {self.bytes_saved / 1048576:.2f} MB not re-downloaded'
+
+
+def set_response_cache(cache: ResponseCache | None) -> None:
+    """
+    Select the response cache used by attempt_connection and attempt_connection_async.
+
+    :param cache: The response cache, or None to disable caching.
+    :return None:
+    """
+
+    global response_cache
+    response_cache = cache
+
+
+def content_type_headers(content_type: str | None) -> requests.structures.CaseInsensitiveDict:
+    """
+    Build the headers of a stored response from its Content-Type, so its declared charset is found like in a live response.
+
+    :param content_type: The stored Content-Type header, or None if the server sent none.
+    :return requests.structures.CaseInsensitiveDict: The response headers.
+    """
+
+    headers: requests.structures.CaseInsensitiveDict = requests.structures.CaseInsensitiveDict()
+
+    if content_type is not None:
+        headers['Content-Type'] = content_type
+
+    return headers
+
+
+def cached_response(url: str, body: bytes, content_type: str | None) -> requests.Response:
+    """
+    Build a response object from a cached body.
+
+    :param url: The URL that was requested.
+    :param body: The cached body.
+    :param content_type: The cached Content-Type header.
+    :return requests.Response: A 200 response with the cached body.
+    """
+
+    response: requests.Response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response._content = body
+    response.headers = content_type_headers(content_type)
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+
+    return response
+
+
+class RateController:
+    """
+    Share one adaptive request rate between every worker of the process.
+
+    Requests take tokens from a token bucket. The rate grows additively while
+    responses are fast and successful, and is halved (at most once per cooldown)
+    on timeouts, connection errors, 429/5xx responses or slow responses.
+    """
+
+    def __init__(self, initial_rate: float = 50.0, min_rate: float = 1.0, max_rate: float = 1000.0, target_latency: float = 2.0, increase: float = 10.0, cooldown: float = 1.0) -> None:
+        """
+        Initialize the rate controller.
+
+        :param initial_rate: The starting rate in requests per second.
+        :param min_rate: The lowest rate in requests per second.
+        :param max_rate: The highest rate in requests per second.
+        :param target_latency: The response time in seconds above which the rate is decreased.
+        :param increase: The number of requests per second the rate grows by per second of healthy responses.
+        :param cooldown: The minimum number of seconds between two decreases.
+        :return None:
+        """
+
+        self.rate: float = min(max(initial_rate, min_rate), max_rate)
+        self.min_rate: float = min_rate
+        self.max_rate: float = max_rate
+        self.target_latency: float = target_latency
+        self.increase: float = increase
+        self.cooldown: float = cooldown
+
+        self.decreases: int = 0
+        self.peak_rate: float = self.rate
+
+        self._tokens: float = 1.0
+        self._updated: float = time.monotonic()
+        self._last_decrease: float = 0.0
+        self._paused_until: float = 0.0
+        self._lock: threading.Lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Take a token from the bucket.
+
+        :return float: The number of seconds to wait before sending the request.
+        """
+
+        with self._lock:
+            now: float = time.monotonic()
+
+            self._tokens = min(max(self.rate, 1.0), self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+
+            delay: float = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+            return max(delay, self._paused_until - now)
+
+    def acquire(self) -> None:
+        """
+        Wait for a token in a worker thread.
+
+        :return None:
+        """
+
+        delay: float = self.reserve()
+
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        """
+        Wait for a token without blocking the event loop.
+
+        :return None:
+        """
+
+        delay: float = self.reserve()
+
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def record(self, latency: float | None, status: int | None, retry_after: float | None = None) -> None:
+        """
+        Adapt the rate to the outcome of a request.
+
+        :param latency: The response time in seconds, or None if the request failed or timed out.
+        :param status: The HTTP status code, or None if the request failed or timed out.
+        :param retry_after: The number of seconds the server asked to wait, if any.
+        :return None:
+        """
+
+        with self._lock:
+            now: float = time.monotonic()
+            congested: bool = latency is None or status == 429 or (status is not None and status >= 500) or latency > self.target_latency
+
+            if retry_after is not None:
+                self._paused_until = max(self._paused_until, now + retry_after)
+
+            if not congested:
+                self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+                self.peak_rate = max(self.peak_rate, self.rate)
+
+            elif now - self._last_decrease >= self.cooldown:
+                self.rate = max(self.min_rate, self.rate / 2)
+                self._last_decrease = now
+                self.decreases += 1
+
+    def summary(self) -> str:
+        """
+        Summarize the rate adaptation of this run.
+
+        :return str: The summary text.
+        """
+
+        return f'Request rate: {self.rate:.1f} req/s at the end | {self.peak_rate:.1f} req/s peak | {self.decreases} slowdowns'
+
+
+def set_rate_controller(controller: RateController | None) -> None:
+    """
+    Select the rate controller used by attempt_connection and attempt_connection_async.
+
+    :param controller: The rate controller, or None to disable rate limiting.
+    :return None:
+    """
+
+    global rate_controller
+    rate_controller = controller
+
+
+class RunMetrics:
+    """
+    Collect per-stage timings and HTTP and worker counters for a run.
+
+    Every stage keeps a latency histogram so the run report can show whether a
+    slow run is bound by the rate limit (throttle), the network (fetch), the
+    interpreter (parse, clean) or the disk (write, commit, export, package).
+    """
+
+    # upper bounds in seconds of the latency histogram buckets, the last bucket being unbounded
+    BUCKETS: tuple = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    def __init__(self) -> None:
+        """
+        Initialize the run metrics.
+
+        :return None:
+        """
+
+        self.start_time: float = time.monotonic()
+        self.start_cpu_time: float = time.process_time()
+        self.stages: dict = {}
+        self.status_counts: dict = {}
+        self.bytes_received: int = 0
+        self.retries: int = 0
+        self.workers: dict = {}
+
+        self._lock: threading.Lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float) -> None:
+        """
+        Record the duration of one run of a stage.
+
+        :param stage: The name of the stage.
+        :param seconds: The duration in seconds.
+        :return None:
+        """
+
+        bucket: int = len(self.BUCKETS)
+
+        for i in range(len(self.BUCKETS)):
+            if seconds <= self.BUCKETS[i]:
+                bucket = i
+                break
+
+        with self._lock:
+            stage_metrics: dict = self.stages.setdefault(stage, {'count': 0, 'seconds': 0.0, 'buckets': [0] * (len(self.BUCKETS) + 1)})
+
+            stage_metrics['count'] += 1
+            stage_metrics['seconds'] += seconds
+            stage_metrics['buckets'][bucket] += 1
+
+    def add_response(self, status: int | None, size: int) -> None:
+        """
+        Record a response, or a request that failed without one.
+
+        :param status: The HTTP status code, or None if the request failed or timed out.
+        :param size: The number of body bytes received.
+        :return None:
+        """
+
+        key: str = str(status) if status is not None else 'error'
+
+        with self._lock:
+            self.status_counts[key] = self.status_counts.get(key, 0) + 1
+            self.bytes_received += size
+
+    def add_retry(self) -> None:
+        """
+        Record a retried request.
+
+        :return None:
+        """
+
+        with self._lock:
+            self.retries += 1
+
+    def start_worker(self, worker: str) -> None:
+        """
+        Register a worker so its throughput is measured from now on.
+
+        :param worker: The name of the worker.
+        :return None:
+        """
+
+        with self._lock:
+            self.workers[worker] = {'pages': 0, 'start_time': time.monotonic(), 'last_time': time.monotonic()}
+
+    def add_worker_page(self, worker: str) -> None:
+        """
+        Record a link scraped by a worker.
+
+        :param worker: The name of the worker.
+        :return None:
+        """
+
+        with self._lock:
+            worker_metrics: dict = self.workers[worker]
+
+            worker_metrics['pages'] += 1
+            worker_metrics['last_time'] = time.monotonic()
+
+    def _quantile(self, stage_metrics: dict, quantile: float) -> float | None:
+        target: float = quantile * stage_metrics['count']
+        cumulative: int = 0
+
+        for i in range(len(stage_metrics['buckets'])):
+            cumulative += stage_metrics['buckets'][i]
+
+            if cumulative >= target:
+                return self.BUCKETS[i] * 1000 if i < len(self.BUCKETS) else None
+
+        return None
+
+    def report(self) -> dict:
+        """
+        Build the machine-readable run report.
+
+        Quantiles are the upper bound of the histogram bucket they fall in, or
+        None when they fall in the unbounded bucket.
+
+        :return dict: The run report.
+        """
+
+        with self._lock:
+            wall_seconds: float = time.monotonic() - self.start_time
+            cpu_seconds: float = time.process_time() - self.start_cpu_time
+            stages: dict = {}
+            workers: dict = {}
+
+            for stage, stage_metrics in self.stages.items():
+                stages[stage] = {
+                    'count': stage_metrics['count'],
+                    'total_seconds': round(stage_metrics['seconds'], 6),
+                    'mean_ms': round(stage_metrics['seconds'] * 1000 / stage_metrics['count'], 3),
+                    'p50_ms': self._quantile(stage_metrics, 0.5),
+                    'p95_ms': self._quantile(stage_metrics, 0.95),
+                    'p99_ms': self._quantile(stage_metrics, 0.99),
+                    'histogram': {str(bound): count for bound, count in zip(list(self.BUCKETS) + ['inf'], stage_metrics['buckets'])}
+                }
+
+            for worker, worker_metrics in self.workers.items():
+                seconds: float = worker_metrics['last_time'] - worker_metrics['start_time']
+
+                workers[worker] = {
+                    'pages': worker_metrics['pages'],
+                    'seconds': round(seconds, 3),
+                    'pages_per_second': round(worker_metrics['pages'] / seconds, 3) if seconds > 0 else 0.0
+                }
+
+            return {
+                'wall_seconds': round(wall_seconds, 3),
+                'cpu_seconds': round(cpu_seconds, 3),
+                'cpu_utilization': round(cpu_seconds / wall_seconds, 3) if wall_seconds > 0 else 0.0,
+                'stages': stages,
+                'http': {
+                    'responses': sum(self.status_counts.values()),
+                    'status_counts': dict(self.status_counts),
+                    'bytes_received': self.bytes_received,
+                    'retries': self.retries
+                },
+                'workers': workers
+            }
+
+    def prometheus(self) -> str:
+        """
+        Render the run metrics in the Prometheus text exposition format.
+
+        :return str: The metrics text.
+        """
+
+        report: dict = self.report()
+        lines: list[str] = [
+            '# TYPE lexicon_run_wall_seconds gauge',
+            f'lexicon_run_wall_seconds {report["wall_seconds"]}',
+            '# TYPE lexicon_run_cpu_seconds gauge',
+            f'lexicon_run_cpu_seconds {report["cpu_seconds"]}',
+            '# TYPE lexicon_stage_seconds histogram'
+        ]
+
+        with self._lock:
+            for stage, stage_metrics in self.stages.items():
+                cumulative: int = 0
+
+                for bound, count in zip(list(self.BUCKETS) + ['+Inf'], stage_metrics['buckets']):
+                    cumulative += count
+                    lines.append(f'lexicon_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+
+                lines.append(f'lexicon_stage_seconds_sum{{stage="{stage}"}} {stage_metrics["seconds"]}')
+                lines.append(f'lexicon_stage_seconds_count{{stage="{stage}"}} {stage_metrics["count"]}')
+
+        lines.append('# TYPE lexicon_http_responses_total counter')
+
+        for status, count in report['http']['status_counts'].items():
+            lines.append(f'lexicon_http_responses_total{{status="{status}"}} {count}')
+
+        lines += [
+            '# TYPE lexicon_http_received_bytes_total counter',
+            f'lexicon_http_received_bytes_total {report["http"]["bytes_received"]}',
+            '# TYPE lexicon_http_retries_total counter',
+            f'lexicon_http_retries_total {report["http"]["retries"]}',
+            '# TYPE lexicon_worker_pages_total counter'
+        ]
+
+        for worker, worker_metrics in report['workers'].items():
+            lines.append(f'lexicon_worker_pages_total{{worker="{worker}"}} {worker_metrics["pages"]}')
+
+        return '\n'.join(lines) + '\n'
+
+    def summary(self) -> str:
+        """
+        Summarize the time spent in every stage of this run.
+
+        :return str: The summary text.
+        """
+
+        report: dict = self.report()
+        lines: list[str] = [f'{stage}: {stage_report["count"]} runs | {stage_report["mean_ms"]:.1f} ms mean | {stage_report["total_seconds"]:.2f} s total' for stage, stage_report in report['stages'].items()]
+
+        lines.append(f'HTTP: {report["http"]["responses"]} responses | {report["http"]["bytes_received"] / 1048576:.1f} MB received | {report["http"]["retries"]} retries | CPU utilization {report["cpu_utilization"]:.2f}')
+
+        return '\n'.join(lines)
+
+
+def set_run_metrics(metrics: RunMetrics | None) -> None:
+    """
+    Select the run metrics the crawl records its stages and counters in.
+
+    :param metrics: The run metrics, or None to disable recording.
+    :return None:
+    """
+
+    global run_metrics
+    run_metrics = metrics
+
+
+@contextlib.contextmanager
+def measure(stage: str):
+    """
+    Time the enclosed block as one run of a stage of the run metrics, if any are recorded.
+
+    :param stage: The name of the stage.
+    """
+
+    metrics: RunMetrics | None = run_metrics
+
+    if metrics is None:
+        yield
+        return
+
+    start_time: float = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        metrics.observe(stage, time.perf_counter() - start_time)
+
+
+class HttpTransport:
+    """
+    Share one pooled keep-alive HTTP transport between every worker and count its connection reuse and transferred bytes.
+
+    Every thread of the thread engine gets its own requests session, since
+    sessions are not thread-safe, and every session is mounted on the same
+    pooled adapter. The async engine opens its aiohttp session from the same
+    transport. Both negotiate compressed transfer, with brotli when it is
+    installed. Connections are counted as they are opened, so those of pools
+    the pool manager evicted still count.
+    """
+
+    def __init__(self, pool_size: int, keepalive_timeout: float = 30.0) -> None:
+        """
+        Initialize the HTTP transport.
+
+        :param pool_size: The maximum number of connections kept open per host, usually the number of workers.
+        :param keepalive_timeout: The number of seconds an idle async connection is kept open.
+        :return None:
+        """
+
+        self.pool_size: int = pool_size
+        self.keepalive_timeout: float = keepalive_timeout
+        self.requests: int = 0
+        self.wire_bytes: int = 0
+        self.body_bytes: int = 0
+        self.async_connections: int = 0
+        self.async_reused: int = 0
+
+        self.connections: int = 0
+
+        self._lock: threading.Lock = threading.Lock()
+        self._sessions: threading.local = threading.local()
+        self._adapter: requests.adapters.HTTPAdapter = requests.adapters.HTTPAdapter(pool_maxsize=pool_size)
+        self._adapter.poolmanager.pool_classes_by_scheme = self._pool_classes()
+
+    @property
+    def session(self) -> requests.Session:
+        """
+        Get the requests session of the calling thread, mounted on the shared pooled adapter.
+
+        :return requests.Session: The session of the calling thread.
+        """
+
+        session: requests.Session | None = getattr(self._sessions, 'session', None)
+
+        if session is None:
+            session = requests.Session()
+            session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+            session.mount('http://', self._adapter)
+            session.mount('https://', self._adapter)
+
+            self._sessions.session = session
+
+        return session
+
+    def _pool_classes(self) -> dict:
+        transport: HttpTransport = self
+
+        class CountingHTTPConnectionPool(urllib3.HTTPConnectionPool):
+            def _new_conn(self):
+                with transport._lock:
+                    transport.connections += 1
+
+                return super()._new_conn()
+
+        class CountingHTTPSConnectionPool(urllib3.HTTPSConnectionPool):
+            def _new_conn(self):
+                with transport._lock:
+                    transport.connections += 1
+
+                return super()._new_conn()
+
+        return {'http': CountingHTTPConnectionPool, 'https': CountingHTTPSConnectionPool}
+
+    def client_session(self) -> 'aiohttp.ClientSession':
+        """
+        Open an aiohttp session pooled and traced by this transport.
+
+        :return aiohttp.ClientSession: The session, to be closed by the caller.
+        """
+
+        async def connection_created(session, context, params) -> None:
+            with self._lock:
+                self.async_connections += 1
+
+        async def connection_reused(session, context, params) -> None:
+            with self._lock:
+                self.async_reused += 1
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_end.append(connection_created)
+        trace_config.on_connection_reuseconn.append(connection_reused)
+
+        connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=self.keepalive_timeout)
+
+        return aiohttp.ClientSession(connector=connector, headers={'Accept-Encoding': ACCEPT_ENCODING}, trace_configs=[trace_config])
+
+    def record(self, wire_bytes: int, body_bytes: int) -> None:
+        """
+        Record the size of a response.
+
+        :param wire_bytes: The number of body bytes transferred, before decompression.
+        :param body_bytes: The number of body bytes after decompression.
+        :return None:
+        """
+
+        with self._lock:
+            self.requests += 1
+            self.wire_bytes += wire_bytes
+            self.body_bytes += body_bytes
+
+    def connections_opened(self) -> int:
+        """
+        Count the connections opened so far by both engines.
+
+        :return int: The number of connections opened.
+        """
+
+        with self._lock:
+            return self.async_connections + self.connections
+
+    def stats(self) -> dict:
+        """
+        Get the connection and transfer statistics of this transport.
+
+        :return dict: The statistics.
+        """
+
+        with self._lock:
+            request_count: int = self.requests
+            wire_bytes: int = self.wire_bytes
+            body_bytes: int = self.body_bytes
+
+        connections: int = self.connections_opened()
+
+        return {
+            'requests': request_count,
+            'connections_opened': connections,
+            'reuse_ratio': round(1 - connections / request_count, 4) if request_count > 0 else 0.0,
+            'wire_bytes': wire_bytes,
+            'body_bytes': body_bytes,
+            'accept_encoding': ACCEPT_ENCODING
+        }
+
+    def summary(self) -> str:
+        """
+        Summarize the connection reuse and transferred bytes of this run.
+
+        :return str: The summary text.
+        """
+
+        stats: dict = self.stats()
+
+        return f'HTTP transport: {stats["connections_opened"]} connections for {stats["requests"]} responses ({stats["reuse_ratio"] * 100:.1f}% reused) | {stats["wire_bytes"] / 1048576:.2f} MB on the wire for {stats["body_bytes"] / 1048576:.2f} MB of pages'
+
+    def close(self) -> None:
+        """
+        Close the pooled connections of the thread engine.
+
+        :return None:
+        """
+
+        self._adapter.close()
+
+
+def set_http_transport(transport: HttpTransport | None) -> None:
+    """
+    Select the HTTP transport shared by the scraping and discovery workers.
+
+    :param transport: The HTTP transport, or None to give every worker its own session.
+    :return None:
+    """
+
+    global http_transport
+    http_transport = transport
+
+
+def set_page_recorder(recorder: page_archive.PageRecorder | None) -> None:
+    """
+    Select the page archive the bodies fetched by attempt_connection and attempt_connection_async are recorded to.
+
+    :param recorder: The page recorder, or None to stop recording.
+    :return None:
+    """
+
+    global page_recorder
+    page_recorder = recorder
+
+
+def retry_after_seconds(headers: dict) -> float | None:
+    """
+    Read the Retry-After header of a response.
+
+    :param headers: The response headers.
+    :return float | None: The number of seconds to wait, or None if the header is missing or is a date.
+    """
+
+    value: str | None = headers.get('Retry-After')
+
+    if value is None or not value.strip().isdigit():
+        return None
+
+    return float(value.strip())
+
+
+def backoff_delay(retry_count: int, base: float = 0.5, cap: float = 30.0) -> float:
+    """
+    Get a jittered exponential backoff delay.
+
+    :param retry_count: The current retry count.
+    :param base: The delay of the first retry in seconds.
+    :param cap: The maximum delay in seconds.
+    :return float: A random delay between 0 and the capped exponential delay.
+    """
+
+    return random.uniform(0, min(cap, base * 2 ** (retry_count - 1)))
+
+
+def attempt_connection(url: str, session: requests.Session, max_retry_count: int, retry_count: int = 0) -> requests.Response | None:
+    """
+    Attempt to connect to the given URL.
+
+    :param url: The URL to connect to.
+    :param session: The requests session to use.
+    :param max_retry_count: The maximum number of times to retry a connection before giving up.
+    :param retry_count: The current retry count.
+    :return requests.Response: The response object.
+    """
+
+    if max_retry_count < retry_count:
+        print(f'Maximum retry count reached for {url}. Skipping...')
+        return None
+    
+    elif retry_count > 0:
+        print(f'Request failed, retrying {url}...')
+
+        if run_metrics is not None:
+            run_metrics.add_retry()
+
+        time.sleep(backoff_delay(retry_count))
+
+    cache: ResponseCache | None = response_cache
+    controller: RateController | None = rate_controller
+    metrics: RunMetrics | None = run_metrics
+    transport: HttpTransport | None = http_transport
+    recorder: page_archive.PageRecorder | None = page_recorder
+    headers: dict = cache.conditional_headers(url) if cache is not None else {}
+
+    if controller is not None:
+        with measure('throttle'):
+            controller.acquire()
+
+    request_start: float = time.monotonic()
+
+    try:
+        response: requests.Response = session.get(url, headers=headers, timeout=request_timeout)
+    except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+        if controller is not None:
+            controller.record(None, None)
+
+        if metrics is not None:
+            metrics.observe('fetch', time.monotonic() - request_start)
+            metrics.add_response(None, 0)
+
+        return attempt_connection(url, session, max_retry_count, retry_count+1)
+
+    if controller is not None:
+        controller.record(time.monotonic() - request_start, response.status_code, retry_after_seconds(response.headers))
+
+    if metrics is not None:
+        metrics.observe('fetch', time.monotonic() - request_start)
+        metrics.add_response(response.status_code, len(response.content))
+
+    if transport is not None:
+        transport.record(response.raw.tell(), len(response.content))
+
+    if response.status_code == 429 or response.status_code >= 500:
+        return attempt_connection(url, session, max_retry_count, retry_count+1)
+
+    if cache is not None:
+        if response.status_code == 304:
+            cached: tuple[bytes, str | None] | None = cache.load(url)
+
+            if cached is not None:
+                if recorder is not None:
+                    recorder.record(url, *cached)
+
+                return cached_response(url, *cached)
+
+            # The body was evicted since the validators were sent. Counting this
+            # as a retry stops a server that keeps answering 304 from looping.
+            cache.forget(url)
+
+            return attempt_connection(url, session, max_retry_count, retry_count+1)
+
+        if response.status_code == 200:
+            cache.store(url, response.content, response.headers)
+
+    if recorder is not None and response.status_code == 200:
+        recorder.record(url, response.content, response.headers.get('Content-Type'))
+    
+    return response
+
+
+def decode_body(body: bytes, headers: dict) -> str:
+    """
+    Decode a response body the same way requests.Response.text does.
+
+    :param body: The raw response body.
+    :param headers: The case-insensitive response headers.
+    :return str: The decoded response body.
+    """
+
+    encoding: str | None = requests.utils.get_encoding_from_headers(headers)
+
+    if encoding is None:
+        encoding = requests.compat.chardet.detect(body)['encoding'] or 'utf-8'
+
+    try:
+        return str(body, encoding, errors='replace')
+    except LookupError:
+        return str(body, errors='replace')
+
+
+async def attempt_connection_async(url: str, session: 'aiohttp.ClientSession', max_retry_count: int, retry_count: int = 0) -> str | None:
+    """
+    Attempt to connect to the given URL without blocking the event loop.
+
+    :param url: The URL to connect to.
+    :param session: The aiohttp session to use.
+    :param max_retry_count: The maximum number of times to retry a connection before giving up.
+    :param retry_count: The current retry count.
+    :return str: The response body.
+    """
+
+    if max_retry_count < retry_count:
+        print(f'Maximum retry count reached for {url}. Skipping...')
+        return None
+    
+    elif retry_count > 0:
+        print(f'Request failed, retrying {url}...')
+
+        if run_metrics is not None:
+            run_metrics.add_retry()
+
+        await asyncio.sleep(backoff_delay(retry_count))
+
+    cache: ResponseCache | None = response_cache
+    controller: RateController | None = rate_controller
+    metrics: RunMetrics | None = run_metrics
+    transport: HttpTransport | None = http_transport
+    recorder: page_archive.PageRecorder | None = page_recorder
+    headers: dict = cache.conditional_headers(url) if cache is not None else {}
+
+    if controller is not None:
+        with measure('throttle'):
+            await controller.acquire_async()
+
+    request_start: float = time.monotonic()
+
+    try:
+        async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=request_timeout)) as response:
+            if controller is not None:
+                controller.record(time.monotonic() - request_start, response.status, retry_after_seconds(response.headers))
+
+            body: bytes = await response.read()
+
+            if metrics is not None:
+                metrics.observe('fetch', time.monotonic() - request_start)
+                metrics.add_response(response.status, len(body))
+
+            if transport is not None:
+                transport.record(response.content_length if response.content_length is not None else len(body), len(body))
+
+            if response.status == 429 or response.status >= 500:
+                return await attempt_connection_async(url, session, max_retry_count, retry_count+1)
+
+            if cache is not None and response.status == 304:
+                cached: tuple[bytes, str | None] | None = cache.load(url)
+
+                if cached is not None:
+                    if recorder is not None:
+                        recorder.record(url, *cached)
+
+                    return decode_body(cached[0], content_type_headers(cached[1]))
+
+                cache.forget(url)
+
+                return await attempt_connection_async(url, session, max_retry_count, retry_count+1)
+
+            if cache is not None and response.status == 200:
+                cache.store(url, body, response.headers)
+
+            if recorder is not None and response.status == 200:
+                recorder.record(url, body, response.headers.get('Content-Type'))
+
+            return decode_body(body, response.headers)
+    except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+        if controller is not None:
+            controller.record(None, None)
+
+        if metrics is not None:
+            metrics.observe('fetch', time.monotonic() - request_start)
+            metrics.add_response(None, 0)
+
+        return await attempt_connection_async(url, session, max_retry_count, retry_count+1)
+
+
+def set_parser_backend(backend: str) -> None:
+    """
+    Select the backend used by the parse functions in this process.
+
+    :param backend: The parser backend, one of PARSER_BACKENDS.
+    :return None:
+    """
+
+    global parser_backend
+
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f'Unknown parser backend: {backend}')
+
+    if backend == 'lxml' and lxml is None:
+        raise ImportError('The lxml parser backend requires lxml. Please install it with: pip install lxml')
+
+    parser_backend = backend
+
+
+def make_soup(html: str, strainer: bs4.SoupStrainer) -> bs4.BeautifulSoup:
+    """
+    Build a BeautifulSoup tree, restricted to the strainer when the strainer backend is selected.
+
+    :param html: The HTML to parse.
+    :param strainer: The strainer matching the elements the caller needs.
+    :return bs4.BeautifulSoup: The parsed tree.
+    """
+
+    if parser_backend == 'strainer':
+        return bs4.BeautifulSoup(html, 'html.parser', parse_only=strainer)
+
+    return bs4.BeautifulSoup(html, 'html.parser')
+
+
+def lxml_document(html: str):
+    """
+    Build an lxml document, or None if lxml cannot parse the page so the caller falls back to BeautifulSoup.
+
+    lxml refuses a decoded page that still carries an XML encoding declaration,
+    so the declaration is dropped first.
+
+    :param html: The HTML to parse.
+    :return lxml.html.HtmlElement | None: The root of the parsed document.
+    """
+
+    if html.lstrip().startswith('<?xml') and '?>' in html:
+        html = html[html.index('?>') + 2:]
+
+    try:
+        return lxml.html.document_fromstring(html)
+    except (lxml.etree.ParserError, ValueError):
+        return None
+
+
+def lxml_find_all(element, tag: str, class_name: str) -> list:
+    """
+    Find all descendants with the given tag and class, like BeautifulSoup's find_all.
+
+    :param element: The lxml element to search in.
+    :param tag: The tag name to match.
+    :param class_name: The class to match.
+    :return list: The matching elements in document order.
+    """
+
+    return element.xpath(f".//{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')]")
+
+
+def extract_word_page(html: str) -> tuple[str | None, list[str] | None, str | None]:
+    """
+    Extract the raw title, definition and identification texts from a definition page.
+
+    :param html: The HTML of the definition page.
+    :return tuple: The title text, the text of every definition and the identification text (None when missing).
+    """
+
+    document = lxml_document(html) if parser_backend == 'lxml' else None
+
+    if document is not None:
+        titles: list = lxml_find_all(document, 'div', 'flash_card_title')
+        english_defs: list = lxml_find_all(document, 'ol', 'flash_card_english_def')
+        identifications: list = lxml_find_all(document, 'div', 'main_identification')
+
+        title_text: str | None = str(titles[0].text_content()) if titles else None
+        definition_texts: list[str] | None = [str(li.text_content()) for li in english_defs[0].iter('li')] if english_defs else None
+        identification_text: str | None = str(identifications[0].text_content()) if identifications else None
+
+        return title_text, definition_texts, identification_text
+
+    soup: bs4.BeautifulSoup = make_soup(html, WORD_STRAINER)
+
+    flash_card_title = soup.find('div', {'class': 'flash_card_title'})
+    flash_card_english_def = soup.find('ol', {'class': 'flash_card_english_def'})
+    identification = soup.find('div', {'class': 'main_identification'})
+
+    title_text = flash_card_title.text if flash_card_title else None
+    definition_texts = [li.text for li in flash_card_english_def.find_all('li')] if flash_card_english_def else None
+    identification_text = identification.text if identification else None
+
+    return title_text, definition_texts, identification_text
+
+
+def extract_paradigm_tables(html: str) -> list[list[list[str]]]:
+    """
+    Extract the cell texts of every paradigm table from a paradigm page.
+
+    :param html: The HTML of the paradigm page.
+    :return list: One list of rows per paradigm container, each row being a list of cell texts.
+    """
+
+    document = lxml_document(html) if parser_backend == 'lxml' else None
+
+    if document is not None:
+        return [[[str(cell.text_content()) for cell in row.iter('td')] for row in container.iter('tr')] for container in lxml_find_all(document, 'div', 'noun_paradigm_container')]
+
+    soup: bs4.BeautifulSoup = make_soup(html, PARADIGM_STRAINER)
+
+    paradigm_containers: bs4.element.ResultSet = soup.find_all('div', {'class': 'noun_paradigm_container'})
+
+    return [[[cell.text for cell in row.find_all('td')] for row in container.find_all('tr')] for container in paradigm_containers]
+
+
+def extract_hrefs(html: str) -> list[str | None]:
+    """
+    Extract the href of every anchor from a page.
+
+    :param html: The HTML of the page.
+    :return list: The href of every anchor in document order (None when missing).
+    """
+
+    document = lxml_document(html) if parser_backend == 'lxml' else None
+
+    if document is not None:
+        return [str(href) if href is not None else None for href in (a.get('href') for a in document.iter('a'))]
+
+    soup: bs4.BeautifulSoup = make_soup(html, LINK_STRAINER)
+
+    return [a.get('href') for a in soup.find_all('a')]
+
+
+def parse_word_info(html: str) -> dict:
+    """
+    Parse the word information from a definition page.
+
+    :param html: The HTML of the definition page.
+    :return dict: A dictionary containing the word information.
+    """
+
+    title_text, definition_texts, identification_text = extract_word_page(html)
+
+    if title_text is None or definition_texts is None:
+        return {}
+    
+    orthography_id = None
+
+    if identification_text is not None:
+        orthography_id: int = int(identification_text.strip().replace('Orthography ID = ', ''))
+
+    with measure('clean'):
+        cleaned_title = title_cleaner(title_text)
+        definitions: list = [definition for cleaned_definition in definition_batch_cleaner(definition_texts) for definition in cleaned_definition]
+
+    return {
+        'orthography_id': orthography_id,
+        'title(s)': cleaned_title,
+        'definitions': definitions
+    }
+
+
+def run_parser(parser_pool: concurrent.futures.ProcessPoolExecutor | None, parser, html: str):
+    """
+    Run a page parser, either in the calling thread or in the parser process pool.
+
+    :param parser_pool: The process pool to parse in, or None to parse in the calling thread.
+    :param parser: The parse function to run (parse_word_info, parse_paradigm_info or parse_word_links).
+    :param html: The HTML of the page to parse.
+    :return: The result of the parse function.
+    """
+
+    with measure('parse'):
+        if parser_pool is None:
+            return parser(html)
+
+        return parser_pool.submit(parser, html).result()
+
+
+async def run_parser_async(parser_pool: concurrent.futures.ProcessPoolExecutor | None, parser, html: str):
+    """
+    Run a page parser without blocking the event loop when a parser process pool is given.
+
+    :param parser_pool: The process pool to parse in, or None to parse in the event loop.
+    :param parser: The parse function to run (parse_word_info, parse_paradigm_info or parse_word_links).
+    :param html: The HTML of the page to parse.
+    :return: The result of the parse function.
+    """
+
+    with measure('parse'):
+        if parser_pool is None:
+            return parser(html)
+
+        return await asyncio.get_running_loop().run_in_executor(parser_pool, parser, html)
+
+
+def get_word_info(url: str, session: requests.Session, max_retry_count:int, retry_count: int = 0, parser_pool: concurrent.futures.ProcessPoolExecutor | None = None) -> dict:
+    """
+    Get the word information from the given URL.
+
+    :param url: The URL of the page to scrape.
+    :param session: The requests session to use.
+    :param max_retry_count: The maximum number of times to retry a connection before giving up.
+    :param retry_count: The current retry count.
+    :param parser_pool: The process pool to parse the page in, or None to parse in the calling thread.
+    :return dict: A dictionary containing the word information.
+    """
+
+    response: requests.Response | None = attempt_connection(url, session, max_retry_count, retry_count)
+
+    if response is None:
+        return {}
+    
+    return run_parser(parser_pool, parse_word_info, response.text)
+
+
+def parse_paradigm_info(html: str) -> dict:
+    """
+    Parse the paradigm information from a paradigm page.
+
+    :param html: The HTML of the paradigm page.
+    :return dict: A dictionary containing the paradigm information.
+    """
+
+    paradigm_tables: list[list[list[str]]] = extract_paradigm_tables(html)
+    paradigm_container_count: int = len(paradigm_tables)
+
+    paradigm_info: dict = {'forms' : paradigm_container_count}
+
+    with measure('clean'):
+        for i in range(paradigm_container_count):
+            rows: list[list[str]] = paradigm_tables[i]
+            table_dictionary: dict = {}
+
+            columns: list[str] = [cell.strip().lower() for cell in rows[0][1:]]
+
+            for column in columns:
+                table_dictionary[column] = {}
+
+            for r in range(1, len(rows)):
+                cells: list[str] = rows[r]
+
+                row_header: str = cells[0].strip().lower()
+
+                for c, cleaned_cell in enumerate(definition_batch_cleaner(cells[1:])):
+                    table_dictionary[columns[c]][row_header] = cleaned_cell
+
+            paradigm_info[str(i)] = table_dictionary
+
+    return paradigm_info
+
+
+def get_paradigm_info(url: str, session: requests.Session, max_retry_count: int, retry_count: int = 0, parser_pool: concurrent.futures.ProcessPoolExecutor | None = None) -> dict:
+    """
+    Get the paradigm information from the given URL.
+
+    :param url: The URL of the page to scrape.
+    :param session: The requests session to use.
+    :param max_retry_count: The maximum number of times to retry a connection before giving up.
+    :param retry_count: The current retry count.
+    :param parser_pool: The process pool to parse the page in, or None to parse in the calling thread.
+    :return dict: A dictionary containing the paradigm information.
+    """
+
+    response: requests.Response | None = attempt_connection(url, session, max_retry_count, retry_count)
+
+    if response is None:
+        return {}
+    
+    return run_parser(parser_pool, parse_paradigm_info, response.text)
+
+
+def parse_word_links(html: str) -> list[str] | list:
+    """
+    Parse the links to the words from a browse page.
+
+    :param html: The HTML of the browse page.
+    :return list: A list of links to the words.
+    """
+
+    word_links: list[str] = []
+    seen_links: set[str] = set()
+
+    for word in extract_hrefs(html):
+        if word is not None and 'definition.php' in word and word not in seen_links:
+            seen_links.add(word)
+            word_links.append(word)
+    
+    return word_links
+
+
+def get_word_links(url: str, session: requests.Session, max_retry_count: int, retry_count: int = 0, parser_pool: concurrent.futures.ProcessPoolExecutor | None = None) -> list[str] | None:
+    """
+    Get the links to the words from the given URL.
+
+    :param url: The URL of the page to scrape.
+    :param session: The requests session to use.
+    :param max_retry_count: The maximum number of times to retry a connection before giving up.
+    :param retry_count: The current retry count.
+    :param parser_pool: The process pool to parse the page in, or None to parse in the calling thread.
+    :return list | None: A list of links to the words, or None if the page could not be fetched.
+    """
+
+    response: requests.Response | None = attempt_connection(url, session, max_retry_count, retry_count)
+
+    if response is None:
+        return None
+
+    return run_parser(parser_pool, parse_word_links, response.text)
+
+
+class ProgressReporter:
+    """
+    Report the global scraping progress and ETA from a background thread.
+    """
+
+    def __init__(self, total: int, interval: float = 5.0, discovering: bool = False) -> None:
+        """
+        Initialize the progress reporter.
+
+        :param total: The total number of links to scrape.
+        :param interval: The number of seconds between progress reports.
+        :param discovering: Whether links are still being discovered, so the total is not final yet.
+        :return None:
+        """
+
+        self.total: int = total
+        self.interval: float = interval
+        self.discovering: bool = discovering
+        self.completed: int = 0
+        self.start_time: float = time.time()
+
+        self._lock: threading.Lock = threading.Lock()
+        self._stop_event: threading.Event = threading.Event()
+        self._thread: threading.Thread = threading.Thread(target=self._run, daemon=True)
+
+    def advance(self, count: int = 1) -> None:
+        """
+        Mark links as scraped.
+
+        :param count: The number of links that were scraped.
+        :return None:
+        """
+
+        with self._lock:
+            self.completed += count
+
+    def add_total(self, count: int) -> None:
+        """
+        Add newly discovered links to the total.
+
+        :param count: The number of links that were discovered.
+        :return None:
+        """
+
+        with self._lock:
+            self.total += count
+
+    def finish_discovery(self) -> None:
+        """
+        Mark the total as final once every link has been discovered.
+
+        :return None:
+        """
+
+        self.discovering = False
+
+    def report(self) -> None:
+        """
+        Print the current progress and ETA.
+
+        :return None:
+        """
+
+        with self._lock:
+            completed: int = self.completed
+            total: int = self.total
+
+        elapsed: float = time.time() - self.start_time
+        rate: float = completed / elapsed if elapsed > 0 else 0.0
+        eta_text: str = 'unknown'
+
+        if self.discovering:
+            eta_text = 'still discovering links'
+
+        elif completed > 0:
+            eta_time: int = int(((elapsed * (total - completed)) / completed) * 100) / 100
+            eta_text = time_formatter(eta_time) or '0 seconds'
+
+        print(f'Scraped {completed}/{total} links | {rate:.1f} links/s | ETA: {eta_text}')
+
+    def start(self) -> None:
+        """
+        Start reporting progress in the background.
+
+        :return None:
+        """
+
+        self.start_time = time.time()
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop reporting progress and print the final progress.
+
+        :return None:
+        """
+
+        self._stop_event.set()
+        self._thread.join()
+        self.report()
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            self.report()
+
+
+class StorageWriter:
+    """
+    Merge scraped words into a SQLite database from a single writer thread.
+
+    Workers only hand results to put, so titles shared between links are merged
+    without races and without per-title file syscalls. Every link is journaled
+    in the same transaction as its results so an interrupted crawl can resume,
+    except a word whose paradigm page could not be fetched, which a resumed
+    crawl scrapes again.
+    """
+
+    def __init__(self, database_path: str, batch_size: int = 500) -> None:
+        """
+        Initialize the storage writer.
+
+        :param database_path: The path of the SQLite database.
+        :param batch_size: The maximum number of results to merge per transaction.
+        :return None:
+        """
+
+        self.database_path: str = database_path
+        self.batch_size: int = batch_size
+
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        """
+        Start the writer thread.
+
+        :return None:
+        """
+
+        self._thread.start()
+
+    def put(self, link: str, word_info: dict, paradigm_info: dict) -> None:
+        """
+        Hand the word and paradigm information of a scraped link to the writer.
+
+        :param link: The link that was scraped.
+        :param word_info: The word information returned by get_word_info.
+        :param paradigm_info: The paradigm information returned by get_paradigm_info.
+        :return None:
+        """
+
+        self._queue.put(('result', link, word_info, paradigm_info))
+
+    def put_links(self, word_links: list[str]) -> None:
+        """
+        Hand newly discovered links to the writer so an interrupted crawl can resume without rediscovering them.
+
+        :param word_links: The discovered links.
+        :return None:
+        """
+
+        self._queue.put(('links', word_links))
+
+    def put_page(self, page_url: str) -> None:
+        """
+        Hand a browse page whose links were all handed to put_links to the writer, so a resumed crawl does not fetch it again.
+
+        :param page_url: The URL of the browse page.
+        :return None:
+        """
+
+        self._queue.put(('page', page_url))
+
+    def set_state(self, key: str, value: str) -> None:
+        """
+        Hand a crawl state value to the writer.
+
+        :param key: The state key.
+        :param value: The state value.
+        :return None:
+        """
+
+        self._queue.put(('state', key, value))
+
+    def close(self) -> None:
+        """
+        Commit the remaining results and stop the writer thread.
+
+        :return None:
+        """
+
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        connection: sqlite3.Connection = open_storage(self.database_path)
+        pending: int = 0
+
+        while True:
+            item: tuple | None = self._queue.get()
+
+            if item is None:
+                break
+
+            with measure('write'):
+                match item[0]:
+                    case 'result':
+                        _, link, word_info, paradigm_info = item
+
+                        merge_word_info(connection, word_info, paradigm_info)
+
+                        # get_paradigm_info returns {} only when the page could not be fetched.
+                        if word_info.get('orthography_id') is None or paradigm_info != {}:
+                            connection.execute('INSERT OR IGNORE INTO journal (link, orthography_id) VALUES (?, ?)', (link, word_info.get('orthography_id')))
+
+                    case 'links':
+                        connection.executemany('INSERT OR IGNORE INTO links (link) VALUES (?)', [(link,) for link in item[1]])
+
+                    case 'page':
+                        connection.execute('INSERT OR IGNORE INTO pages (url) VALUES (?)', (item[1],))
+
+                    case 'state':
+                        connection.execute('INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)', (item[1], item[2]))
+
+            pending += 1
+
+            if pending >= self.batch_size or self._queue.empty():
+                with measure('commit'):
+                    connection.commit()
+
+                pending = 0
+
+        connection.commit()
+        connection.close()
+
+
+def open_storage(database_path: str) -> sqlite3.Connection:
+    """
+    Open the SQLite storage database, creating its tables if needed.
+
+    :param database_path: The path of the SQLite database.
+    :return sqlite3.Connection: The database connection.
+    """
+
+    connection: sqlite3.Connection = sqlite3.connect(database_path)
+
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    connection.execute('CREATE TABLE IF NOT EXISTS dictionary (hash TEXT PRIMARY KEY, word TEXT NOT NULL, definitions TEXT NOT NULL)')
+    connection.execute('CREATE TABLE IF NOT EXISTS paradigm (hash TEXT PRIMARY KEY, data TEXT NOT NULL)')
+    connection.execute('CREATE TABLE IF NOT EXISTS links (link TEXT PRIMARY KEY)')
+    connection.execute('CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY)')
+    connection.execute('CREATE TABLE IF NOT EXISTS journal (link TEXT PRIMARY KEY, orthography_id INTEGER)')
+    connection.execute('CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+    connection.commit()
+
+    return connection
+
+
+def merge_word_info(connection: sqlite3.Connection, word_info: dict, paradigm_info: dict) -> None:
+    """
+    Merge the word and paradigm information for every title of a word into the database.
+
+    The first paradigm stored for a title is kept unless it is empty, which
+    lets a resumed crawl fill in a paradigm page that could not be fetched, and
+    new definitions are appended to the ones already stored for the title.
+
+    :param connection: The storage database connection.
+    :param word_info: The word information returned by get_word_info.
+    :param paradigm_info: The paradigm information returned by get_paradigm_info.
+    :return None:
+    """
+
+    definitions: list[str] = word_info.get('definitions')
+
+    for title in word_info.get('title(s)', []):
+        title_hash: str = hashlib.md5(title.encode()).hexdigest()
+
+        connection.execute("INSERT INTO paradigm (hash, data) VALUES (?, ?) ON CONFLICT (hash) DO UPDATE SET data = excluded.data WHERE json_extract(paradigm.data, '$.forms') IS NULL", (title_hash, json.dumps(dict(paradigm_info, word=title.lower()))))
+
+        row: tuple | None = connection.execute('SELECT definitions FROM dictionary WHERE hash = ?', (title_hash,)).fetchone()
+
+        if row is None:
+            connection.execute('INSERT INTO dictionary (hash, word, definitions) VALUES (?, ?, ?)', (title_hash, title, json.dumps(definitions)))
+            continue
+
+        file_definitions: list[str] = json.loads(row[0])
+        known_definitions: set[str] = set(file_definitions)
+
+        for definition in definitions:
+            if definition not in known_definitions:
+                file_definitions.append(definition)
+                known_definitions.add(definition)
+
+        if definitions != file_definitions:
+            connection.execute('UPDATE dictionary SET definitions = ? WHERE hash = ?', (json.dumps(file_definitions), title_hash))
+
+
+def load_links(database_path: str) -> list[str]:
+    """
+    Load the word links saved by a previous crawl.
+
+    :param database_path: The path of the SQLite database.
+    :return list[str]: The saved word links.
+    """
+
+    connection: sqlite3.Connection = open_storage(database_path)
+    links: list[str] = [row[0] for row in connection.execute('SELECT link FROM links')]
+    connection.close()
+
+    return links
+
+
+def load_pages(database_path: str) -> set[str]:
+    """
+    Load the browse pages a previous crawl saved every link of.
+
+    :param database_path: The path of the SQLite database.
+    :return set[str]: The URLs of the discovered browse pages.
+    """
+
+    connection: sqlite3.Connection = open_storage(database_path)
+    pages: set[str] = {row[0] for row in connection.execute('SELECT url FROM pages')}
+    connection.close()
+
+    return pages
+
+
+def load_state(database_path: str, key: str) -> str | None:
+    """
+    Load a crawl state value.
+
+    :param database_path: The path of the SQLite database.
+    :param key: The state key.
+    :return str | None: The state value, or None if it was never set.
+    """
+
+    connection: sqlite3.Connection = open_storage(database_path)
+    row: tuple | None = connection.execute('SELECT value FROM state WHERE key = ?', (key,)).fetchone()
+    connection.close()
+
+    return row[0] if row is not None else None
+
+
+def load_journal(database_path: str) -> dict:
+    """
+    Load the journal of completed links.
+
+    :param database_path: The path of the SQLite database.
+    :return dict: A dictionary mapping every completed link to its orthography ID.
+    """
+
+    connection: sqlite3.Connection = open_storage(database_path)
+    journal: dict = dict(connection.execute('SELECT link, orthography_id FROM journal'))
+    connection.close()
+
+    return journal
+
+
+def export_storage(database_path: str, output_dir: str) -> None:
+    """
+    Export the storage database to the per-title dictionary/ and paradigm/ layout plus hashing_key.json.
+
+    :param database_path: The path of the SQLite database.
+    :param output_dir: The directory to export the dictionary into.
+    :return None:
+    """
+
+    dictionary_dir: str = os.path.join(output_dir, 'dictionary')
+    paradigm_dir: str = os.path.join(output_dir, 'paradigm')
+
+    os.makedirs(dictionary_dir, exist_ok=True)
+    os.makedirs(paradigm_dir, exist_ok=True)
+
+    connection: sqlite3.Connection = open_storage(database_path)
+    hashing_key: dict = {}
+
+    for title_hash, title, definitions in connection.execute('SELECT hash, word, definitions FROM dictionary ORDER BY rowid'):
+        hashing_key[title_hash] = title
+
+        with open(f'{dictionary_dir}{os.sep}{title_hash}.json', 'w', encoding='unicode-escape') as file:
+            json.dump({"word" : title, "definitions": json.loads(definitions)}, file)
+
+    for title_hash, data in connection.execute('SELECT hash, data FROM paradigm'):
+        with open(f'{paradigm_dir}{os.sep}{title_hash}.json', 'w', encoding='unicode-escape') as file:
+            file.write(data)
+
+    connection.close()
+
+    with open(os.path.join(output_dir, 'hashing_key.json'), 'w', encoding='unicode-escape') as file:
+        json.dump(hashing_key, file)
+
+
+def export_pack(database_path: str, output_dir: str) -> None:
+    """
+    Export the storage database to a single pack file in which repeated strings and keys are stored once.
+
+    :param database_path: The path of the SQLite database.
+    :param output_dir: The directory to export the dictionary into.
+    :return None:
+    """
+
+    connection: sqlite3.Connection = open_storage(database_path)
+    layout: dict = {'dictionary': {}, 'paradigm': {}, 'hashing_key': {}}
+
+    for title_hash, title, definitions in connection.execute('SELECT hash, word, definitions FROM dictionary ORDER BY rowid'):
+        layout['hashing_key'][title_hash] = title
+        layout['dictionary'][title_hash] = {"word" : title, "definitions": json.loads(definitions)}
+
+    for title_hash, data in connection.execute('SELECT hash, data FROM paradigm'):
+        layout['paradigm'][title_hash] = json.loads(data)
+
+    connection.close()
+
+    lexicon_pack.write_pack(os.path.join(output_dir, lexicon_pack.PACK_NAME), layout)
+
+
+def canonical_link(link: str) -> str:
+    """
+    Canonicalize a word link so equivalent links are only scraped once.
+
+    The site prefix and fragment are dropped and the query parameters are sorted,
+    leaving a link relative to the base URL.
+
+    :param link: The link to canonicalize.
+    :return str: The canonical link.
+    """
+
+    parts: urllib.parse.SplitResult = urllib.parse.urlsplit(link.strip())
+    query: str = urllib.parse.urlencode(sorted(urllib.parse.parse_qsl(parts.query, keep_blank_values=True)))
+
+    return urllib.parse.urlunsplit(('', '', parts.path.lstrip('/'), query, ''))
+
+
+class PageMemo:
+    """
+    Fetch every keyed page once per run and share the result with every worker that asks for it.
+
+    A worker asking for a key that another worker is still fetching waits for
+    that fetch instead of sending the same request.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialize the page memo.
+
+        :return None:
+        """
+
+        self.fetched: int = 0
+        self.saved: int = 0
+
+        self._results: dict = {}
+        self._in_flight: dict = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def get(self, key, fetch):
+        """
+        Get the result for a key, fetching it in this thread if nobody has yet.
+
+        :param key: The key of the page, such as its orthography ID.
+        :param fetch: The function fetching the page when called without arguments.
+        :return: The result of fetch for the key.
+        """
+
+        with self._lock:
+            if key in self._results:
+                self.saved += 1
+                return self._results[key]
+
+            event: threading.Event | None = self._in_flight.get(key)
+
+            if event is None:
+                self._in_flight[key] = threading.Event()
+                self.fetched += 1
+            else:
+                self.saved += 1
+
+        if event is not None:
+            event.wait()
+            return self._results.get(key, {})
+
+        result = {}
+
+        try:
+            result = fetch()
+        finally:
+            with self._lock:
+                self._results[key] = result
+                event = self._in_flight.pop(key)
+
+            event.set()
+
+        return result
+
+    async def get_async(self, key, fetch):
+        """
+        Get the result for a key, fetching it in this coroutine if nobody has yet.
+
+        :param key: The key of the page, such as its orthography ID.
+        :param fetch: The coroutine function fetching the page when called without arguments.
+        :return: The result of fetch for the key.
+        """
+
+        if key in self._results:
+            self.saved += 1
+            return self._results[key]
+
+        if key in self._in_flight:
+            self.saved += 1
+            return await asyncio.shield(self._in_flight[key])
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        self.fetched += 1
+
+        result = {}
+
+        try:
+            result = await fetch()
+        finally:
+            self._results[key] = result
+            self._in_flight.pop(key)
+            future.set_result(result)
+
+        return result
+
+
+class LinkRegistry:
+    """
+    De-duplicate discovered links by their canonical form and register the new ones with the storage writer and progress reporter.
+    """
+
+    def __init__(self, storage: StorageWriter, progress: ProgressReporter, completed: dict | None = None, keep_links: bool = False) -> None:
+        """
+        Initialize the link registry.
+
+        :param storage: The storage writer to save new links with.
+        :param progress: The progress reporter to add new links to.
+        :param completed: The links already scraped by an interrupted crawl, which are not scraped again.
+        :param keep_links: Whether to keep every discovered link in memory (for the link cache).
+        :return None:
+        """
+
+        self.storage: StorageWriter = storage
+        self.progress: ProgressReporter = progress
+        self.completed: dict = completed or {}
+        self.links: list[str] = []
+        self.keep_links: bool = keep_links
+        self.count: int = 0
+        self.skipped: int = 0
+        self.duplicates: int = 0
+        self.failed_pages: list[str] = []
+
+        self._seen: set[str] = set()
+        self._lock: threading.Lock = threading.Lock()
+
+    def admit(self, word_links: list[str]) -> list[str]:
+        """
+        Register discovered links and return the ones that still need to be scraped.
+
+        :param word_links: The discovered links.
+        :return list[str]: The canonical links seen for the first time and not already scraped.
+        """
+
+        with self._lock:
+            new_links: list[str] = []
+
+            for link in map(canonical_link, word_links):
+                if link not in self._seen:
+                    self._seen.add(link)
+                    new_links.append(link)
+
+            remaining_links: list[str] = [link for link in new_links if link not in self.completed]
+
+            self.count += len(new_links)
+            self.skipped += len(new_links) - len(remaining_links)
+            self.duplicates += len(word_links) - len(new_links)
+
+            if self.keep_links:
+                self.links += new_links
+
+        if new_links != []:
+            self.storage.put_links(new_links)
+            self.progress.add_total(len(remaining_links))
+
+        return remaining_links
+
+    def discover_page(self, page_url: str, page_links: list[str] | None) -> list[str]:
+        """
+        Register the links of a browse page and journal the page, or remember it as failed.
+
+        :param page_url: The URL of the browse page.
+        :param page_links: The links of the page, or None if it could not be fetched.
+        :return list[str]: The canonical links seen for the first time and not already scraped.
+        """
+
+        if page_links is None:
+            with self._lock:
+                self.failed_pages.append(page_url)
+
+            return []
+
+        remaining_links: list[str] = self.admit(page_links)
+        self.storage.put_page(page_url)
+
+        return remaining_links
+
+    def finish_discovery(self) -> None:
+        """
+        Mark the saved links as complete, unless a browse page could not be fetched.
+
+        :return None:
+        """
+
+        if self.failed_pages != []:
+            print(f'{len(self.failed_pages)} browse pages could not be fetched, so their words are missing. Run again with --resume to fetch them.')
+            return
+
+        self.storage.set_state('links_complete', '1')
+
+
+def discovery_thread(page_queue: queue.Queue, link_queue: queue.Queue, registry: LinkRegistry, errors: list[Exception], max_retry_count: int, parser_pool: concurrent.futures.ProcessPoolExecutor | None = None) -> None:
+    """
+    Discover the word links of browse pages and stream the new ones into the link queue.
+
+    A page that raises is recorded as failed along with its exception, and once
+    any worker has failed the remaining pages are only drained, so a resumed
+    crawl fetches them.
+
+    :param page_queue: The shared queue of browse page URLs, terminated by a None sentinel.
+    :param link_queue: The bounded queue of links to scrape.
+    :param registry: The shared link registry.
+    :param errors: The shared list of the exceptions raised by workers.
+    :param max_retry_count: The maximum number of times to retry a connection before giving up.
+    :param parser_pool: The process pool to parse pages in, or None to parse in this thread.
+    :return None:
+    """
+
+    session: requests.Session = http_transport.session if http_transport is not None else requests.Session()
+
+    while True:
+        page_url: str | None = page_queue.get()
+
+        try:
+            if page_url is None:
+                break
+
+            if errors != []:
+                registry.discover_page(page_url, None)
+                continue
+
+            with measure('discovery'):
+                page_links: list[str] | None = get_word_links(page_url, session, max_retry_count, parser_pool=parser_pool)
+
+            for link in registry.discover_page(page_url, page_links):
+                link_queue.put(link)
+        except Exception as error:
+            print(f'Discovering {page_url} failed: {error!r}')
+
+            registry.discover_page(page_url, None)
+            errors.append(error)
+        finally:
+            page_queue.task_done()
+
+
+def discover_links(page_urls: list[str], word_links: list[str] | None, link_queue: queue.Queue, registry: LinkRegistry, errors: list[Exception], thread_count: int, max_retry_count: int, parser_pool: concurrent.futures.ProcessPoolExecutor | None = None) -> None:
+    """
+    Stream the new links of the known links and of the browse pages into the link queue, discovering browse pages with threads.
+
+    :param page_urls: The browse pages to discover links from.
+    :param word_links: Already known links to scrape along with the links of the browse pages, or None.
+    :param link_queue: The queue of links to scrape.
+    :param registry: The shared link registry.
+    :param errors: The shared list of the exceptions raised by workers.
+    :param thread_count: The maximum number of discovery threads.
+    :param max_retry_count: The maximum number of times to retry a connection before giving up.
+    :param parser_pool: The process pool to parse pages in, or None to parse in the discovery threads.
+    :return None:
+    """
+
+    if word_links is not None:
+        for link in registry.admit(word_links):
+            link_queue.put(link)
+
+    if page_urls == []:
+        return
+
+    page_queue: queue.Queue = queue.Queue()
+    discovery_count: int = max(1, min(thread_count, len(page_urls)))
+    discovery_threads: list[threading.Thread] = []
+
+    for page_url in page_urls:
+        page_queue.put(page_url)
+
+    for _ in range(discovery_count):
+        page_queue.put(None)
+
+    for _ in range(discovery_count):
+        thread = threading.Thread(target=discovery_thread, args=(page_queue, link_queue, registry, errors, max_retry_count, parser_pool))
+        discovery_threads.append(thread)
+        thread.start()
+
+    for thread in discovery_threads:
+        thread.join()
+
+
+def scrape_link(link: str, session: requests.Session, paradigm_memo: PageMemo, url: str, max_retry_count: int, parser_pool: concurrent.futures.ProcessPoolExecutor | None = None) -> tuple[dict, dict] | None:
+    """
+    Scrape a single word link and its paradigm page.
+
+    :param link: The link to scrape.
+    :param session: The requests session to use.
+    :param paradigm_memo: The shared memo of paradigm pages by orthography ID.
+    :param url: The base URL of the website.
+    :param max_retry_count: The maximum number of times to retry a connection before giving up.
+    :param parser_pool: The process pool to parse pages in, or None to parse in the calling thread.
+    :return tuple[dict, dict] | None: The word and paradigm information, or None if the word could not be scraped.
+    """
+
+    word_info: dict = get_word_info(f'{url}{link}', session, max_retry_count, parser_pool=parser_pool)
+
+    if not word_info or word_info == {}:
+        return None
+
+    paradigm_info: dict = {}
+
+    orthography_id: int | None = word_info.get('orthography_id')
+
+    if orthography_id is not None:
+        paradigm_info = paradigm_memo.get(orthography_id, lambda: get_paradigm_info(f'{url}paradigms.php?p1={orthography_id}', session, max_retry_count, parser_pool=parser_pool))
+
+    return word_info, paradigm_info
+
+
+def scrape_thread(link_queue: queue.Queue, storage: StorageWriter, paradigm_memo: PageMemo, url: str, thread_number: int, progress: ProgressReporter, errors: list[Exception], max_retry_count: int, parser_pool: concurrent.futures.ProcessPoolExecutor | None = None) -> None:
+    """
+    Scrape the words pulled from the shared link queue until a None sentinel is received.
+
+    A link that raises records its exception, and once any worker has failed the
+    rest of the queue is only drained, so the discovery threads never block on
+    a full queue and the unscraped links are left to a resumed crawl.
+
+    :param link_queue: The shared queue of links to scrape.
+    :param storage: The storage writer to hand results to.
+    :param paradigm_memo: The shared memo of paradigm pages by orthography ID.
+    :param url: The base URL of the website.
+    :param thread_number: The number of the thread.
+    :param progress: The shared progress reporter.
+    :param errors: The shared list of the exceptions raised by workers.
+    :param max_retry_count: The maximum number of times to retry a connection before giving up.
+    :param parser_pool: The process pool to parse pages in, or None to parse in this thread.
+    :return None:
+    """
+
+    start_time: float = time.time()
+    session: requests.Session = http_transport.session if http_transport is not None else requests.Session()
+
+    thread_id: str = str(thread_number)
+    scraped_count: int = 0
+
+    if thread_number < 10:
+        thread_id = f'0{thread_number}'
+
+    print(f'Thread {thread_id} started...')
+
+    if run_metrics is not None:
+        run_metrics.start_worker(f'thread-{thread_id}')
+
+    while True:
+        link: str | None = link_queue.get()
+
+        try:
+            if link is None:
+                break
+
+            if errors != []:
+                continue
+
+            scraped_count += 1
+            result: tuple[dict, dict] | None = scrape_link(link, session, paradigm_memo, url, max_retry_count, parser_pool)
+
+            if result is None:
+                progress.advance()
+                continue
+
+            storage.put(link, *result)
+            progress.advance()
+
+            if run_metrics is not None:
+                run_metrics.add_worker_page(f'thread-{thread_id}')
+        except Exception as error:
+            print(f'Thread {thread_id} failed to scrape {link}: {error!r}')
+
+            errors.append(error)
+        finally:
+            link_queue.task_done()
+
+    total_time: int = int((time.time() - start_time) * 100)/100
+
+    print(f'Thread {thread_id} took: {time_formatter(total_time)} to scrape {scraped_count} links')
+
+
+def scrape_threads(page_urls: list[str], word_links: list[str] | None, registry: LinkRegistry, storage: StorageWriter, paradigm_memo: PageMemo, url: str, thread_count: int, progress: ProgressReporter, max_retry_count: int, parser_pool: concurrent.futures.ProcessPoolExecutor | None = None) -> None:
+    """
+    Discover and scrape the words with worker threads connected by a bounded link queue.
+
+    The first exception raised by a worker is raised again once every thread
+    has stopped.
+
+    :param page_urls: The browse pages to discover links from.
+    :param word_links: Already known links to scrape along with the links of the browse pages, or None.
+    :param registry: The shared link registry.
+    :param storage: The storage writer to hand results to.
+    :param paradigm_memo: The shared memo of paradigm pages by orthography ID.
+    :param url: The base URL of the website.
+    :param thread_count: The number of scraping threads.
+    :param progress: The shared progress reporter.
+    :param max_retry_count: The maximum number of times to retry a connection before giving up.
+    :param parser_pool: The process pool to parse pages in, or None to parse in the threads.
+    :return None:
+    """
+
+    link_queue: queue.Queue = queue.Queue(maxsize=thread_count * 16)
+    threads: list[threading.Thread] = []
+    errors: list[Exception] = []
+
+    for i in range(thread_count):
+        thread = threading.Thread(target=scrape_thread, args=(link_queue, storage, paradigm_memo, url, i+1, progress, errors, max_retry_count, parser_pool))
+        threads.append(thread)
+        thread.start()
+
+    try:
+        discover_links(page_urls, word_links, link_queue, registry, errors, thread_count, max_retry_count, parser_pool)
+
+        progress.finish_discovery()
+        registry.finish_discovery()
+
+        print(f'Found {registry.count} links to scrape...')
+    finally:
+        for _ in range(thread_count):
+            link_queue.put(None)
+
+        for thread in threads:
+            thread.join()
+
+    if errors != []:
+        raise errors[0]
+
+
+async def scrape_link_async(link: str, session: 'aiohttp.ClientSession', storage: StorageWriter, paradigm_memo: PageMemo, url: str, max_retry_count: int, parser_pool: concurrent.futures.ProcessPoolExecutor | None = None) -> None:
+    """
+    Scrape a single word link and its paradigm page.
+
+    :param link: The link to scrape.
+    :param session: The aiohttp session to use.
+    :param storage: The storage writer to hand results to.
+    :param paradigm_memo: The shared memo of paradigm pages by orthography ID.
+    :param url: The base URL of the website.
+    :param max_retry_count: The maximum number of times to retry a connection before giving up.
+    :param parser_pool: The process pool to parse pages in, or None to parse in the event loop.
+    :return None:
+    """
+
+    html: str | None = await attempt_connection_async(f'{url}{link}', session, max_retry_count)
+
+    if html is None:
+        return
+
+    word_info: dict = await run_parser_async(parser_pool, parse_word_info, html)
+
+    if not word_info or word_info == {}:
+        return
+
+    paradigm_info: dict = {}
+
+    orthography_id: int | None = word_info.get('orthography_id')
+
+    async def fetch_paradigm_info() -> dict:
+        paradigm_html: str | None = await attempt_connection_async(f'{url}paradigms.php?p1={orthography_id}', session, max_retry_count)
+
+        if paradigm_html is None:
+            return {}
+
+        return await run_parser_async(parser_pool, parse_paradigm_info, paradigm_html)
+
+    if orthography_id is not None:
+        paradigm_info = await paradigm_memo.get_async(orthography_id, fetch_paradigm_info)
+
+    storage.put(link, word_info, paradigm_info)
+
+
+async def get_word_links_async(url: str, session: 'aiohttp.ClientSession', max_retry_count: int, parser_pool: concurrent.futures.ProcessPoolExecutor | None = None) -> list[str] | None:
+    """
+    Get the links to the words from the given URL without blocking the event loop.
+
+    :param url: The URL of the page to scrape.
+    :param session: The aiohttp session to use.
+    :param max_retry_count: The maximum number of times to retry a connection before giving up.
+    :param parser_pool: The process pool to parse the page in, or None to parse in the event loop.
+    :return list | None: A list of links to the words, or None if the page could not be fetched.
+    """
+
+    html: str | None = await attempt_connection_async(url, session, max_retry_count)
+
+    if html is None:
+        return None
+
+    return await run_parser_async(parser_pool, parse_word_links, html)
+
+
+async def scrape_async(page_urls: list[str], word_links: list[str] | None, registry: LinkRegistry, storage: StorageWriter, paradigm_memo: PageMemo, url: str, concurrency: int, progress: ProgressReporter, max_retry_count: int, parser_pool: concurrent.futures.ProcessPoolExecutor | None = None) -> None:
+    """
+    Discover and scrape the words with a single event loop.
+
+    Every scraping coroutine keeps one request in flight, so the concurrency is
+    the number of word requests in flight at any time. Discovered links are
+    streamed to them through a bounded queue. The first exception raised by a
+    coroutine is raised again once every coroutine has stopped.
+
+    :param page_urls: The browse pages to discover links from.
+    :param word_links: Already known links to scrape along with the links of the browse pages, or None.
+    :param registry: The shared link registry.
+    :param storage: The storage writer to hand results to.
+    :param paradigm_memo: The shared memo of paradigm pages by orthography ID.
+    :param url: The base URL of the website.
+    :param concurrency: The maximum number of requests in flight.
+    :param progress: The shared progress reporter.
+    :param max_retry_count: The maximum number of times to retry a connection before giving up.
+    :param parser_pool: The process pool to parse pages in, or None to parse in the event loop.
+    :return None:
+    """
+
+    start_time: float = time.time()
+    link_queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 4)
+    errors: list[Exception] = []
+    pages = iter(page_urls)
+
+    async def discoverer() -> None:
+        for page_url in pages:
+            try:
+                if errors != []:
+                    registry.discover_page(page_url, None)
+                    continue
+
+                with measure('discovery'):
+                    page_links: list[str] | None = await get_word_links_async(page_url, session, max_retry_count, parser_pool)
+
+                for link in registry.discover_page(page_url, page_links):
+                    await link_queue.put(link)
+            except Exception as error:
+                print(f'Discovering {page_url} failed: {error!r}')
+
+                registry.discover_page(page_url, None)
+                errors.append(error)
+
+    async def worker(worker_number: int) -> None:
+        worker_name: str = f'async-{worker_number:03d}'
+
+        if run_metrics is not None:
+            run_metrics.start_worker(worker_name)
+
+        while True:
+            link: str | None = await link_queue.get()
+
+            try:
+                if link is None:
+                    break
+
+                if errors != []:
+                    continue
+
+                await scrape_link_async(link, session, storage, paradigm_memo, url, max_retry_count, parser_pool)
+                progress.advance()
+
+                if run_metrics is not None:
+                    run_metrics.add_worker_page(worker_name)
+            except Exception as error:
+                print(f'Worker {worker_name} failed to scrape {link}: {error!r}')
+
+                errors.append(error)
+            finally:
+                link_queue.task_done()
+
+    transport: HttpTransport = http_transport if http_transport is not None else HttpTransport(concurrency)
+
+    async with transport.client_session() as session:
+        workers: list[asyncio.Task] = [asyncio.create_task(worker(i+1)) for i in range(concurrency)]
+
+        if word_links is not None:
+            for link in registry.admit(word_links):
+                await link_queue.put(link)
+
+        await asyncio.gather(*[discoverer() for _ in range(min(concurrency, len(page_urls)))])
+
+        progress.finish_discovery()
+        registry.finish_discovery()
+
+        print(f'Found {registry.count} links to scrape...')
+
+        for _ in range(concurrency):
+            await link_queue.put(None)
+
+        await asyncio.gather(*workers)
+
+    if errors != []:
+        raise errors[0]
+
+    total_time: int = int((time.time() - start_time) * 100)/100
+
+    print(f'Event loop took: {time_formatter(total_time)} to scrape')
+
+
+class LeaseQueue:
+    """
+    Lease batches of links to distributed workers.
+
+    Every lease expires after a timeout, so the links of a worker that stopped
+    answering go back to the front of the queue and are leased to another worker.
+    A link whose leases keep expiring, such as one that crashes every worker it
+    is leased to, is abandoned after max_reassignments reassignments.
+    """
+
+    def __init__(self, lease_size: int, lease_timeout: float, max_reassignments: int = 3) -> None:
+        """
+        Initialize the lease queue.
+
+        :param lease_size: The maximum number of links per lease.
+        :param lease_timeout: The number of seconds a worker has to return the results of a lease.
+        :param max_reassignments: The maximum number of times a link is reassigned after its lease expired.
+        :return None:
+        """
+
+        self.lease_size: int = lease_size
+        self.lease_timeout: float = lease_timeout
+        self.max_reassignments: int = max_reassignments
+        self.discovering: bool = True
+        self.granted: int = 0
+        self.expired: int = 0
+        self.abandoned: list[str] = []
+
+        self._pending: collections.deque = collections.deque()
+        self._expiries: collections.Counter = collections.Counter()
+        self._leases: dict = {}
+        self._next_lease: int = 1
+        self._lock: threading.Lock = threading.Lock()
+
+    def put(self, link: str) -> None:
+        """
+        Queue a link to lease, so the lease queue can stand in for the link queue of discovery_thread.
+
+        :param link: The link to scrape.
+        :return None:
+        """
+
+        with self._lock:
+            self._pending.append(link)
+
+    def finish_discovery(self) -> None:
+        """
+        Mark the queue as complete once every link has been discovered.
+
+        :return None:
+        """
+
+        self.discovering = False
+
+    def lease(self, worker: str) -> tuple[int, list[str]] | None:
+        """
+        Lease the next batch of links to a worker.
+
+        :param worker: The name of the worker.
+        :return tuple[int, list[str]] | None: The lease ID and its links, or None if there is nothing to lease right now.
+        """
+
+        with self._lock:
+            self._expire()
+
+            if not self._pending:
+                return None
+
+            links: list[str] = [self._pending.popleft() for _ in range(min(self.lease_size, len(self._pending)))]
+            lease_id: int = self._next_lease
+
+            self._next_lease += 1
+            self._leases[lease_id] = (worker, links, time.monotonic() + self.lease_timeout)
+            self.granted += 1
+
+            return lease_id, links
+
+    def complete(self, lease_id: int) -> list[str] | None:
+        """
+        Close a lease whose results were returned.
+
+        :param lease_id: The ID of the lease.
+        :return list[str] | None: The links of the lease, or None if it expired and was reassigned.
+        """
+
+        with self._lock:
+            lease: tuple | None = self._leases.pop(lease_id, None)
+
+        return lease[1] if lease is not None else None
+
+    def finished(self) -> bool:
+        """
+        Check whether every link has been discovered and returned.
+
+        :return bool: Whether the crawl is finished.
+        """
+
+        with self._lock:
+            self._expire()
+
+            return not self.discovering and not self._pending and not self._leases
+
+    def summary(self) -> str:
+        """
+        Summarize the leases.
+
+        :return str: A one-line summary.
+        """
+
+        return f'Leases: {self.granted} granted | {self.expired} expired and reassigned | {len(self.abandoned)} links abandoned'
+
+    def _expire(self) -> None:
+        now: float = time.monotonic()
+
+        for lease_id, (worker, links, expiry) in list(self._leases.items()):
+            if expiry <= now:
+                del self._leases[lease_id]
+
+                self._expiries.update(links)
+                self.expired += 1
+
+                reassigned: list[str] = [link for link in links if self._expiries[link] <= self.max_reassignments]
+                self.abandoned += [link for link in links if self._expiries[link] > self.max_reassignments]
+                self._pending.extendleft(reversed(reassigned))
+
+                print(f'Lease {lease_id} of {worker} expired, reassigning {len(reassigned)} links and abandoning {len(links) - len(reassigned)}...')
+
+
+class CoordinatorHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Answer the JSON requests of distributed workers: POST /lease for a batch of links and POST /complete with its results.
+    """
+
+    protocol_version: str = 'HTTP/1.1'
+
+    def do_POST(self) -> None:
+        message: dict = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+
+        if self.path == '/lease':
+            reply: dict = self.server.lease(message['worker'])
+        elif self.path == '/complete':
+            reply: dict = self.server.complete(message['worker'], message['lease'], message['results'], message.get('failed', []))
+        else:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        body: bytes = json.dumps(reply).encode('utf-8')
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class CoordinatorServer(http.server.ThreadingHTTPServer):
+    """
+    Lease links to distributed workers and merge the results they return into the storage database.
+    """
+
+    daemon_threads: bool = True
+
+    def __init__(self, address: tuple[str, int], lease_queue: LeaseQueue, storage: StorageWriter, progress: ProgressReporter) -> None:
+        """
+        Initialize the coordinator server.
+
+        :param address: The host and port to listen on.
+        :param lease_queue: The queue of links to lease.
+        :param storage: The storage writer to hand results to.
+        :param progress: The shared progress reporter.
+        :return None:
+        """
+
+        super().__init__(address, CoordinatorHandler)
+
+        self.lease_queue: LeaseQueue = lease_queue
+        self.storage: StorageWriter = storage
+        self.progress: ProgressReporter = progress
+        self.failed: list[tuple[str, str]] = []
+
+    def lease(self, worker: str) -> dict:
+        """
+        Lease the next batch of links to a worker.
+
+        :param worker: The name of the worker.
+        :return dict: The lease ID and its links, or no links and whether the crawl is finished.
+        """
+
+        metrics: RunMetrics | None = run_metrics
+
+        if metrics is not None and worker not in metrics.workers:
+            metrics.start_worker(worker)
+
+        leased: tuple[int, list[str]] | None = self.lease_queue.lease(worker)
+
+        if leased is None:
+            return {'links': [], 'done': self.lease_queue.finished()}
+
+        return {'lease': leased[0], 'links': leased[1]}
+
+    def complete(self, worker: str, lease_id: int, results: list, failed: list) -> dict:
+        """
+        Merge the results of a lease, unless it expired and was reassigned.
+
+        :param worker: The name of the worker.
+        :param lease_id: The ID of the lease.
+        :param results: The link, word information and paradigm information of every scraped link of the lease.
+        :param failed: The link and exception of every link of the lease that raised on the worker.
+        :return dict: Whether the results were accepted.
+        """
+
+        links: list[str] | None = self.lease_queue.complete(lease_id)
+
+        if links is None:
+            return {'accepted': False}
+
+        for link, word_info, paradigm_info in results:
+            self.storage.put(link, word_info, paradigm_info)
+
+        for link, error in failed:
+            print(f'Worker {worker} failed to scrape {link}: {error}')
+
+            self.failed.append((link, error))
+
+        self.progress.advance(len(links))
+
+        metrics: RunMetrics | None = run_metrics
+
+        if metrics is not None:
+            for _ in links:
+                metrics.add_worker_page(worker)
+
+        return {'accepted': True}
+
+
+def coordinate(page_urls: list[str], word_links: list[str] | None, registry: LinkRegistry, storage: StorageWriter, address: tuple[str, int], lease_size: int, lease_timeout: float, thread_count: int, progress: ProgressReporter, max_retry_count: int, parser_pool: concurrent.futures.ProcessPoolExecutor | None = None, max_reassignments: int = 3) -> None:
+    """
+    Discover the words and lease them to distributed workers until every lease has been returned.
+
+    The first exception raised by a discovery thread is raised again once the
+    links that were discovered have been scraped, and a RuntimeError is raised
+    if any link raised on a worker or was abandoned after its leases kept
+    expiring. Those links are not journaled, so --resume scrapes them again.
+
+    :param page_urls: The browse pages to discover links from.
+    :param word_links: Already known links to scrape along with the links of the browse pages, or None.
+    :param registry: The shared link registry.
+    :param storage: The storage writer to hand results to.
+    :param address: The host and port to listen for workers on.
+    :param lease_size: The maximum number of links per lease.
+    :param lease_timeout: The number of seconds a worker has to return the results of a lease.
+    :param thread_count: The maximum number of discovery threads.
+    :param progress: The shared progress reporter.
+    :param max_retry_count: The maximum number of times to retry a connection before giving up.
+    :param parser_pool: The process pool to parse browse pages in, or None to parse in the discovery threads.
+    :param max_reassignments: The maximum number of times a link is reassigned after its lease expired.
+    :return None:
+    """
+
+    lease_queue: LeaseQueue = LeaseQueue(lease_size, lease_timeout, max_reassignments)
+    server: CoordinatorServer = CoordinatorServer(address, lease_queue, storage, progress)
+
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    print(f'Coordinator listening for workers on {address[0]}:{server.server_address[1]}...')
+
+    errors: list[Exception] = []
+
+    discover_links(page_urls, word_links, lease_queue, registry, errors, thread_count, max_retry_count, parser_pool)
+
+    progress.finish_discovery()
+    lease_queue.finish_discovery()
+    registry.finish_discovery()
+
+    print(f'Found {registry.count} links to scrape...')
+
+    while not lease_queue.finished():
+        time.sleep(LEASE_POLL_INTERVAL)
+
+    # Idle workers poll for leases, so keep answering long enough for them to learn the crawl is over.
+    time.sleep(LEASE_POLL_INTERVAL * 2)
+
+    server.shutdown()
+    server.server_close()
+
+    print(lease_queue.summary())
+
+    if errors != []:
+        raise errors[0]
+
+    if server.failed != [] or lease_queue.abandoned != []:
+        raise RuntimeError(f'{len(server.failed)} links raised on the workers and {len(lease_queue.abandoned)} links were abandoned, run again with --resume to retry them')
+
+
+def post_coordinator(session: requests.Session, url: str, message: dict, max_retry_count: int) -> dict | None:
+    """
+    Send a JSON request to the coordinator, retrying with exponential backoff.
+
+    :param session: The requests session to use.
+    :param url: The URL of the coordinator endpoint.
+    :param message: The JSON request.
+    :param max_retry_count: The maximum number of times to retry a connection before giving up.
+    :return dict | None: The JSON reply, or None if the coordinator could not be reached.
+    """
 
+    for retry_count in range(max_retry_count + 1):
+        try:
+            response: requests.Response = session.post(url, json=message, timeout=request_timeout)
+            response.raise_for_status()
 
-def time_formatter(seconds: int) -> str:
+            return response.json()
+        except (requests.RequestException, ValueError):
+            if retry_count < max_retry_count:
+                time.sleep(min(2 ** retry_count, 30) + random.uniform(0, 1))
+
+    return None
+
+
+def work_for_coordinator(coordinator_url: str, url: str, thread_count: int, progress: ProgressReporter, max_retry_count: int, parser_pool: concurrent.futures.ProcessPoolExecutor | None = None) -> PageMemo:
     """
-    Format the seconds into a human readable string.
+    Scrape the batches of links leased by a coordinator with worker threads and return the results to it.
 
-    :param seconds: The number of seconds to format.
-    :return str: The formatted time string.
+    :param coordinator_url: The base URL of the coordinator.
+    :param url: The base URL of the website.
+    :param thread_count: The number of scraping threads.
+    :param progress: The shared progress reporter.
+    :param max_retry_count: The maximum number of times to retry a connection before giving up.
+    :param parser_pool: The process pool to parse pages in, or None to parse in the threads.
+    :return PageMemo: The memo of paradigm pages, for its de-duplication counters.
     """
 
-    #Assume singular seconds, minutes, hours
-    seconds_text: str = 'second'
-    minutes_text: str = 'minute'
-    hours_text: str = 'hour'
+    worker: str = f'{socket.gethostname()}-{os.getpid()}'
+    transport: HttpTransport = http_transport if http_transport is not None else HttpTransport(thread_count)
+    coordinator_session: requests.Session = requests.Session()
+    paradigm_memo: PageMemo = PageMemo()
+    metrics: RunMetrics | None = run_metrics
+    lease_count: int = 0
 
-    return_text: str = ''
+    print(f'Worker {worker} leasing links from {coordinator_url}...')
 
-    minutes: int = int(seconds/60)
-    hours: int = int(seconds/3600)
+    if metrics is not None:
+        metrics.start_worker(worker)
 
-    if hours >= 1:
-        minutes: int = int((seconds%3600)/60)
-    
-    if minutes >= 1:
-        seconds: int = int(seconds%60)
-    
-    if minutes > 1:
-        minutes_text += 's'
-    if hours > 1:
-        hours_text += 's'
-    if seconds > 1:
-        seconds_text += 's'
+    # A link that raises is returned as failed, so the lease still completes
+    # instead of killing every worker it is reassigned to.
+    def scrape(link: str) -> tuple[dict, dict] | Exception | None:
+        try:
+            result: tuple[dict, dict] | Exception | None = scrape_link(link, transport.session, paradigm_memo, url, max_retry_count, parser_pool)
+        except Exception as error:
+            print(f'Scraping {link} failed: {error!r}')
 
-    if hours >= 1:
-        return_text += f'{hours} {hours_text}'
-    
-    if minutes >= 1:
-        if return_text != '':
-            return_text += ' & '
+            result = error
 
-        return_text += f'{minutes} {minutes_text}'
-    
-    if seconds >= 1 and hours == 0:
-        if return_text != '':
-            return_text += ' & '
+        progress.advance()
 
-        return_text += f'{seconds} {seconds_text}'
+        if metrics is not None:
+            metrics.add_worker_page(worker)
 
-    return return_text
+        return result
 
+    with concurrent.futures.ThreadPoolExecutor(thread_count) as executor:
+        while True:
+            reply: dict | None = post_coordinator(coordinator_session, f'{coordinator_url}lease', {'worker': worker}, max_retry_count)
 
-def text_cleaner(text: str) -> str:
+            if reply is None:
+                print(f'Coordinator at {coordinator_url} is not reachable, stopping...')
+                break
+
+            if reply['links'] == []:
+                if reply.get('done'):
+                    break
+
+                time.sleep(LEASE_POLL_INTERVAL)
+                continue
+
+            lease_id: int = reply['lease']
+            links: list[str] = reply['links']
+
+            progress.add_total(len(links))
+
+            outcomes: list = list(executor.map(scrape, links))
+            results: list = [[link, *outcome] for link, outcome in zip(links, outcomes) if isinstance(outcome, tuple)]
+            failed: list = [[link, repr(outcome)] for link, outcome in zip(links, outcomes) if isinstance(outcome, Exception)]
+
+            reply = post_coordinator(coordinator_session, f'{coordinator_url}complete', {'worker': worker, 'lease': lease_id, 'results': results, 'failed': failed}, max_retry_count)
+
+            if reply is None:
+                print(f'Coordinator at {coordinator_url} is not reachable, stopping...')
+                break
+
+            if not reply['accepted']:
+                print(f'Lease {lease_id} expired before its results were returned, discarding them...')
+                continue
+
+            lease_count += 1
+
+    coordinator_session.close()
+
+    print(f'Worker {worker} returned {lease_count} leases')
+
+    return paradigm_memo
+
+
+def reparse_chunk(archive_path: str, url: str, links: list[str]) -> list[tuple[str, dict, dict]]:
     """
-    Clean the text string.
+    Parse a batch of recorded word pages and their recorded paradigm pages.
 
-    :param text: The text string to be cleaned.
-    :return str: The cleaned text string.
+    :param archive_path: The path of the page archive.
+    :param url: The base URL the pages were recorded from.
+    :param links: The word links to parse.
+    :return list: The link, word information and paradigm information of every word that could be parsed.
     """
 
-    cleaned_text: str = text.strip()
-    cleaned_text = cleaned_text.lower()
+    archive: page_archive.PageArchive = page_archive.open_archive(archive_path)
+    paradigm_infos: dict = {}
+    results: list[tuple[str, dict, dict]] = []
 
-    cleaned_text = cleaned_text.replace('\n', ' ')
-    cleaned_text = cleaned_text.replace('\t', ' ')
+    def parse_page(page_url: str, parser) -> dict:
+        page: tuple[bytes, str | None] | None = archive.read(page_url)
 
-    return cleaned_text
+        if page is None:
+            return {}
 
+        return parser(decode_body(page[0], content_type_headers(page[1])))
 
-def title_cleaner(title: str) -> list[str]:
+    for link in links:
+        word_info: dict = parse_page(f'{url}{link}', parse_word_info)
+
+        if not word_info or word_info == {}:
+            continue
+
+        paradigm_info: dict = {}
+
+        orthography_id: int | None = word_info.get('orthography_id')
+
+        if orthography_id is not None:
+            if orthography_id not in paradigm_infos:
+                paradigm_infos[orthography_id] = parse_page(f'{url}paradigms.php?p1={orthography_id}', parse_paradigm_info)
+
+            paradigm_info = paradigm_infos[orthography_id]
+
+        results.append((link, word_info, paradigm_info))
+
+    return results
+
+
+def reparse_pages(archive_path: str, url: str, registry: LinkRegistry, storage: StorageWriter, progress: ProgressReporter, parser_pool: concurrent.futures.ProcessPoolExecutor, chunk_size: int = 256) -> None:
     """
-    Clean and split the title string.
-    
-    :param title: The title string to be cleaned.
-    :return list[str]: A list of cleaned title strings.
+    Rebuild the scraped words from a page archive recorded with --record, without touching the network.
+
+    Every recorded word page is parsed again, in chunks spread over the parser
+    processes, and a word that was missing its paradigm page during the crawl
+    still gets an empty paradigm. Results are merged in the order the pages
+    were recorded, so rebuilding twice from the same archive gives the same
+    output and only a parser change shows up between two rebuilds.
+
+    :param archive_path: The path of the page archive.
+    :param url: The base URL the pages were recorded from.
+    :param registry: The shared link registry, which skips the links a resumed rebuild already parsed.
+    :param storage: The storage writer to hand results to.
+    :param progress: The shared progress reporter.
+    :param parser_pool: The process pool to parse pages in.
+    :param chunk_size: The number of word pages per task.
+    :return None:
     """
 
-    cleaned_title: str = text_cleaner(title)
+    with page_archive.PageArchive(archive_path) as archive:
+        uris: list[str] = archive.uris()
 
-    cleaned_title = cleaned_title.replace(', ', ',')
-    cleaned_title = cleaned_title.replace(',', ', ')
+    links: list[str] = [uri[len(url):] for uri in uris if uri.startswith(url) and not uri[len(url):].startswith(('paradigms.php', 'browse_latin.php'))]
+    foreign_count: int = sum(1 for uri in uris if not uri.startswith(url))
 
-    cleaned_title_list: list[str] = cleaned_title.split(', ')
-    
-    
-    for i in range(len(cleaned_title_list)):
-        cleaned_title_list[i] = cleaned_title_list[i].strip()
-
-        if cleaned_title_list[i].endswith('-'):
-            cleaned_title_list[i] = cleaned_title_list[i][0:-1]
-        
-        if cleaned_title_list[i].startswith('-'):
-            cleaned_title_list[i] = cleaned_title_list[i][1:]
-    
-    for char in ['-', '', ', ', ',']:
-        while char in cleaned_title_list:
-            cleaned_title_list.remove(char)
-    
-    cleaned_title_list = list(set(cleaned_title_list))
+    if foreign_count > 0:
+        print(f'Ignoring {foreign_count} recorded pages that are not under {url}')
 
-    return cleaned_title_list
+    # Links are journaled in their canonical form but read back under the URL they were recorded with.
+    recorded_links: dict = {canonical_link(link): link for link in links}
+    links = [recorded_links[link] for link in registry.admit(list(recorded_links))]
+    progress.finish_discovery()
 
+    print(f'Found {registry.count} recorded word pages to parse...')
 
-def definition_cleaner(definition: str) -> dict:
+    chunks: list[list[str]] = [links[i:i+chunk_size] for i in range(0, len(links), chunk_size)]
+    futures: list[concurrent.futures.Future] = [parser_pool.submit(reparse_chunk, archive_path, url, chunk) for chunk in chunks]
+
+    for chunk, future in zip(chunks, futures):
+        for link, word_info, paradigm_info in future.result():
+            storage.put(canonical_link(link), word_info, paradigm_info)
+
+        progress.advance(len(chunk))
+
+    registry.finish_discovery()
+
+
+class HashingWriter:
     """
-    Clean and split the definition string.
+    Write to a file while computing its MD5 and SHA-256 checksums.
 
-    :param definition: The definition string to be cleaned.
-    :return list[str]: A list of cleaned definition strings.
+    The writer is deliberately not seekable, so archive writers stream into it
+    and every byte is hashed exactly once, in order.
     """
 
-    definition: str = text_cleaner(definition)
+    def __init__(self, file) -> None:
+        """
+        Initialize the hashing writer.
 
-    if '[' in definition and ']' in definition:
-        start: int = definition.index('[')
-        end: int = definition.index(']') + 2
+        :param file: The binary file object to write to.
+        :return None:
+        """
 
-        if end >= len(definition):
-            definition = definition[0:start]
-        else:
-            definition = definition[end:]
-    
-    if '(' in definition:
-        start: int = definition.index('(')
-        end: int = len(definition)
+        self.file = file
+        self.md5 = hashlib.md5()
+        self.sha256 = hashlib.sha256()
 
-        if ')' in definition:
-            end = definition.index(')') + 2
+    def write(self, data: bytes) -> int:
+        """
+        Hash and write data.
 
-        if end >= len(definition):
-            definition = definition[0:start]
-        else:
-            definition = definition[end:]
+        :param data: The data to write.
+        :return int: The number of bytes written.
+        """
 
-    definitions: list[str] = definition.split(', ')
-    
-    for i in range(len(definitions)):
-        definitions[i] = definitions[i].strip()
+        self.md5.update(data)
+        self.sha256.update(data)
 
-        if definitions[i].endswith('-'):
-            definitions[i] = definitions[i][0:-1]
-    
-    for char in ['-', '', ', ', ',']:
-        while char in definitions:
-            definitions.remove(char)
-            
-    definitions = list(set(definitions))
+        return self.file.write(data)
 
-    return definitions
+    def flush(self) -> None:
+        """
+        Flush the underlying file.
 
+        :return None:
+        """
 
-def attempt_connection(url: str, session: requests.Session, max_retry_count: int, retry_count: int = 0) -> requests.Response | None:
-    """
-    Attempt to connect to the given URL.
+        self.file.flush()
 
-    :param url: The URL to connect to.
-    :param session: The requests session to use.
-    :param max_retry_count: The maximum number of times to retry a connection before giving up.
-    :param retry_count: The current retry count.
-    :return requests.Response: The response object.
-    """
+    def checksums(self) -> dict:
+        """
+        Get the checksums of everything written so far.
 
-    if max_retry_count < retry_count:
-        print(f'Maximum retry count reached for {url}. Skipping...')
-        return None
-    
-    elif retry_count > 0:
-        print(f'Connection error, retrying {url}...')
+        :return dict: The hex MD5 and SHA-256 digests.
+        """
 
-    try:
-        response: requests.Response = session.get(url)
-    except requests.exceptions.ConnectionError:
-        return attempt_connection(url, session, max_retry_count, retry_count+1)
-    
-    return response
+        return {'md5': self.md5.hexdigest(), 'sha256': self.sha256.hexdigest()}
 
 
-def get_word_info(url: str, session: requests.Session, max_retry_count:int, retry_count: int = 0) -> dict:
+def file_checksums(path: str, chunk_size: int = 1048576) -> dict:
     """
-    Get the word information from the given URL.
+    Compute the checksums of a file without reading it into memory at once.
 
-    :param url: The URL of the page to scrape.
-    :param session: The requests session to use.
-    :param max_retry_count: The maximum number of times to retry a connection before giving up.
-    :param retry_count: The current retry count.
-    :return dict: A dictionary containing the word information.
+    :param path: The path of the file.
+    :param chunk_size: The number of bytes to read at a time.
+    :return dict: The hex MD5 and SHA-256 digests.
     """
 
-    response: requests.Response | None = attempt_connection(url, session, max_retry_count, retry_count)
+    md5 = hashlib.md5()
+    sha256 = hashlib.sha256()
 
-    if response is None:
-        return {}
-    
-    soup = bs4.BeautifulSoup(response.text, 'html.parser')
+    with open(path, 'rb') as file:
+        while chunk := file.read(chunk_size):
+            md5.update(chunk)
+            sha256.update(chunk)
 
-    flash_card_title = soup.find('div', {'class': 'flash_card_title'})
-    flash_card_english_def = soup.find('ol', {'class': 'flash_card_english_def'})
-    identification = soup.find('div', {'class': 'main_identification'})
+    return {'md5': md5.hexdigest(), 'sha256': sha256.hexdigest()}
 
-    if not flash_card_title or not flash_card_english_def:
-        return {}
-    
-    orthography_id = None
 
-    if identification:
-        orthography_id: int = int(identification.text.strip().replace('Orthography ID = ', ''))
+def write_zip(output_dir: str, archive_path: str) -> dict:
+    """
+    Package the output directory into a zip archive, hashing it while it is written.
 
-    cleaned_title = title_cleaner(flash_card_title.text)
-    definitions: list = []
+    :param output_dir: The directory to package.
+    :param archive_path: The path of the zip archive.
+    :return dict: The hex MD5 and SHA-256 digests of the archive.
+    """
 
-    for definition in flash_card_english_def.find_all('li'):
-        cleaned_definition = definition_cleaner(definition.text.strip())
-        definitions += cleaned_definition
+    with open(archive_path, 'wb') as file:
+        writer: HashingWriter = HashingWriter(file)
 
-    return {
-        'orthography_id': orthography_id,
-        'title(s)': cleaned_title,
-        'definitions': definitions
-    }
+        with zipfile.ZipFile(writer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for dirpath, dirnames, filenames in os.walk(output_dir):
+                relative_dir: str = os.path.relpath(dirpath, output_dir)
 
+                for name in sorted(dirnames):
+                    archive.write(os.path.join(dirpath, name), os.path.normpath(os.path.join(relative_dir, name)))
 
-def get_paradigm_info(url: str, session: requests.Session, max_retry_count: int, retry_count: int = 0) -> dict:
-    """
-    Get the paradigm information from the given URL.
+                for name in sorted(filenames):
+                    archive.write(os.path.join(dirpath, name), os.path.normpath(os.path.join(relative_dir, name)))
 
-    :param url: The URL of the page to scrape.
-    :param session: The requests session to use.
-    :param max_retry_count: The maximum number of times to retry a connection before giving up.
-    :param retry_count: The current retry count.
-    :return dict: A dictionary containing the paradigm information.
-    """
+    return writer.checksums()
 
-    response: requests.Response | None = attempt_connection(url, session, max_retry_count, retry_count)
 
-    if response is None:
-        return {}
-    
-    soup: bs4.BeautifulSoup = bs4.BeautifulSoup(response.text, 'html.parser')
+def write_7z(output_dir: str, archive_path: str, block_files: int = 1024) -> dict:
+    """
+    Package the output directory into a 7z archive of bounded solid blocks.
 
-    paradigm_containers: bs4.element.ResultSet = soup.find_all('div', {'class': 'noun_paradigm_container'})
-    paradigm_container_count: int = len(paradigm_containers)
+    A new solid folder is started every block_files files, so a single member
+    can be read by decompressing its block instead of the whole archive (see
+    LexiconArchive). The top-level files, such as hashing_key.json, go in the
+    first block, and the entries of a title in every sub-directory are stored
+    next to each other so they share a block.
 
-    if paradigm_containers is None:
-        print('No containers')
-        return {}
+    7z archives are finished by seeking back to their header, so the checksums
+    are computed by streaming the finished archive in chunks.
 
-    paradigm_info: dict = {'forms' : paradigm_container_count}
-    
-    for i in range(paradigm_container_count):
-        current_table = paradigm_containers[i]
-        table_dictionary: dict = {}
+    :param output_dir: The directory to package.
+    :param archive_path: The path of the 7z archive.
+    :param block_files: The maximum number of files per solid block.
+    :return dict: The hex MD5 and SHA-256 digests of the archive.
+    """
 
-        if current_table is None:
-            print('No table')
-            continue
+    directories: list[tuple[str, str]] = []
+    top_files: list[tuple[str, str]] = []
+    entry_files: list[tuple[str, str]] = []
 
-        rows: bs4.element.ResultSet = current_table.find_all('tr')
-        columns: list[str] = []
+    for dirpath, dirnames, filenames in os.walk(output_dir):
+        relative_dir: str = os.path.relpath(dirpath, output_dir)
 
-        for c in range(1, len(rows[0].find_all('td'))):
-            columns.append(rows[0].find_all('td')[c].text.strip().lower())
-            table_dictionary[columns[c-1]] = {}
+        directories += [(os.path.join(dirpath, name), os.path.normpath(os.path.join(relative_dir, name))) for name in sorted(dirnames)]
+        (top_files if relative_dir == '.' else entry_files).extend((os.path.join(dirpath, name), os.path.normpath(os.path.join(relative_dir, name))) for name in sorted(filenames))
 
-        for r in range(1, len(rows)):
-            cells: bs4.element.ResultSet = rows[r].find_all('td')
-            
-            row_header: str = cells[0].text.strip().lower()
+    entry_files.sort(key=lambda entry_file: (os.path.basename(entry_file[1]), entry_file[1]))
 
-            for c in range(1, len(cells)):
-                table_dictionary[columns[c-1]][row_header] = definition_cleaner(cells[c].text.strip().lower())
+    with py7zr.SevenZipFile(archive_path, 'w') as archive:
+        for path, name in directories:
+            archive.write(path, name)
 
-        paradigm_info[str(i)] = table_dictionary
+        for file_count, (path, name) in enumerate(top_files + entry_files):
+            if file_count > 0 and file_count % block_files == 0:
+                # py7zr has no block size option, so the current folder is flushed
+                # the way closing an append session does, and the next write starts
+                # a new one. Append sessions would do the same through the public API
+                # but rewrite the whole header every time, which is quadratic in the
+                # number of files. These internals are why py7zr is pinned in
+                # requirements.txt, and tests/test_package.py checks the layout.
+                archive.worker.flush_archive(archive.fp, archive.header.main_streams.unpackinfo.folders[-1])
+                archive.header._initialized = False
 
-    return paradigm_info
+            archive.write(path, name)
+
+    return file_checksums(archive_path)
 
 
-def get_word_links(url: str, session: requests.Session, max_retry_count: int, retry_count: int = 0) -> list[str] | list:
+def write_tar_zst(output_dir: str, archive_path: str, level: int = 10) -> dict:
     """
-    Get the links to the words from the given URL.
+    Package the output directory into a zstd-compressed tar archive with multithreaded compression, hashing it while it is written.
 
-    :param url: The URL of the page to scrape.
-    :param session: The requests session to use.
-    :param max_retry_count: The maximum number of times to retry a connection before giving up.
-    :param retry_count: The current retry count.
-    :return list: A list of links to the words.
+    :param output_dir: The directory to package.
+    :param archive_path: The path of the tar.zst archive.
+    :param level: The zstd compression level.
+    :return dict: The hex MD5 and SHA-256 digests of the archive.
     """
 
-    response: requests.Response | None = attempt_connection(url, session, max_retry_count, retry_count)
+    compressor = zstandard.ZstdCompressor(level=level, threads=-1)
 
-    if response is None:
-        return []
+    with open(archive_path, 'wb') as file:
+        writer: HashingWriter = HashingWriter(file)
 
-    soup: bs4.BeautifulSoup = bs4.BeautifulSoup(response.text, 'html.parser')
-    
-    a_soup: bs4.element.ResultSet = soup.find_all('a')
-    word_links: list[str] = []
+        with compressor.stream_writer(writer, closefd=False) as stream:
+            with tarfile.open(fileobj=stream, mode='w|') as archive:
+                for name in sorted(os.listdir(output_dir)):
+                    archive.add(os.path.join(output_dir, name), arcname=name)
 
-    for a in a_soup:
-        word: str = a.get('href')
+    return writer.checksums()
 
-        if word is not None and 'definition.php' in word and word not in word_links:
-            word_links.append(word)
-    
-    return word_links
+
+ARCHIVE_WRITERS: dict = {
+    'zip': ('zip', write_zip),
+    '7z': ('7z', write_7z),
+    'zstd': ('tar.zst', write_tar_zst)
+}
 
 
-def scrape_thread(word_links: list[str], dictionary_dir: str, paradigm_dir: str, url: str, thread_number: int, ssl_slowdown: bool, max_retry_count: int) -> None:
+def package_output(output_dir: str, compression_type: str) -> None:
     """
-    Scrape the words from the given list of links.
+    Package the output directory into every requested archive format concurrently and write checksum.json and SHA256SUMS.
 
-    :param word_links: The list of links to scrape.
-    :param dictionary_dir: The directory to save the dictionary data.
-    :param paradigm_dir: The directory to save the paradigm data.
-    :param url: The base URL of the website.
-    :param thread_number: The number of the thread.
-    :param ssl_slowdown: Whether to enable SSL slowdown.
-    :param max_retry_count: The maximum number of times to retry a connection before giving up.
+    checksum.json keeps its original schema of one MD5 per package, and the
+    SHA-256 digests are written to SHA256SUMS in the format read by sha256sum -c.
+    Each format is written by one thread, and only zstd compresses with every
+    core, so zip and 7z still compress on a single core each.
+
+    A manifest of the content hash of every entry is packaged with the
+    dictionary and kept as manifest.json. When the manifest of a previous build
+    is there, a delta package of the entries added, changed and removed since
+    that build is written as well.
+
+    :param output_dir: The directory to package.
+    :param compression_type: The archive format to create ('zip', '7z', 'zstd' or 'all').
     :return None:
     """
 
-    global hashing_key
+    manifest_path: str = f'.{os.sep}{delta.MANIFEST_NAME}'
+    previous_manifest: dict | None = delta.load_manifest(manifest_path)
+    manifest: dict = delta.build_manifest(output_dir)
 
-    start_time: float = time.time()
-    session: requests.Session = requests.Session()
+    delta_path: str = f'{output_dir}.delta.zip'
 
-    thread_id: str = str(thread_number)
-    word_link_count: int = len(word_links)
+    delta.write_manifest(os.path.join(output_dir, delta.MANIFEST_NAME), manifest)
 
-    if thread_number < 10:
-        thread_id = f'0{thread_number}'
+    if os.path.exists(delta_path):
+        os.remove(delta_path)
 
-    print(f'Thread {thread_id} started...')
+    formats: list[str] = list(ARCHIVE_WRITERS.keys()) if compression_type == 'all' else [compression_type]
 
-    for i in range(word_link_count):
-        link: str = word_links[i]
-        word_info: dict = get_word_info(f'{url}{link}', session, max_retry_count)
+    if 'zstd' in formats and zstandard is None:
+        print('Skipping the zstd package, it requires zstandard. Please install it with: pip install zstandard')
+        formats.remove('zstd')
 
-        if not word_info or word_info == {}:
-            continue
+    futures: dict = {}
 
-        paradigm_info: dict = {}
+    with concurrent.futures.ThreadPoolExecutor(max(len(formats), 1)) as executor:
+        for archive_format in formats:
+            extension, writer = ARCHIVE_WRITERS[archive_format]
+            archive_path: str = f'{output_dir}.{extension}'
 
-        orthography_id: int | None = word_info.get('orthography_id')
+            if os.path.exists(archive_path):
+                os.remove(archive_path)
+                print(f'{archive_path} already exists, deleting...')
 
-        if orthography_id is not None:
-            paradigm_info = get_paradigm_info(f'{url}paradigms.php?p1={orthography_id}', session, max_retry_count)
+            futures[f'data.{extension}'] = executor.submit(writer, output_dir, archive_path)
 
-        if ssl_slowdown:
-            time.sleep(0.1)
+    print('Creating checksum...')
 
-        if i % 100 == 0 and i != 0:
-            eta_time: int = int(((time.time() - start_time) * (word_link_count - i) / i) * 100) / 100
+    checksums: dict = {}
+    sha256_checksums: dict = {}
 
-            print(f'Thread {thread_id} scraped {i}/{word_link_count} links | ETA: {time_formatter(eta_time)}')
+    for archive_name, future in futures.items():
+        archive_checksums: dict = future.result()
 
-        for title in word_info.get('title(s)', []):
-            title_hash: str = hashlib.md5(title.encode()).hexdigest()
-            dictionary_file_name: str = f'{dictionary_dir}{os.sep}{title_hash}.json'
-            paradigm_file_name: str = f'{paradigm_dir}{os.sep}{title_hash}.json'
+        checksums[archive_name] = archive_checksums['md5']
+        sha256_checksums[archive_name] = archive_checksums['sha256']
 
-            if title_hash not in hashing_key:
-                hashing_key[title_hash] = title
+    if previous_manifest is not None and previous_manifest['version'] != manifest['version']:
+        with open(delta_path, 'wb') as file:
+            delta_writer: HashingWriter = HashingWriter(file)
+            delta_info: dict = delta.write_delta(delta_writer, output_dir, previous_manifest, manifest)
 
-            if not os.path.exists(paradigm_file_name):
-                paradigm_info['word'] = title.lower()
+        delta_checksums: dict = delta_writer.checksums()
+        checksums['data.delta.zip'] = delta_checksums['md5']
+        sha256_checksums['data.delta.zip'] = delta_checksums['sha256']
 
-                with open(paradigm_file_name, 'w', encoding='unicode-escape') as file:
-                    json.dump(paradigm_info, file)
+        print(f'Delta package: {len(delta_info["added"])} added, {len(delta_info["changed"])} changed, {len(delta_info["removed"])} removed since the previous build')
 
-            if not os.path.exists(dictionary_file_name):
-                with open(dictionary_file_name, 'w', encoding='unicode-escape') as file:
-                    json.dump({"word" : title, "definitions": word_info.get('definitions')}, file)
-                
-                continue
+    with open(f'.{os.sep}checksum.json', 'w') as file:
+        json.dump(checksums, file)
 
-            with open(dictionary_file_name, 'r+', encoding='unicode-escape') as file:
-                try:
-                    file_info = json.load(file)
-                except json.decoder.JSONDecodeError:
-                    print(f'Error reading {dictionary_file_name}. Assuming empty... | title: {repr(title)}')
-                    file_info = {}
-
-                definitions = word_info.get('definitions')
-                file_definitions = file_info.get('definitions', [])
-
-                for definition in definitions:
-                    if definition not in file_definitions:
-                        file_definitions.append(definition)
-
-                if definitions != file_definitions:
-                    file_info['definitions'] = file_definitions
-                    file.seek(0)
-                    file.truncate()
-                    json.dump(file_info, file)
-        
-    total_time: int = int((time.time() - start_time) * 100)/100
+    with open(f'.{os.sep}SHA256SUMS', 'w') as file:
+        file.writelines(f'{digest}  {archive_name}\n' for archive_name, digest in sha256_checksums.items())
 
-    print(f'Thread {thread_id} took: {time_formatter(total_time)} to scrape')
+    delta.write_manifest(manifest_path, manifest)
 
 
-def main(url: str, latin_dictionaries: dict, latin_dictionary: str, output_dir: str, thread_count: int, package: bool, compression_type: str, ssl_slowdown: bool, cache_links: bool, use_cache: bool, max_retry_count: int) -> None:
+def main(url: str, latin_dictionaries: dict, latin_dictionary: str, output_dir: str, thread_count: int, package: bool, compression_type: str, ssl_slowdown: bool, cache_links: bool, use_cache: bool, max_retry_count: int, engine: str = 'thread', concurrency: int = 100, parse_processes: int = 0, backend: str = 'html.parser', export: bool = True, resume: bool = False, http_cache_dir: str | None = None, http_cache_size: int = 1073741824, timeout: float = 30.0, initial_rate: float = 50.0, max_rate: float = 1000.0, build_lookup_index: bool = False, metrics_report: str | None = None, metrics_prometheus: str | None = None, role: str = 'standalone', coordinator_address: tuple[str, int] = ('127.0.0.1', 8700), lease_size: int = 100, lease_timeout: float = 300.0, output_format: str = 'json', record_archive: str | None = None, reparse_archive: str | None = None, max_reassignments: int = 3) -> None:
     """
     Main function to scrape the Latin Lexicon website.
 
@@ -418,123 +3356,203 @@ def main(url: str, latin_dictionaries: dict, latin_dictionary: str, output_dir:
     :param output_dir: The directory to save the scraped data.
     :param thread_count: The number of threads to use for scraping.
     :param package: Whether to package the dictionary into a zip file.
-    :param ssl_slowdown: Whether to enable SSL slowdown.
+    :param compression_type: The archive format to package into ('zip', '7z', 'zstd' or 'all').
+    :param ssl_slowdown: Whether to keep the request rate at the initial rate instead of ramping it up.
     :param cache_links: Whether to cache the links to the words.
     :param use_cache: Whether to use the cached links to the words.
     :param max_retry_count: The maximum number of times to retry a connection before giving up.
+    :param engine: The crawl engine to use, either 'thread' or 'async'.
+    :param concurrency: The maximum number of requests in flight for the async engine.
+    :param parse_processes: The number of processes to parse pages in (0 parses in the scraping threads).
+    :param backend: The parser backend to use, one of PARSER_BACKENDS.
+    :param export: Whether to export the storage database to the per-title JSON layout.
+    :param resume: Whether to resume the crawl journaled in the storage database.
+    :param http_cache_dir: The directory of the conditional-request HTTP cache, or None to disable it.
+    :param http_cache_size: The maximum size of the HTTP cache in bytes.
+    :param timeout: The per-request timeout in seconds.
+    :param initial_rate: The starting request rate in requests per second.
+    :param max_rate: The highest request rate in requests per second.
+    :param build_lookup_index: Whether to compile the exported dictionary into memory-mappable word, inflected form and English definition lookup indexes.
+    :param metrics_report: The path to write the JSON run report to, or None.
+    :param metrics_prometheus: The path to write the run metrics to in the Prometheus text format, or None.
+    :param role: 'standalone' to crawl alone, 'coordinator' to lease the links to workers and merge their results, or 'worker' to scrape the links leased by a coordinator.
+    :param coordinator_address: The host and port the coordinator listens on.
+    :param lease_size: The maximum number of links per lease (only for the coordinator).
+    :param lease_timeout: The number of seconds a worker has to return a lease before it is reassigned (only for the coordinator).
+    :param output_format: The format to export the dictionary in, either 'json' for the per-title layout or 'pack' for a single lexicon.pack file.
+    :param record_archive: The path of a page archive to record every fetched page to, or None.
+    :param reparse_archive: The path of a page archive to rebuild the dictionary from instead of crawling, or None.
+    :param max_reassignments: The maximum number of times a link is reassigned after its lease expired (only for the coordinator).
     :return None:
     """
 
-    global hashing_key
-    hashing_key = {}
+    global request_timeout
+    request_timeout = timeout
 
-    dictionary_dir: str = os.path.join(output_dir, 'dictionary')
-    paradigm_dir: str = os.path.join(output_dir, 'paradigm')
+    database_path: str = f'{output_dir}.db'
 
-    if not os.path.exists(dictionary_dir):
-        os.makedirs(dictionary_dir)
-    
-    if not os.path.exists(paradigm_dir):
-        os.makedirs(paradigm_dir)
+    if not resume and role != 'worker':
+        for path in [database_path, f'{database_path}-wal', f'{database_path}-shm']:
+            if os.path.exists(path):
+                os.remove(path)
 
     start_time: float = time.time()
-    all_word_links: list = []
+
+    set_parser_backend(backend)
+
+    if http_cache_dir is not None:
+        set_response_cache(ResponseCache(http_cache_dir, http_cache_size))
+
+    set_run_metrics(RunMetrics())
+    set_rate_controller(RateController(initial_rate, max_rate=initial_rate if ssl_slowdown else max_rate))
+
+    if record_archive is not None:
+        set_page_recorder(page_archive.PageRecorder(record_archive))
+
+    parser_pool: concurrent.futures.ProcessPoolExecutor | None = None
+
+    # A rebuild from a page archive is bound by parsing alone, so it uses every core by default.
+    if parse_processes > 0 or reparse_archive is not None:
+        parser_pool = concurrent.futures.ProcessPoolExecutor(parse_processes or os.cpu_count(), mp_context=multiprocessing.get_context('spawn'), initializer=set_parser_backend, initargs=(backend,))
 
     total_link_count: int = len(string.ascii_lowercase) * len(latin_dictionaries.get(latin_dictionary, []))
-    cache_success: bool = False
+    word_links: list[str] | None = None
+    discovered_pages: set[str] = set()
+
+    if resume:
+        if load_state(database_path, 'links_complete') == '1':
+            word_links = load_links(database_path)
+        else:
+            discovered_pages = load_pages(database_path)
 
-    if use_cache:
+            # The saved links are those of the discovered browse pages, and only the other pages are fetched again.
+            if discovered_pages != set():
+                word_links = load_links(database_path)
+
+            print(f'No complete set of saved links to resume from, scraping links ({len(discovered_pages)} browse pages already discovered)...')
+
+    if use_cache and word_links is None:
         with open(f'.{os.sep}all_word_links.json', 'r') as file:
-            all_word_links = json.load(file).get(latin_dictionary, [])
+            word_links = json.load(file).get(latin_dictionary, [])
 
-            if all_word_links != []:
-                cache_success = True
-            else:
+            if word_links == []:
+                word_links = None
                 print('Cache is empty, scraping links...')
-    
-    if not cache_success:
-        link_count: int = 0
-        session: requests.Session = requests.Session()
-        
+
+    page_urls: list[str] = []
+
+    if word_links is None or discovered_pages != set():
         for letter in string.ascii_lowercase:
             for dictionary in latin_dictionaries.get(latin_dictionary, []):
-                current_word_links: list[str] | list = get_word_links(f'{url}browse_latin.php?p1={letter}&p2={dictionary}', session, max_retry_count)
-                all_word_links += current_word_links
-                link_count += 1
-                print(f'Found {len(current_word_links)} links | {link_count}/{total_link_count} links scraped   ', end='\r')
-    
-    if cache_links and not cache_success:
-        with open(f'.{os.sep}all_word_links.json', 'w') as file:
-            json.dump({latin_dictionary : all_word_links}, file)
-    
+                if f'{url}browse_latin.php?p1={letter}&p2={dictionary}' not in discovered_pages:
+                    page_urls.append(f'{url}browse_latin.php?p1={letter}&p2={dictionary}')
+
     if thread_count > total_link_count:
         print('It is not recommended to use more threads than the number of links. (I dont even know why you would do this)')
         print(f'Setting thread count to {total_link_count}...')
         thread_count = total_link_count
-    
-    all_word_links = list(set(all_word_links))
 
-    print(f'Found {len(all_word_links)} links to scrape...          ')
+    set_http_transport(HttpTransport(concurrency if engine == 'async' else thread_count * 2))
 
-    link_chunks = [all_word_links[i::thread_count] for i in range(thread_count)]
+    if role == 'worker':
+        progress: ProgressReporter = ProgressReporter(0, discovering=True)
+        progress.start()
 
-    threads: list[threading.Thread] = []
+        paradigm_memo: PageMemo = work_for_coordinator(f'http://{coordinator_address[0]}:{coordinator_address[1]}/', url, thread_count, progress, max_retry_count, parser_pool)
 
-    for i in range(thread_count):
-        thread = threading.Thread(target=scrape_thread, args=(link_chunks[i], dictionary_dir, paradigm_dir, url, i+1, ssl_slowdown, max_retry_count))
-        threads.append(thread)
-        thread.start()
+        progress.finish_discovery()
+        progress.stop()
 
-    for thread in threads:
-        thread.join()
+        print(f'Request de-duplication: {paradigm_memo.saved} paradigm requests saved | {paradigm_memo.fetched} paradigm pages fetched')
 
-    with open(os.path.join(output_dir, 'hashing_key.json'), 'w', encoding='unicode-escape') as file:
-        json.dump(hashing_key, file)
+        # The coordinator owns the output, so a worker has nothing to export or package.
+        export = package = build_lookup_index = False
+    else:
+        storage: StorageWriter = StorageWriter(database_path)
+        storage.start()
+
+        progress: ProgressReporter = ProgressReporter(0, discovering=True)
+        progress.start()
+
+        registry: LinkRegistry = LinkRegistry(storage, progress, load_journal(database_path) if resume else None, cache_links and word_links is None)
+        paradigm_memo: PageMemo = PageMemo()
+
+        # The results scraped before a worker failed are still written, so a resumed crawl keeps them.
+        try:
+            if reparse_archive is not None:
+                reparse_pages(reparse_archive, url, registry, storage, progress, parser_pool)
+            elif role == 'coordinator':
+                coordinate(page_urls, word_links, registry, storage, coordinator_address, lease_size, lease_timeout, thread_count, progress, max_retry_count, parser_pool, max_reassignments)
+            elif engine == 'async':
+                asyncio.run(scrape_async(page_urls, word_links, registry, storage, paradigm_memo, url, concurrency, progress, max_retry_count, parser_pool))
+            else:
+                scrape_threads(page_urls, word_links, registry, storage, paradigm_memo, url, thread_count, progress, max_retry_count, parser_pool)
+        finally:
+            progress.stop()
+            storage.close()
+
+        if resume:
+            print(f'Resumed: {registry.skipped} links were already scraped')
+
+        print(f'Request de-duplication: {paradigm_memo.saved} paradigm and {registry.duplicates} word requests saved | {paradigm_memo.fetched} paradigm pages fetched')
+
+    if cache_links and role != 'worker' and word_links is None:
+        with open(f'.{os.sep}all_word_links.json', 'w') as file:
+            json.dump({latin_dictionary : registry.links}, file)
+
+    if parser_pool is not None:
+        parser_pool.shutdown()
+
+    print(rate_controller.summary())
+    print(http_transport.summary())
+    set_rate_controller(None)
+
+    if response_cache is not None:
+        print(response_cache.summary())
+        response_cache.close()
+        set_response_cache(None)
+
+    if page_recorder is not None:
+        page_recorder.close()
+        print(page_recorder.summary())
+        set_page_recorder(None)
+
+    if export or package or build_lookup_index:
+        print('Exporting dictionary...')
+
+        with measure('export'):
+            if output_format == 'pack':
+                export_pack(database_path, output_dir)
+            else:
+                export_storage(database_path, output_dir)
+
+    if build_lookup_index:
+        print('Building lookup indexes...')
+
+        with measure('index'):
+            lexicon_index.build_index(output_dir, os.path.join(output_dir, 'lexicon.idx'))
+            lexicon_index.build_forms_index(output_dir, os.path.join(output_dir, 'forms.idx'))
+            lexicon_index.build_definitions_index(output_dir, os.path.join(output_dir, 'definitions.idx'))
 
     if package:
         print('Packaging dictionary...')
 
-        match compression_type:
-            case 'zip':
-                if os.path.exists(f'{output_dir}.zip'):
-                    os.remove(f'{output_dir}.zip')
-                    print(f'{output_dir}.zip already exists, deleting...')
-                
-                shutil.make_archive(output_dir, 'zip', output_dir, '.', True)
-
-            case '7z':
-                if os.path.exists(f'{output_dir}.7z'):
-                    os.remove(f'{output_dir}.7z')
-                    print(f'{output_dir}.7z already exists, deleting...')
-                
-                with py7zr.SevenZipFile(f'{output_dir}.7z', 'w') as archive:
-                    archive.writeall(output_dir, '/')
-
-            case 'all':
-                if os.path.exists(f'{output_dir}.zip'):
-                    os.remove(f'{output_dir}.zip')
-                    print(f'{output_dir}.zip already exists, deleting...')
-                if os.path.exists(f'{output_dir}.7z'):
-                    os.remove(f'{output_dir}.7z')
-                    print(f'{output_dir}.7z already exists, deleting...')
-                
-                shutil.make_archive(output_dir, 'zip', output_dir, '.', True)
-
-                with py7zr.SevenZipFile(f'{output_dir}.7z', 'w') as archive:
-                    archive.writeall(output_dir, '/')
-            
-        print('Creating checksum...')
+        with measure('package'):
+            package_output(output_dir, compression_type)
 
-        checksums: dict = {}
+    print(run_metrics.summary())
 
-        if compression_type == 'all':
-            checksums['data.zip'] = hashlib.md5(open(f'{output_dir}.zip', 'rb').read()).hexdigest()
-            checksums['data.7z'] = hashlib.md5(open(f'{output_dir}.7z', 'rb').read()).hexdigest()
-        else:
-            checksums[f'data.{compression_type}'] = hashlib.md5(open(f'{output_dir}.{compression_type}', 'rb').read()).hexdigest()
+    if metrics_report is not None:
+        with open(metrics_report, 'w') as file:
+            json.dump(dict(run_metrics.report(), transport=http_transport.stats()), file, indent=4)
+
+    if metrics_prometheus is not None:
+        with open(metrics_prometheus, 'w') as file:
+            file.write(run_metrics.prometheus())
 
-        with open(f'.{os.sep}checksum.json', 'w') as file:
-            json.dump(checksums, file)
+    set_run_metrics(None)
+    http_transport.close()
+    set_http_transport(None)
 
     total_time: int = int((time.time() - start_time) * 100)/100
 
@@ -553,12 +3571,34 @@ if __name__ == "__main__":
     parser.add_argument('--output-dir', default=f'.{os.sep}data{os.sep}', help='Directory to build the dictionary in')
     parser.add_argument('--thread-count', type=int, default=os.cpu_count(), help='Number of threads to use for scraping')
     parser.add_argument('--package', action='store_true', help='Package the dictionary into a zip file')
-    parser.add_argument('--compression-type', choices=['zip', '7z', 'all'], default='7z', help='Type of compression to use (only for package option)')
-    parser.add_argument('--ssl-slowdown', action='store_true', help='Enable SSL slowdown (in case pf timeouts)')
+    parser.add_argument('--compression-type', choices=['zip', '7z', 'zstd', 'all'], default='7z', help='Type of compression to use (only for package option, zstd creates a tar.zst and requires zstandard). With all, the formats are written concurrently. Only zstd compresses on every core; zip and 7z use one core each')
+    parser.add_argument('--ssl-slowdown', action='store_true', help='Keep the request rate at --initial-rate instead of ramping it up (in case of timeouts)')
     parser.add_argument('--latin-dictionary', choices=latin_dictionaries.keys(), default="ALL", help='Select a Latin dictionary to build')
     parser.add_argument('--cache-links', action='store_true', help='Cache the links to the words')
     parser.add_argument('--use-cache', action='store_true', help='Use the cached links to the words (if available)')
     parser.add_argument('--max-retry-count', type=int, default=3, help='Number of times to retry a connection before giving up')
+    parser.add_argument('--request-timeout', type=float, default=30.0, help='Number of seconds to wait for a response before retrying')
+    parser.add_argument('--initial-rate', type=float, default=50.0, help='Starting request rate in requests per second (adapted to the server during the crawl)')
+    parser.add_argument('--max-rate', type=float, default=1000.0, help='Highest request rate in requests per second')
+    parser.add_argument('--engine', choices=['thread', 'async'], default='thread', help='Crawl engine to use (async requires aiohttp)')
+    parser.add_argument('--concurrency', type=int, default=100, help='Maximum number of requests in flight (only for async engine)')
+    parser.add_argument('--parser-backend', choices=PARSER_BACKENDS, default='html.parser', help='HTML parser backend (lxml requires lxml, strainer only parses the needed elements)')
+    parser.add_argument('--skip-export', action='store_true', help='Keep the results only in the SQLite database next to the output directory (ignored with --package)')
+    parser.add_argument('--resume', action='store_true', help='Resume an interrupted crawl, skipping the links it already scraped')
+    parser.add_argument('--http-cache-dir', default=None, help='Directory of an HTTP cache revalidated with conditional requests (disabled by default)')
+    parser.add_argument('--http-cache-size', type=int, default=1024, help='Maximum size of the HTTP cache in megabytes')
+    parser.add_argument('--output-format', choices=['json', 'pack'], default='json', help='Export one JSON file per title (json) or a single lexicon.pack file storing every repeated string and key once (pack, loaded with lexicon_pack.load_pack)')
+    parser.add_argument('--build-index', action='store_true', help='Compile the dictionary into memory-mappable word, inflected form and English definition lookup indexes (lexicon.idx, forms.idx and definitions.idx in the output directory)')
+    parser.add_argument('--metrics-report', default=None, help='Path to write a JSON report of the per-stage timings, HTTP counters and worker throughput to')
+    parser.add_argument('--metrics-prometheus', default=None, help='Path to write the run metrics to in the Prometheus text format (e.g. for the node exporter textfile collector)')
+    parser.add_argument('--parse-processes', type=int, default=0, help='Number of processes to parse pages in (0 parses in the scraping threads)')
+    parser.add_argument('--role', choices=['standalone', 'coordinator', 'worker'], default='standalone', help='Crawl alone, lease the links to workers and merge their results into the output (coordinator), or scrape the links leased by a coordinator with --thread-count threads (worker)')
+    parser.add_argument('--coordinator', default='127.0.0.1:8700', help='HOST:PORT the coordinator listens on (e.g. 0.0.0.0:8700 to accept other machines) or workers connect to, unauthenticated so keep it on a trusted network')
+    parser.add_argument('--lease-size', type=int, default=100, help='Maximum number of links leased to a worker at a time (only for coordinator role)')
+    parser.add_argument('--lease-timeout', type=float, default=300.0, help='Number of seconds a worker has to return a lease before it is reassigned to another worker (only for coordinator role)')
+    parser.add_argument('--max-reassignments', type=int, default=3, help='Maximum number of times a link is reassigned after its lease expired before it is abandoned (only for coordinator role)')
+    parser.add_argument('--record', default=None, help='Path of a page archive (.warc.gz with a .cdx index) to append every fetched page to, so the dictionary can be rebuilt with --reparse')
+    parser.add_argument('--reparse', default=None, help='Rebuild the dictionary from a page archive recorded with --record instead of crawling, parsing in --parse-processes processes (every core by default)')
 
     args = parser.parse_args()
 
@@ -569,7 +3609,36 @@ if __name__ == "__main__":
         thread_count = 1
         print('Thread count cannot be less than 1. Setting thread count to 1')
 
-    if os.path.exists(output_dir):
+    if args.concurrency < 1:
+        args.concurrency = 1
+        print('Concurrency cannot be less than 1. Setting concurrency to 1')
+
+    if args.engine == 'async' and aiohttp is None:
+        print('The async engine requires aiohttp. Please install it with: pip install aiohttp')
+        exit(1)
+
+    if args.parser_backend == 'lxml' and lxml is None:
+        print('The lxml parser backend requires lxml. Please install it with: pip install lxml')
+        exit(1)
+
+    coordinator_host, _, coordinator_port = args.coordinator.rpartition(':')
+
+    if not coordinator_port.isdigit():
+        print('The coordinator address must be given as HOST:PORT')
+        exit(1)
+
+    if args.reparse is not None and (args.role != 'standalone' or args.record is not None):
+        print('--reparse rebuilds the dictionary without crawling, so it cannot be combined with --record or a coordinator or worker role')
+        exit(1)
+
+    if args.reparse is not None and not os.path.exists(args.reparse):
+        print(f'{args.reparse} does not exist')
+        exit(1)
+
+    if args.role == 'worker':
+        args.package = False
+
+    if os.path.exists(output_dir) and not args.resume and args.role != 'worker':
         confirm: str = input(f'{output_dir} already exists. Do you want to delete it? (Y/n): ')
 
         if confirm.lower() == 'y' or confirm == '':
@@ -578,16 +3647,22 @@ if __name__ == "__main__":
             print('Aborting. Please provide a new directory.')
             exit(1)
     
-    if (os.path.exists(f'.{os.sep}checksum.json') or os.path.exists(f'.{os.sep}data.{args.compression_type}')) and args.package:
+    package_extension: str = ARCHIVE_WRITERS[args.compression_type][0] if args.compression_type in ARCHIVE_WRITERS else args.compression_type
+
+    if (os.path.exists(f'.{os.sep}checksum.json') or os.path.exists(f'.{os.sep}data.{package_extension}')) and args.package:
         confirm: str = input(f'Seems as if there is already a package in this directory. Do you want to delete it? (Y/n): ')
 
         if confirm.lower() == 'y' or confirm == '':
             if os.path.exists(f'.{os.sep}checksum.json'):
                 os.remove(f'.{os.sep}checksum.json')
+
+            if os.path.exists(f'.{os.sep}SHA256SUMS'):
+                os.remove(f'.{os.sep}SHA256SUMS')
             
-            if os.path.exists(f'.{os.sep}data.{args.compression_type}'):
-                os.remove(f'.{os.sep}data.{args.compression_type}')
+            if os.path.exists(f'.{os.sep}data.{package_extension}'):
+                os.remove(f'.{os.sep}data.{package_extension}')
 
-    os.makedirs(output_dir, exist_ok=True)
+    if args.role != 'worker':
+        os.makedirs(output_dir, exist_ok=True)
 
-    main(url, latin_dictionaries, args.latin_dictionary, output_dir, thread_count, args.package, args.compression_type, args.ssl_slowdown, args.cache_links, args.use_cache, args.max_retry_count)
\ No newline at end of file
+    main(args.url, latin_dictionaries, args.latin_dictionary, output_dir, thread_count, args.package, args.compression_type, args.ssl_slowdown, args.cache_links, args.use_cache, args.max_retry_count, args.engine, args.concurrency, max(args.parse_processes, 0), args.parser_backend, not args.skip_export, args.resume, args.http_cache_dir, args.http_cache_size * 1048576, args.request_timeout, max(args.initial_rate, 1.0), max(args.max_rate, 1.0), args.build_index, args.metrics_report, args.metrics_prometheus, args.role, (coordinator_host or '127.0.0.1', int(coordinator_port)), max(args.lease_size, 1), max(args.lease_timeout, 1.0), args.output_format, args.record, args.reparse, max(args.max_reassignments, 0))
\ No newline at end of file
@@ -0,0 +1,331 @@
+import os
+import gzip
+import zlib
+import uuid
+import argparse
+import datetime
+import functools
+import threading
+
+
+INDEX_SUFFIX: str = '.cdx'
+
+
+def warc_record(uri: str, body: bytes, content_type: str | None) -> bytes:
+    """
+    Build a WARC/1.0 response record holding an HTTP response.
+
+    :param uri: The URL that was requested.
+    :param body: The response body.
+    :param content_type: The Content-Type of the response, or None if the server sent none.
+    :return bytes: The uncompressed record.
+    """
+
+    http_headers: str = 'HTTP/1.1 200 OK\r\n'
+
+    if content_type is not None:
+        http_headers += f'Content-Type: {content_type}\r\n'
+
+    block: bytes = f'{http_headers}Content-Length: {len(body)}\r\n\r\n'.encode('latin-1') + body
+    date: str = datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+    warc_headers: str = (
+        'WARC/1.0\r\n'
+        'WARC-Type: response\r\n'
+        f'WARC-Target-URI: {uri}\r\n'
+        f'WARC-Date: {date}\r\n'
+        f'WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>\r\n'
+        'Content-Type: application/http; msgtype=response\r\n'
+        f'Content-Length: {len(block)}\r\n\r\n'
+    )
+
+    return warc_headers.encode('utf-8') + block + b'\r\n\r\n'
+
+
+def parse_headers(lines: list[bytes]) -> dict:
+    """
+    Parse header lines into a dictionary.
+
+    :param lines: The header lines, without the status or version line.
+    :return dict: The header values by name.
+    """
+
+    headers: dict = {}
+
+    for line in lines:
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip()] = value.strip()
+
+    return headers
+
+
+def parse_record(record: bytes) -> tuple[dict, bytes, dict, bytes]:
+    """
+    Split an uncompressed WARC response record into its headers and the HTTP response it holds.
+
+    :param record: The uncompressed record.
+    :return tuple: The WARC headers, the HTTP status line, the HTTP headers and the response body.
+    """
+
+    warc_head, _, rest = record.partition(b'\r\n\r\n')
+    warc_headers: dict = parse_headers(warc_head.split(b'\r\n')[1:])
+    block: bytes = rest[:int(warc_headers['Content-Length'])]
+
+    http_head, _, body = block.partition(b'\r\n\r\n')
+    http_lines: list[bytes] = http_head.split(b'\r\n')
+
+    return warc_headers, http_lines[0], parse_headers(http_lines[1:]), body
+
+
+class PageRecorder:
+    """
+    Append raw response bodies to a page archive while crawling.
+
+    The archive is a WARC file with one gzip member per response record, so it
+    can be read by standard WARC tools, and a CDX-like index next to it maps
+    every URL to the offset and length of its member. Records are compressed by
+    the calling thread and only the appends are serialized. An existing archive
+    is appended to, and the latest record of a URL wins.
+    """
+
+    def __init__(self, archive_path: str) -> None:
+        """
+        Open a page archive for appending.
+
+        :param archive_path: The path of the .warc.gz archive.
+        :return None:
+        """
+
+        self.archive_path: str = archive_path
+        self.records: int = 0
+        self.body_bytes: int = 0
+
+        self._lock: threading.Lock = threading.Lock()
+        self._file = open(archive_path, 'ab')
+        self._index = open(f'{archive_path}{INDEX_SUFFIX}', 'a', encoding='utf-8')
+
+    def record(self, uri: str, body: bytes, content_type: str | None) -> None:
+        """
+        Record a response body.
+
+        :param uri: The URL that was requested.
+        :param body: The response body.
+        :param content_type: The Content-Type of the response, or None if the server sent none.
+        :return None:
+        """
+
+        member: bytes = gzip.compress(warc_record(uri, body, content_type), compresslevel=6, mtime=0)
+
+        with self._lock:
+            offset: int = self._file.tell()
+
+            self._file.write(member)
+            self._index.write(f'{uri} {offset} {len(member)}\n')
+
+            self.records += 1
+            self.body_bytes += len(body)
+
+    def close(self) -> None:
+        """
+        Flush and close the archive and its index.
+
+        :return None:
+        """
+
+        with self._lock:
+            self._file.close()
+            self._index.close()
+
+    def summary(self) -> str:
+        """
+        Summarize the recorded pages.
+
+        :return str: A one-line summary.
+        """
+
+        archive_size: int = os.path.getsize(self.archive_path) if os.path.exists(self.archive_path) else 0
+
+        return f'Page archive: {self.records} pages recorded to {self.archive_path} | {self.body_bytes / 1048576:.2f} MB of bodies | {archive_size / 1048576:.2f} MB archive'
+
+
+class PageArchive:
+    """
+    Read the pages of an archive written by PageRecorder.
+
+    Only the gzip member of a requested URL is decompressed. The index is read
+    from the CDX file, or rebuilt by scanning the members if it is missing.
+    """
+
+    def __init__(self, archive_path: str) -> None:
+        """
+        Open a page archive and load its index.
+
+        :param archive_path: The path of the .warc.gz archive.
+        :return None:
+        """
+
+        self.archive_path: str = archive_path
+
+        self._lock: threading.Lock = threading.Lock()
+        self._file = open(archive_path, 'rb')
+        self._index: dict = {}
+
+        index_path: str = f'{archive_path}{INDEX_SUFFIX}'
+
+        if os.path.exists(index_path):
+            with open(index_path, 'r', encoding='utf-8') as file:
+                for line in file:
+                    uri, offset, length = line.rsplit(' ', 2)
+                    self._index[uri] = (int(offset), int(length))
+        else:
+            self._index = self.scan()
+
+        # An interrupted crawl may have indexed a member it did not finish writing.
+        archive_size: int = os.path.getsize(archive_path)
+        self._index = {uri: (offset, length) for uri, (offset, length) in self._index.items() if offset + length <= archive_size}
+
+    def scan(self) -> dict:
+        """
+        Rebuild the index by decompressing every member of the archive.
+
+        :return dict: The offset and length of the latest member of every URL.
+        """
+
+        index: dict = {}
+        offset: int = 0
+
+        with open(self.archive_path, 'rb') as file:
+            while True:
+                decompressor = zlib.decompressobj(wbits=31)
+                parts: list[bytes] = []
+                read_size: int = 0
+
+                file.seek(offset)
+
+                # Members are fed in chunks so the data left over after a
+                # member is never more than one chunk.
+                try:
+                    while not decompressor.eof:
+                        chunk: bytes = file.read(16384)
+
+                        if chunk == b'':
+                            break
+
+                        read_size += len(chunk)
+                        parts.append(decompressor.decompress(chunk))
+                except zlib.error:
+                    break
+
+                if not decompressor.eof:
+                    break
+
+                length: int = read_size - len(decompressor.unused_data)
+                warc_headers, _, _, _ = parse_record(b''.join(parts))
+
+                if warc_headers.get('WARC-Type') == 'response':
+                    index[warc_headers['WARC-Target-URI']] = (offset, length)
+
+                offset += length
+
+        return index
+
+    def uris(self) -> list[str]:
+        """
+        List the recorded URLs.
+
+        :return list[str]: The URLs, in the order they were first recorded.
+        """
+
+        return list(self._index)
+
+    def read(self, uri: str) -> tuple[bytes, str | None] | None:
+        """
+        Read the latest recorded body of a URL.
+
+        :param uri: The URL that was requested.
+        :return tuple[bytes, str | None] | None: The body and its Content-Type, or None if the URL was not recorded.
+        """
+
+        location: tuple[int, int] | None = self._index.get(uri)
+
+        if location is None:
+            return None
+
+        with self._lock:
+            self._file.seek(location[0])
+            member: bytes = self._file.read(location[1])
+
+        _, _, http_headers, body = parse_record(zlib.decompress(member, wbits=31))
+
+        return body, http_headers.get('Content-Type')
+
+    def write_index(self) -> None:
+        """
+        Write the index to the CDX file next to the archive, keeping only the latest member of every URL.
+
+        :return None:
+        """
+
+        with open(f'{self.archive_path}{INDEX_SUFFIX}', 'w', encoding='utf-8') as file:
+            for uri, (offset, length) in self._index.items():
+                file.write(f'{uri} {offset} {length}\n')
+
+    def close(self) -> None:
+        """
+        Close the archive.
+
+        :return None:
+        """
+
+        self._file.close()
+
+    def __enter__(self) -> 'PageArchive':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+@functools.lru_cache(maxsize=4)
+def open_archive(archive_path: str) -> PageArchive:
+    """
+    Open a page archive once per process, so parser processes keep its index between tasks.
+
+    :param archive_path: The path of the .warc.gz archive.
+    :return PageArchive: The shared page archive.
+    """
+
+    return PageArchive(archive_path)
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description='List or read the pages of a page archive recorded with --record.')
+
+    parser.add_argument('archive_path', help='Path of the .warc.gz page archive')
+    parser.add_argument('uris', nargs='*', help='URLs to print the recorded body of (lists every recorded URL if omitted)')
+    parser.add_argument('--reindex', action='store_true', help='Rebuild the .cdx index by scanning the archive')
+
+    args = parser.parse_args()
+
+    if args.reindex:
+        index_path: str = f'{args.archive_path}{INDEX_SUFFIX}'
+
+        if os.path.exists(index_path):
+            os.remove(index_path)
+
+    with PageArchive(args.archive_path) as archive:
+        if args.reindex:
+            archive.write_index()
+            print(f'Indexed {len(archive.uris())} pages')
+        elif args.uris == []:
+            for uri in archive.uris():
+                print(uri)
+        else:
+            for uri in args.uris:
+                page: tuple[bytes, str | None] | None = archive.read(uri)
+
+                if page is None:
+                    print(f'{uri} was not recorded')
+                    exit(1)
+
+                print(page[0].decode('utf-8', errors='replace'))
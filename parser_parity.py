@@ -0,0 +1,112 @@
+import os
+import sys
+import time
+import argparse
+
+import main
+import benchmark
+
+
+PAGE_PARSERS: dict = {
+    'definition': main.parse_word_info,
+    'paradigms': main.parse_paradigm_info,
+    'browse_latin': main.parse_word_links
+}
+
+
+def load_pages(pages_dir: str) -> list[tuple[str, str, str]]:
+    """
+    Load the recorded sample pages from a directory.
+
+    A corpus written by benchmark.write_corpus is read through its index.json,
+    and its pages are matched to a parser by link. Other pages are matched by
+    file name prefix: definition*.html, paradigms*.html and browse_latin*.html.
+
+    :param pages_dir: The directory containing the recorded pages.
+    :return list: A list of (link or file name, page kind, html) tuples.
+    """
+
+    pages: list[tuple[str, str, str]] = []
+
+    if os.path.exists(os.path.join(pages_dir, 'index.json')):
+        named_pages: list[tuple[str, str]] = sorted(benchmark.load_corpus(pages_dir).items())
+    else:
+        named_pages: list[tuple[str, str]] = []
+
+        for file_name in sorted(os.listdir(pages_dir)):
+            if file_name.endswith('.html'):
+                with open(os.path.join(pages_dir, file_name), 'r', encoding='utf-8') as file:
+                    named_pages.append((file_name, file.read()))
+
+    for name, html in named_pages:
+        for kind in PAGE_PARSERS:
+            if name.startswith(kind):
+                pages.append((name, kind, html))
+                break
+
+    return pages
+
+
+def check_parity(pages: list[tuple[str, str, str]], backends: list[str], rounds: int = 1) -> tuple[list[str], dict]:
+    """
+    Parse every page with every backend and compare the results to the first backend.
+
+    :param pages: The pages returned by load_pages.
+    :param backends: The parser backends to compare.
+    :param rounds: The number of times to parse every page when timing.
+    :return tuple: A list of mismatch descriptions and the mean parse time in milliseconds per backend.
+    """
+
+    results: dict = {}
+    timings: dict = {}
+
+    for backend in backends:
+        main.set_parser_backend(backend)
+        results[backend] = []
+
+        start_time: float = time.perf_counter()
+
+        for _ in range(rounds):
+            results[backend] = [PAGE_PARSERS[kind](html) for _, kind, html in pages]
+
+        timings[backend] = (time.perf_counter() - start_time) * 1000 / max(len(pages) * rounds, 1)
+
+    main.set_parser_backend('html.parser')
+
+    mismatches: list[str] = []
+    reference: str = backends[0]
+
+    for backend in backends[1:]:
+        for i in range(len(pages)):
+            if results[backend][i] != results[reference][i]:
+                mismatches.append(f'{pages[i][0]}: {backend} differs from {reference}')
+
+    return mismatches, timings
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description='Check that every parser backend produces identical results on recorded pages.')
+
+    parser.add_argument('pages_dir', help='Corpus directory written by benchmark.py, or directory of recorded definition*, paradigms* and browse_latin* HTML pages')
+    parser.add_argument('--backends', nargs='+', choices=main.PARSER_BACKENDS, default=[backend for backend in main.PARSER_BACKENDS if backend != 'lxml' or main.lxml is not None], help='Parser backends to compare (the first is the reference)')
+    parser.add_argument('--rounds', type=int, default=5, help='Number of times to parse every page when timing')
+
+    args = parser.parse_args()
+
+    pages: list[tuple[str, str, str]] = load_pages(args.pages_dir)
+
+    if pages == []:
+        print(f'No recorded pages found in {args.pages_dir}')
+        sys.exit(1)
+
+    mismatches, timings = check_parity(pages, args.backends, max(args.rounds, 1))
+
+    for backend in args.backends:
+        print(f'{backend}: {timings[backend]:.3f} ms per page')
+
+    for mismatch in mismatches:
+        print(mismatch)
+
+    print(f'{len(pages)} pages checked, {len(mismatches)} mismatches')
+
+    sys.exit(1 if mismatches else 0)
@@ -0,0 +1,132 @@
+import os
+import bs4
+import unittest
+
+import main
+import benchmark
+
+
+def baseline_text_cleaner(text: str) -> str:
+    cleaned_text: str = text.strip()
+    cleaned_text = cleaned_text.lower()
+
+    cleaned_text = cleaned_text.replace('\n', ' ')
+    cleaned_text = cleaned_text.replace('\t', ' ')
+
+    return cleaned_text
+
+
+def baseline_title_cleaner(title: str) -> list[str]:
+    cleaned_title: str = baseline_text_cleaner(title)
+
+    cleaned_title = cleaned_title.replace(', ', ',')
+    cleaned_title = cleaned_title.replace(',', ', ')
+
+    cleaned_title_list: list[str] = cleaned_title.split(', ')
+
+    for i in range(len(cleaned_title_list)):
+        cleaned_title_list[i] = cleaned_title_list[i].strip()
+
+        if cleaned_title_list[i].endswith('-'):
+            cleaned_title_list[i] = cleaned_title_list[i][0:-1]
+
+        if cleaned_title_list[i].startswith('-'):
+            cleaned_title_list[i] = cleaned_title_list[i][1:]
+
+    for char in ['-', '', ', ', ',']:
+        while char in cleaned_title_list:
+            cleaned_title_list.remove(char)
+
+    return list(set(cleaned_title_list))
+
+
+def baseline_definition_cleaner(definition: str) -> list[str]:
+    definition = baseline_text_cleaner(definition)
+
+    if '[' in definition and ']' in definition:
+        start: int = definition.index('[')
+        end: int = definition.index(']') + 2
+
+        if end >= len(definition):
+            definition = definition[0:start]
+        else:
+            definition = definition[end:]
+
+    if '(' in definition:
+        start: int = definition.index('(')
+        end: int = len(definition)
+
+        if ')' in definition:
+            end = definition.index(')') + 2
+
+        if end >= len(definition):
+            definition = definition[0:start]
+        else:
+            definition = definition[end:]
+
+    definitions: list[str] = definition.split(', ')
+
+    for i in range(len(definitions)):
+        definitions[i] = definitions[i].strip()
+
+        if definitions[i].endswith('-'):
+            definitions[i] = definitions[i][0:-1]
+
+    for char in ['-', '', ', ', ',']:
+        while char in definitions:
+            definitions.remove(char)
+
+    return list(set(definitions))
+
+
+EDGE_CASES: list[str] = [
+    '', ' ', '-', ',', ', ,', '--', ' - , - ', 'rosa', 'ROSA, ROSAE, -ROS-', 'rosa,rosae ,, -ros', 'a, a, b, a',
+    '\n\t[1] (of war) fight, battle-  ', '[1]', '[1] x', '(of war)', '(unclosed note, word', 'word [2]', 'x ] y [ z',
+    'first (a) second (b) third', '[1] (a) [2] (b) c, d', 'bellum, -i, n.', 'water-, -fire, fire', 'ārum, īs'
+]
+
+
+class CleaningTest(unittest.TestCase):
+    """
+    Check the cleaners against the original implementation, which returned the same values in a random order.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.titles: list[str] = list(EDGE_CASES)
+        cls.definitions: list[str] = list(EDGE_CASES)
+
+        for html in benchmark.load_corpus(os.path.join(os.path.dirname(__file__), 'pages')).values():
+            soup: bs4.BeautifulSoup = bs4.BeautifulSoup(html, 'html.parser')
+
+            cls.titles += [title.text for title in soup.find_all('div', class_='flash_card_title')]
+            cls.definitions += [item.text.strip() for item in soup.select('ol.flash_card_english_def li')]
+            cls.definitions += [cell.text.strip().lower() for cell in soup.select('div.noun_paradigm_container td')]
+
+    def test_recorded_corpus_has_text(self) -> None:
+        self.assertGreater(len(self.titles), len(EDGE_CASES))
+        self.assertGreater(len(self.definitions), len(EDGE_CASES) * 2)
+
+    def test_title_cleaner_keeps_the_values(self) -> None:
+        for title in self.titles:
+            cleaned: list[str] = main.title_cleaner(title)
+
+            self.assertEqual(set(cleaned), set(baseline_title_cleaner(title)), title)
+            self.assertEqual(len(cleaned), len(set(cleaned)), title)
+
+    def test_definition_cleaner_keeps_the_values(self) -> None:
+        for definition in self.definitions:
+            cleaned: list[str] = main.definition_cleaner(definition)
+
+            self.assertEqual(set(cleaned), set(baseline_definition_cleaner(definition)), definition)
+            self.assertEqual(len(cleaned), len(set(cleaned)), definition)
+
+        self.assertEqual(main.definition_batch_cleaner(self.definitions), [main.definition_cleaner(definition) for definition in self.definitions])
+
+    def test_values_keep_the_page_order(self) -> None:
+        self.assertEqual(main.title_cleaner('ROSA, ROSAE, -ROS-, ROSA'), ['rosa', 'rosae', 'ros'])
+        self.assertEqual(main.definition_cleaner('[1] (of war) fight, battle-, war, fight'), ['fight', 'battle', 'war'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,176 @@
+import io
+import os
+import socket
+import tempfile
+import threading
+import unittest
+import contextlib
+import multiprocessing
+import unittest.mock
+
+import main
+import benchmark
+from test_resume import crawl, load_output
+
+
+def run_worker(url: str, output_dir: str, coordinator_address: tuple[str, int], poison: str | None = None, crash: bool = False) -> None:
+    # The word page holding the poison raises in the parser, or kills the whole worker process if crash is set.
+    if poison is not None:
+        parse_word_info = main.parse_word_info
+
+        def parse_poisoned(html: str) -> dict:
+            if poison in html:
+                if crash:
+                    os._exit(1)
+
+                raise RuntimeError('parser crashed')
+
+            return parse_word_info(html)
+
+        main.parse_word_info = parse_poisoned
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        main.main(url, {'ALL': [1, 2, 4]}, 'ALL', output_dir, 4, False, 'zip', False, False, False, max_retry_count=3, initial_rate=1000.0, role='worker', coordinator_address=coordinator_address)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class DistributedTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.work_dir: tempfile.TemporaryDirectory = tempfile.TemporaryDirectory()
+
+        corpus_dir: str = os.path.join(self.work_dir.name, 'corpus')
+        benchmark.generate_corpus(corpus_dir, 60)
+
+        self.server: benchmark.FixtureServer = benchmark.FixtureServer(benchmark.load_corpus(corpus_dir))
+        self.server.start()
+
+    def tearDown(self) -> None:
+        self.server.stop()
+        self.work_dir.cleanup()
+
+    def test_killed_worker_lease_is_reassigned(self) -> None:
+        expected_dir: str = os.path.join(self.work_dir.name, 'expected')
+        output_dir: str = os.path.join(self.work_dir.name, 'data')
+        address: tuple[str, int] = ('127.0.0.1', free_port())
+
+        crawl(self.server.url, expected_dir, max_retry_count=3)
+
+        # Every lease keeps a worker busy for a while, so the first worker is killed while it holds one.
+        self.server.latency = 0.05
+
+        context = multiprocessing.get_context('spawn')
+        workers: list = [context.Process(target=run_worker, args=(self.server.url, output_dir, address)) for _ in range(2)]
+
+        lease = main.LeaseQueue.lease
+        grants: list[str] = []
+        lease_queues: list[main.LeaseQueue] = []
+        second_lease: threading.Event = threading.Event()
+
+        def record_lease(lease_queue: main.LeaseQueue, worker: str) -> tuple[int, list[str]] | None:
+            leased: tuple[int, list[str]] | None = lease(lease_queue, worker)
+
+            if lease_queues == []:
+                lease_queues.append(lease_queue)
+
+            if leased is not None:
+                grants.append(worker)
+
+                if worker.endswith(f'-{workers[0].pid}') and grants.count(worker) == 2:
+                    second_lease.set()
+
+            return leased
+
+        errors: list = []
+
+        def run_coordinator() -> None:
+            try:
+                crawl(self.server.url, output_dir, max_retry_count=3, role='coordinator', coordinator_address=address, lease_size=4, lease_timeout=2.0)
+            except Exception as error:
+                errors.append(error)
+
+        with unittest.mock.patch.object(main.LeaseQueue, 'lease', record_lease):
+            coordinator: threading.Thread = threading.Thread(target=run_coordinator, daemon=True)
+            coordinator.start()
+
+            for worker in workers:
+                worker.start()
+
+            try:
+                self.assertTrue(second_lease.wait(timeout=60), 'the first worker was never leased a second batch')
+
+                workers[0].kill()
+                workers[1].join(timeout=120)
+                coordinator.join(timeout=120)
+            finally:
+                for worker in workers:
+                    worker.kill()
+                    worker.join()
+
+        self.assertFalse(coordinator.is_alive(), 'the coordinator did not finish')
+        self.assertEqual(errors, [])
+        self.assertEqual(workers[1].exitcode, 0)
+
+        self.assertGreaterEqual(lease_queues[0].expired, 1)
+        self.assertEqual(load_output(output_dir), load_output(expected_dir))
+
+    def crawl_with_poison(self, worker_count: int, crash: bool) -> tuple[Exception | None, set[str]]:
+        expected_dir: str = os.path.join(self.work_dir.name, 'expected')
+        output_dir: str = os.path.join(self.work_dir.name, 'data')
+        address: tuple[str, int] = ('127.0.0.1', free_port())
+
+        crawl(self.server.url, expected_dir, max_retry_count=3)
+
+        # Orthography ID 5012 belongs to a single word of the corpus.
+        context = multiprocessing.get_context('spawn')
+        workers: list = [context.Process(target=run_worker, args=(self.server.url, output_dir, address, 'Orthography ID = 5012', crash)) for _ in range(worker_count)]
+        errors: list = []
+
+        def run_coordinator() -> None:
+            try:
+                crawl(self.server.url, output_dir, max_retry_count=3, role='coordinator', coordinator_address=address, lease_size=1, lease_timeout=1.0, max_reassignments=1)
+            except Exception as error:
+                errors.append(error)
+
+        coordinator: threading.Thread = threading.Thread(target=run_coordinator, daemon=True)
+        coordinator.start()
+
+        for worker in workers:
+            worker.start()
+
+        try:
+            coordinator.join(timeout=120)
+        finally:
+            for worker in workers:
+                worker.kill()
+                worker.join()
+
+        self.assertFalse(coordinator.is_alive(), 'the coordinator did not finish')
+
+        missing: set[str] = set(main.load_journal(f'{expected_dir}.db')) - set(main.load_journal(f'{output_dir}.db'))
+
+        return errors[0] if errors != [] else None, missing
+
+    def test_failing_link_is_returned_as_failed(self) -> None:
+        error, missing = self.crawl_with_poison(1, False)
+
+        self.assertIsInstance(error, RuntimeError)
+        self.assertIn('1 links raised on the workers', str(error))
+        self.assertEqual(len(missing), 1)
+        self.assertIn('p1=1012&', missing.pop())
+
+    def test_crashing_link_is_abandoned(self) -> None:
+        error, missing = self.crawl_with_poison(3, True)
+
+        self.assertIsInstance(error, RuntimeError)
+        self.assertIn('1 links were abandoned', str(error))
+        self.assertEqual(len(missing), 1)
+        self.assertIn('p1=1012&', missing.pop())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import threading
+import unittest
+import http.server
+
+import main
+
+
+class OkHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version: str = 'HTTP/1.1'
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+
+class HttpTransportTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.transport: main.HttpTransport = main.HttpTransport(4)
+
+    def tearDown(self) -> None:
+        self.transport.close()
+
+    def test_every_thread_has_its_own_session(self) -> None:
+        sessions: list = []
+        thread: threading.Thread = threading.Thread(target=lambda: sessions.append(self.transport.session))
+        thread.start()
+        thread.join()
+
+        self.assertIs(self.transport.session, self.transport.session)
+        self.assertIsNot(sessions[0], self.transport.session)
+
+        # Every session shares the same pooled adapter.
+        self.assertIs(sessions[0].get_adapter('http://127.0.0.1/'), self.transport.session.get_adapter('http://127.0.0.1/'))
+
+    def test_connections_of_evicted_pools_are_counted(self) -> None:
+        # The pool manager keeps 10 host pools, so the first servers' pools are evicted.
+        servers: list[http.server.ThreadingHTTPServer] = [http.server.ThreadingHTTPServer(('127.0.0.1', 0), OkHandler) for _ in range(12)]
+
+        for server in servers:
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        try:
+            for server in servers:
+                for _ in range(2):
+                    self.assertEqual(self.transport.session.get(f'http://127.0.0.1:{server.server_address[1]}/').text, 'ok')
+        finally:
+            for server in servers:
+                server.shutdown()
+                server.server_close()
+
+        self.assertEqual(self.transport.connections_opened(), 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import os
+import tempfile
+import unittest
+
+import benchmark
+import lexicon_index
+from test_resume import crawl
+
+
+class CrawledIndexTest(unittest.TestCase):
+    """
+    Crawl a generated corpus once with --build-index and check the indexes against the exported files.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.work_dir: tempfile.TemporaryDirectory = tempfile.TemporaryDirectory()
+        cls.output_dir: str = os.path.join(cls.work_dir.name, 'data')
+
+        corpus_dir: str = os.path.join(cls.work_dir.name, 'corpus')
+        benchmark.generate_corpus(corpus_dir, 60)
+
+        server: benchmark.FixtureServer = benchmark.FixtureServer(benchmark.load_corpus(corpus_dir))
+        server.start()
+
+        try:
+            crawl(server.url, cls.output_dir, max_retry_count=3, build_lookup_index=True)
+        finally:
+            server.stop()
+
+        cls.words: dict = lexicon_index.load_dictionary(cls.output_dir)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.work_dir.cleanup()
+
+
+class LexiconIndexTest(CrawledIndexTest):
+    def test_lookup_matches_the_dictionary(self) -> None:
+        self.assertGreater(len(self.words), 0)
+
+        with lexicon_index.LexiconIndex(os.path.join(self.output_dir, 'lexicon.idx')) as index:
+            self.assertEqual(len(index), len(self.words))
+
+            for word, definitions in self.words.items():
+                self.assertEqual(index.lookup(word), definitions)
+                self.assertEqual(index.lookup(f' {word.upper()} '), definitions)
+
+            self.assertIsNone(index.lookup('nonexistentia'))
+
+            for prefix in ['a', 'ro', 'zz', '']:
+                self.assertEqual(index.prefix(prefix, limit=1000), sorted(word for word in self.words if word.startswith(prefix)))
+
+            self.assertEqual(len(index.prefix('', limit=3)), 3)
+
+        word: str = next(iter(self.words))
+
+        self.assertEqual(lexicon_index.lookup(os.path.join(self.output_dir, 'lexicon.idx'), word), self.words[word])
+
+
+class FormsIndexTest(CrawledIndexTest):
+    def test_every_paradigm_cell_is_lemmatized(self) -> None:
+        forms: set[str] = set()
+        cells: dict = {}
+
+        # Forms differing only in vowel length share their cells.
+        for paradigm_info in lexicon_index.load_entries(self.output_dir, 'paradigm'):
+            for i in range(paradigm_info.get('forms', 0)):
+                for column, rows in paradigm_info[str(i)].items():
+                    for row, cell_forms in rows.items():
+                        for form in cell_forms:
+                            forms.add(form)
+                            cells.setdefault(lexicon_index.normalize_form(form), set()).add((paradigm_info['word'], column, row, i))
+
+        self.assertGreater(len(forms), len(cells))
+
+        with lexicon_index.FormsIndex(os.path.join(self.output_dir, 'forms.idx')) as index:
+            self.assertEqual(len(index), len(cells))
+
+            for form in forms:
+                expected: set = cells[lexicon_index.normalize_form(form)]
+
+                self.assertEqual(set(index.lemmatize(form)), expected)
+                self.assertEqual(set(index.lemmatize(lexicon_index.normalize_form(form).upper())), expected)
+                self.assertEqual(sorted(index.lemmas(form)), sorted({lemma for lemma, _, _, _ in expected}))
+
+            tokens: list[str] = sorted(forms)[:5] + ['nonexistentia']
+
+            self.assertEqual(index.lemmatize('nonexistentia'), [])
+            self.assertEqual(index.lemmatize_tokens(tokens + tokens), [index.lemmas(token) for token in tokens + tokens])
+
+
+class DefinitionsIndexTest(CrawledIndexTest):
+    def scan(self, query: str) -> list[str]:
+        terms: set[str] = set(lexicon_index.tokenize_definition(query))
+
+        return sorted(word for word, definitions in self.words.items() if terms <= {term for definition in definitions for term in lexicon_index.tokenize_definition(definition)})
+
+    def test_search_matches_a_full_scan(self) -> None:
+        self.assertEqual(lexicon_index.decode_postings(lexicon_index.encode_postings([0, 1, 127, 128, 70000])), [0, 1, 127, 128, 70000])
+
+        with lexicon_index.DefinitionsIndex(os.path.join(self.output_dir, 'definitions.idx')) as index:
+            self.assertEqual(index.headword_count, len(self.words))
+
+            for query in ['war', 'WAR', 'rose garland', 'war peace sea', 'of', 'nonexistentia', 'war nonexistentia', '']:
+                self.assertEqual(index.search(query), self.scan(query) if query != '' else [])
+
+            self.assertGreater(len(index.search('war')), 1)
+            self.assertEqual(index.search('war', limit=1), index.search('war')[:1])
+            self.assertIn('war', index.prefix('wa'))
+            self.assertNotIn('', index.prefix(''))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import zipfile
+import tempfile
+import unittest
+
+import benchmark
+import lexicon_pack
+import lexicon_archive
+from test_resume import crawl
+
+
+class PackTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.work_dir: tempfile.TemporaryDirectory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.work_dir.cleanup()
+
+    def test_pack_export_matches_the_json_layout(self) -> None:
+        corpus_dir: str = os.path.join(self.work_dir.name, 'corpus')
+        json_dir: str = os.path.join(self.work_dir.name, 'json')
+        pack_dir: str = os.path.join(self.work_dir.name, 'pack')
+
+        benchmark.generate_corpus(corpus_dir, 60)
+
+        server: benchmark.FixtureServer = benchmark.FixtureServer(benchmark.load_corpus(corpus_dir))
+        server.start()
+
+        try:
+            crawl(server.url, json_dir, max_retry_count=3)
+            crawl(server.url, pack_dir, max_retry_count=3, output_format='pack')
+        finally:
+            server.stop()
+
+        layout: dict = lexicon_pack.load_layout(json_dir)
+        pack_path: str = os.path.join(pack_dir, lexicon_pack.PACK_NAME)
+
+        self.assertGreater(len(layout['paradigm']), 0)
+        self.assertEqual(lexicon_pack.load_pack(pack_path), layout)
+
+        converted_path: str = os.path.join(self.work_dir.name, 'converted.pack')
+        lexicon_pack.convert(json_dir, converted_path)
+
+        self.assertEqual(lexicon_pack.load_pack(converted_path), layout)
+
+        # Every repeated key and string is stored once.
+        results: dict = lexicon_pack.benchmark_loaders(json_dir, converted_path, rounds=1)
+
+        self.assertEqual(results['pack']['entries'], results['json']['entries'])
+        self.assertLess(results['pack']['size_mb'], results['json']['size_mb'])
+
+        # A packaged pack export is read by LexiconArchive from its lexicon.pack member.
+        archive_path: str = os.path.join(self.work_dir.name, 'data.zip')
+
+        with zipfile.ZipFile(archive_path, 'w') as archive:
+            archive.write(pack_path, lexicon_pack.PACK_NAME)
+
+        title_hash, title = next(iter(layout['hashing_key'].items()))
+
+        with lexicon_archive.LexiconArchive(archive_path) as archive:
+            self.assertEqual(archive.entry(title), layout['dictionary'].get(title_hash))
+            self.assertEqual(archive.paradigm(title), layout['paradigm'].get(title_hash))
+
+    def test_values_round_trip(self) -> None:
+        entry: dict = {
+            'word': 'rosa', 'definitions': ['rose', 'garland'], '': 'empty key', 'none': None, 'true': True, 'false': False,
+            'negative': -5, 'large': 2 ** 40, 'large_negative': -2 ** 40, 'float': 1.5, 'empty_list': [], 'empty_dictionary': {},
+            'nested': [[1, 'ā'], {'cells': [None, 'īs']}]
+        }
+        layout: dict = {'dictionary': {'0': entry}, 'paradigm': {}, 'hashing_key': {'0': 'rosa'}}
+        pack_path: str = os.path.join(self.work_dir.name, lexicon_pack.PACK_NAME)
+
+        lexicon_pack.write_pack(pack_path, layout)
+        loaded: dict = lexicon_pack.load_pack(pack_path)
+
+        self.assertEqual(loaded, layout)
+
+        # Booleans compare equal to 1 and 0, so their type is checked as well.
+        self.assertIs(loaded['dictionary']['0']['true'], True)
+        self.assertIs(loaded['dictionary']['0']['false'], False)
+
+        with self.assertRaises(ValueError):
+            lexicon_pack.write_pack(pack_path, {'dictionary': {'0': {'word': 'a\x00b'}}, 'paradigm': {}, 'hashing_key': {}})
+
+        with self.assertRaises(ValueError):
+            lexicon_pack.unpack(b'NOTAPACK' + bytes(24))
+
+
+if __name__ == "__main__":
+    unittest.main()
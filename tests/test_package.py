@@ -0,0 +1,172 @@
+import os
+import json
+import delta
+import shutil
+import hashlib
+import zipfile
+import tempfile
+import unittest
+
+import main
+import py7zr
+import lexicon_archive
+
+
+def write_output(output_dir: str, word_count: int) -> None:
+    for sub_dir in ['dictionary', 'paradigm']:
+        os.makedirs(os.path.join(output_dir, sub_dir))
+
+    hashing_key: dict = {}
+
+    for i in range(word_count):
+        title: str = f'verbum{i}'
+        title_hash: str = hashlib.md5(title.encode()).hexdigest()
+        hashing_key[title_hash] = title
+
+        with open(os.path.join(output_dir, 'dictionary', f'{title_hash}.json'), 'w', encoding='unicode-escape') as file:
+            json.dump({'word': title, 'definitions': [f'word {i}', 'speech']}, file)
+
+        with open(os.path.join(output_dir, 'paradigm', f'{title_hash}.json'), 'w', encoding='unicode-escape') as file:
+            json.dump({'forms': 1, '0': {'singular': {'nominative': [title]}}, 'word': title}, file)
+
+    with open(os.path.join(output_dir, 'hashing_key.json'), 'w', encoding='unicode-escape') as file:
+        json.dump(hashing_key, file)
+
+
+class PackageTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.work_dir: tempfile.TemporaryDirectory = tempfile.TemporaryDirectory()
+        self.output_dir: str = os.path.join(self.work_dir.name, 'data')
+
+        write_output(self.output_dir, 50)
+
+    def tearDown(self) -> None:
+        self.work_dir.cleanup()
+
+    def package(self, compression_type: str) -> None:
+        # The packages, checksums and previous manifest are written to the working directory.
+        cwd: str = os.getcwd()
+        os.chdir(self.work_dir.name)
+
+        try:
+            main.package_output(os.path.join('.', 'data'), compression_type)
+        finally:
+            os.chdir(cwd)
+
+    def test_checksums(self) -> None:
+        self.package('all')
+
+        with open(os.path.join(self.work_dir.name, 'checksum.json'), 'r') as file:
+            checksums: dict = json.load(file)
+
+        with open(os.path.join(self.work_dir.name, 'SHA256SUMS'), 'r') as file:
+            sha256_lines: list[str] = file.read().splitlines()
+
+        package_names: list[str] = ['data.zip', 'data.7z'] + (['data.tar.zst'] if main.zstandard is not None else [])
+
+        # checksum.json keeps its original schema of one MD5 per package.
+        self.assertEqual(sorted(checksums), sorted(package_names))
+
+        for package_name in package_names:
+            with open(os.path.join(self.work_dir.name, package_name), 'rb') as file:
+                data: bytes = file.read()
+
+            self.assertEqual(checksums[package_name], hashlib.md5(data).hexdigest())
+            self.assertIn(f'{hashlib.sha256(data).hexdigest()}  {package_name}', sha256_lines)
+
+    def test_delta_updates_the_previous_build(self) -> None:
+        consumer_dir: str = os.path.join(self.work_dir.name, 'consumer')
+        delta_path: str = os.path.join(self.work_dir.name, 'data.delta.zip')
+
+        self.package('zip')
+        self.assertFalse(os.path.exists(delta_path))
+
+        with zipfile.ZipFile(os.path.join(self.work_dir.name, 'data.zip'), 'r') as archive:
+            archive.extractall(consumer_dir)
+
+        stale_dir: str = os.path.join(self.work_dir.name, 'stale')
+        shutil.copytree(consumer_dir, stale_dir)
+
+        dictionary_dir: str = os.path.join(self.output_dir, 'dictionary')
+        paradigm_dir: str = os.path.join(self.output_dir, 'paradigm')
+        removed, changed = sorted(os.listdir(dictionary_dir))[:2]
+
+        os.remove(os.path.join(dictionary_dir, removed))
+
+        with open(os.path.join(paradigm_dir, changed), 'w', encoding='unicode-escape') as file:
+            json.dump({'forms': 0, 'word': 'mutatum'}, file)
+
+        with open(os.path.join(dictionary_dir, 'novum.json'), 'w', encoding='unicode-escape') as file:
+            json.dump({'word': 'novum', 'definitions': ['new']}, file)
+
+        self.package('zip')
+
+        with open(os.path.join(self.work_dir.name, 'checksum.json'), 'r') as file:
+            self.assertIn('data.delta.zip', json.load(file))
+
+        delta_info: dict = delta.apply_delta(delta_path, consumer_dir)
+
+        self.assertEqual(delta_info['added'], {'dictionary/novum.json': delta.file_digest(os.path.join(dictionary_dir, 'novum.json'))})
+        self.assertEqual(list(delta_info['changed']), [f'paradigm/{changed}'])
+        self.assertEqual(delta_info['removed'], [f'dictionary/{removed}'])
+
+        # The consumer now holds exactly the new build, and its manifest says so.
+        self.assertEqual(delta.build_manifest(consumer_dir), delta.build_manifest(self.output_dir))
+        self.assertEqual(delta.load_manifest(os.path.join(consumer_dir, delta.MANIFEST_NAME))['version'], delta_info['target'])
+
+        # Applying it again is a no-op, and a directory of another version is refused.
+        self.assertEqual(delta.apply_delta(delta_path, consumer_dir), delta_info)
+
+        with open(os.path.join(stale_dir, 'hashing_key.json'), 'w') as file:
+            file.write('{}')
+
+        with self.assertRaises(ValueError):
+            delta.apply_delta(delta_path, stale_dir)
+
+    def test_7z_blocks(self) -> None:
+        # write_7z starts solid blocks through py7zr internals, so the layout is checked against the pinned version.
+        archive_path: str = os.path.join(self.work_dir.name, 'data.7z')
+        main.write_7z(self.output_dir, archive_path, block_files=8)
+
+        with py7zr.SevenZipFile(archive_path, 'r') as archive:
+            self.assertIsNone(archive.testzip())
+
+            archive.reset()
+            members: dict = {name: file.read() for name, file in archive.readall().items()}
+
+            blocks: dict = {}
+
+            for archive_file in archive.files:
+                if not archive_file.is_directory:
+                    blocks.setdefault(id(archive_file.folder), []).append(archive_file.filename)
+
+        names: list[str] = []
+
+        for dirpath, _, filenames in os.walk(self.output_dir):
+            for name in filenames:
+                with open(os.path.join(dirpath, name), 'rb') as file:
+                    self.assertEqual(members[os.path.relpath(os.path.join(dirpath, name), self.output_dir)], file.read())
+
+                names.append(name)
+
+        block_names: list[list[str]] = list(blocks.values())
+
+        self.assertEqual(len(members), len(names))
+        self.assertEqual([len(block) for block in block_names], [8] * (len(names) // 8) + [len(names) % 8])
+        self.assertEqual(block_names[0][0], 'hashing_key.json')
+
+        # The dictionary entry and paradigm of a title share a block.
+        for block in block_names:
+            for name in block:
+                if name.startswith('dictionary/') and name != block[-1]:
+                    self.assertEqual(block[block.index(name) + 1], name.replace('dictionary/', 'paradigm/'))
+
+        with lexicon_archive.LexiconArchive(archive_path) as archive:
+            self.assertEqual(archive.lookup('Verbum7'), [{'dictionary': {'word': 'verbum7', 'definitions': ['word 7', 'speech']}, 'paradigm': {'forms': 1, '0': {'singular': {'nominative': ['verbum7']}}, 'word': 'verbum7'}}])
+
+            # A miss decompresses the blocks of the word only.
+            self.assertLessEqual(len(archive._cache), 2 * 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
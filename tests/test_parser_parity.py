@@ -0,0 +1,40 @@
+import os
+import unittest
+
+import main
+import parser_parity
+
+
+PAGES_DIR: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pages')
+BACKENDS: list[str] = [backend for backend in main.PARSER_BACKENDS if backend != 'lxml' or main.lxml is not None]
+
+
+class ParserParityTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.pages: list[tuple[str, str, str]] = parser_parity.load_pages(PAGES_DIR)
+
+    def tearDown(self) -> None:
+        main.set_parser_backend('html.parser')
+
+    def test_loads_benchmark_corpus(self) -> None:
+        kinds: set[str] = {kind for _, kind, _ in self.pages}
+
+        self.assertEqual(len(self.pages), 30)
+        self.assertEqual(kinds, set(parser_parity.PAGE_PARSERS))
+
+    def test_backends_agree(self) -> None:
+        mismatches, _ = parser_parity.check_parity(self.pages, BACKENDS)
+
+        self.assertEqual(mismatches, [])
+
+    def test_xml_declaration_is_parsed(self) -> None:
+        html: str = next(html for name, _, html in self.pages if name == 'definition.php?p1=9001&p2=rosa')
+
+        for backend in BACKENDS:
+            main.set_parser_backend(backend)
+
+            self.assertEqual(main.parse_word_info(html), {'orthography_id': 9001, 'title(s)': ['rosa', 'rosae', 'ros'], 'definitions': ['rose', 'garland of roses', 'rose bush']}, backend)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import tempfile
+import threading
+import unittest
+import http.server
+
+import main
+import benchmark
+from test_resume import crawl, load_output
+
+
+class CharsetHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Serve UTF-8 pages under whatever Content-Type the test declares.
+    """
+
+    protocol_version: str = 'HTTP/1.1'
+    pages: dict = {}
+    content_type: str = 'text/html'
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        body: bytes | None = self.pages.get(main.canonical_link(self.path))
+
+        if body is None:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', self.content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class ReparseTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.work_dir: tempfile.TemporaryDirectory = tempfile.TemporaryDirectory()
+
+        corpus_dir: str = os.path.join(self.work_dir.name, 'corpus')
+        benchmark.generate_corpus(corpus_dir, 20)
+
+        CharsetHandler.pages = {link: html.encode('utf-8') for link, html in benchmark.load_corpus(corpus_dir).items()}
+
+        self.server: http.server.ThreadingHTTPServer = http.server.ThreadingHTTPServer(('127.0.0.1', 0), CharsetHandler)
+        self.url: str = f'http://127.0.0.1:{self.server.server_address[1]}/'
+
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        self.work_dir.cleanup()
+
+    def check_reparse(self, content_type: str) -> None:
+        CharsetHandler.content_type = content_type
+
+        crawl_dir: str = os.path.join(self.work_dir.name, 'crawl')
+        reparse_dir: str = os.path.join(self.work_dir.name, 'reparse')
+        archive_path: str = os.path.join(self.work_dir.name, 'pages.warc.gz')
+
+        crawl(self.url, crawl_dir, max_retry_count=3, record_archive=archive_path)
+        crawl(self.url, reparse_dir, max_retry_count=3, reparse_archive=archive_path)
+
+        self.assertEqual(load_output(reparse_dir), load_output(crawl_dir))
+
+    def test_reparse_decodes_like_the_crawl(self) -> None:
+        # requests decodes text/html without a charset as ISO-8859-1.
+        self.check_reparse('text/html')
+
+    def test_reparse_uses_the_recorded_charset(self) -> None:
+        self.check_reparse('text/html; charset=windows-1252')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import asyncio
+import tempfile
+import threading
+import unittest
+import http.server
+
+import main
+
+
+class NotModifiedHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Answer every request with 304 Not Modified, even unconditional ones.
+    """
+
+    protocol_version: str = 'HTTP/1.1'
+    requests_seen: list = []
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        self.requests_seen.append(self.headers.get('If-None-Match'))
+        self.send_response(304)
+        self.send_header('ETag', '"stale"')
+        self.end_headers()
+
+
+class RevalidatingHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Answer with a page and its ETag, then with 304 Not Modified to requests that send the ETag back.
+    """
+
+    protocol_version: str = 'HTTP/1.1'
+    requests_seen: list = []
+    body: bytes = '<html><body><div class="flash_card_title">ROSA, ROSĀ</div></body></html>'.encode('utf-8')
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        self.requests_seen.append(self.headers.get('If-None-Match'))
+
+        if self.headers.get('If-None-Match') == '"v1"':
+            self.send_response(304)
+            self.send_header('ETag', '"v1"')
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=windows-1252')
+        self.send_header('ETag', '"v1"')
+        self.send_header('Content-Length', str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        NotModifiedHandler.requests_seen = []
+
+        self.cache_dir: tempfile.TemporaryDirectory = tempfile.TemporaryDirectory()
+        self.cache: main.ResponseCache = main.ResponseCache(self.cache_dir.name, 1048576)
+        self.server: http.server.ThreadingHTTPServer = http.server.ThreadingHTTPServer(('127.0.0.1', 0), NotModifiedHandler)
+        self.url: str = f'http://127.0.0.1:{self.server.server_address[1]}/definition.php?p1=1'
+
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        # Validators whose body is no longer in the cache.
+        self.cache._connection.execute('INSERT INTO responses (url, digest, size, content_type, etag, last_modified, accessed) VALUES (?, ?, ?, ?, ?, ?, ?)', (self.url, '0' * 64, 1, 'text/html', '"stale"', None, 0.0))
+        main.set_response_cache(self.cache)
+
+    def tearDown(self) -> None:
+        main.set_response_cache(None)
+        self.server.shutdown()
+        self.server.server_close()
+        self.cache.close()
+        self.cache_dir.cleanup()
+
+    def test_endless_not_modified_gives_up(self) -> None:
+        self.assertIsNone(main.attempt_connection(self.url, main.requests.Session(), 1))
+        self.assertEqual(NotModifiedHandler.requests_seen, [None, None])
+        self.assertEqual(self.cache.conditional_headers(self.url), {})
+
+    @unittest.skipIf(main.aiohttp is None, 'aiohttp is not installed')
+    def test_endless_not_modified_gives_up_async(self) -> None:
+        async def fetch() -> str | None:
+            async with main.aiohttp.ClientSession() as session:
+                return await main.attempt_connection_async(self.url, session, 1)
+
+        self.assertIsNone(asyncio.run(fetch()))
+        self.assertEqual(NotModifiedHandler.requests_seen, [None, None])
+
+
+class RevalidationTest(unittest.TestCase):
+    def setUp(self) -> None:
+        RevalidatingHandler.requests_seen = []
+
+        self.cache_dir: tempfile.TemporaryDirectory = tempfile.TemporaryDirectory()
+        self.cache: main.ResponseCache = main.ResponseCache(self.cache_dir.name, 1048576)
+        self.server: http.server.ThreadingHTTPServer = http.server.ThreadingHTTPServer(('127.0.0.1', 0), RevalidatingHandler)
+        self.url: str = f'http://127.0.0.1:{self.server.server_address[1]}/definition.php?p1=1'
+
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        main.set_response_cache(self.cache)
+
+    def tearDown(self) -> None:
+        main.set_response_cache(None)
+        self.server.shutdown()
+        self.server.server_close()
+        self.cache.close()
+        self.cache_dir.cleanup()
+
+    def test_not_modified_reuses_the_cached_body(self) -> None:
+        session: main.requests.Session = main.requests.Session()
+
+        first: str = main.attempt_connection(self.url, session, 1).text
+        second: str = main.attempt_connection(self.url, session, 1).text
+
+        self.assertEqual(RevalidatingHandler.requests_seen, [None, '"v1"'])
+        self.assertEqual(second, first)
+        self.assertEqual(first, RevalidatingHandler.body.decode('windows-1252', errors='replace'))
+
+    @unittest.skipIf(main.aiohttp is None, 'aiohttp is not installed')
+    def test_not_modified_reuses_the_cached_body_async(self) -> None:
+        async def fetch() -> list[str | None]:
+            async with main.aiohttp.ClientSession() as session:
+                return [await main.attempt_connection_async(self.url, session, 1) for _ in range(2)]
+
+        first, second = asyncio.run(fetch())
+
+        self.assertEqual(RevalidatingHandler.requests_seen, [None, '"v1"'])
+        self.assertEqual(second, first)
+        self.assertEqual(first, RevalidatingHandler.body.decode('windows-1252', errors='replace'))
+
+
+if __name__ == "__main__":
+    unittest.main()
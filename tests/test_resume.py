@@ -0,0 +1,77 @@
+import io
+import os
+import json
+import tempfile
+import unittest
+import contextlib
+
+import main
+import benchmark
+
+
+def crawl(url: str, output_dir: str, **options) -> None:
+    os.makedirs(output_dir, exist_ok=True)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        main.main(url, {'ALL': [1, 2, 4]}, 'ALL', output_dir, 4, False, 'zip', False, False, False, initial_rate=1000.0, **options)
+
+
+def load_output(output_dir: str) -> dict:
+    entries: dict = {}
+
+    for sub_dir in ['dictionary', 'paradigm']:
+        for file_name in os.listdir(os.path.join(output_dir, sub_dir)):
+            with open(os.path.join(output_dir, sub_dir, file_name), 'r', encoding='unicode-escape') as file:
+                entry: dict = json.load(file)
+
+            # Titles shared between words merge in completion order.
+            if sub_dir == 'dictionary':
+                entry['definitions'] = sorted(entry['definitions'])
+
+            entries[f'{sub_dir}/{file_name}'] = entry
+
+    return entries
+
+
+class ResumeTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.work_dir: tempfile.TemporaryDirectory = tempfile.TemporaryDirectory()
+
+        corpus_dir: str = os.path.join(self.work_dir.name, 'corpus')
+        benchmark.generate_corpus(corpus_dir, 150)
+
+        self.server: benchmark.FixtureServer = benchmark.FixtureServer(benchmark.load_corpus(corpus_dir))
+        self.server.start()
+
+    def tearDown(self) -> None:
+        self.server.stop()
+        self.work_dir.cleanup()
+
+    def check_resume(self, engine: str) -> None:
+        expected_dir: str = os.path.join(self.work_dir.name, 'expected')
+        output_dir: str = os.path.join(self.work_dir.name, 'data')
+
+        crawl(self.server.url, expected_dir, max_retry_count=3, engine=engine)
+
+        self.server.error_rate = 0.3
+        crawl(self.server.url, output_dir, max_retry_count=0, engine=engine)
+
+        self.assertNotEqual(main.load_state(f'{output_dir}.db', 'links_complete'), '1')
+        self.assertLess(len(main.load_pages(f'{output_dir}.db')), 26 * 3)
+
+        self.server.error_rate = 0.0
+        crawl(self.server.url, output_dir, max_retry_count=3, engine=engine, resume=True)
+
+        self.assertEqual(main.load_state(f'{output_dir}.db', 'links_complete'), '1')
+        self.assertEqual(load_output(output_dir), load_output(expected_dir))
+
+    def test_resume_fetches_failed_browse_pages(self) -> None:
+        self.check_resume('thread')
+
+    @unittest.skipIf(main.aiohttp is None, 'aiohttp is not installed')
+    def test_resume_fetches_failed_browse_pages_async(self) -> None:
+        self.check_resume('async')
+
+
+if __name__ == "__main__":
+    unittest.main()
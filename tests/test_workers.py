@@ -0,0 +1,89 @@
+import os
+import tempfile
+import threading
+import unittest
+import unittest.mock
+
+import main
+import benchmark
+from test_resume import crawl, load_output
+
+
+class FailingParser:
+    """
+    Parse word pages, raising on one of them to stand in for a worker that dies mid-crawl.
+    """
+
+    def __init__(self, fail_at: int) -> None:
+        self.fail_at: int = fail_at
+        self.parse = main.parse_word_info
+        self.calls: int = 0
+        self.lock: threading.Lock = threading.Lock()
+
+    def __call__(self, html: str) -> dict:
+        with self.lock:
+            self.calls += 1
+            calls: int = self.calls
+
+        if calls == self.fail_at:
+            raise RuntimeError('parser crashed')
+
+        return self.parse(html)
+
+
+class WorkerFailureTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.work_dir: tempfile.TemporaryDirectory = tempfile.TemporaryDirectory()
+
+        corpus_dir: str = os.path.join(self.work_dir.name, 'corpus')
+        benchmark.generate_corpus(corpus_dir, 150)
+
+        self.server: benchmark.FixtureServer = benchmark.FixtureServer(benchmark.load_corpus(corpus_dir))
+        self.server.start()
+
+    def tearDown(self) -> None:
+        self.server.stop()
+        self.work_dir.cleanup()
+
+    def crawl_in_thread(self, output_dir: str, **options) -> Exception | None:
+        errors: list = []
+
+        def run() -> None:
+            try:
+                crawl(self.server.url, output_dir, max_retry_count=3, **options)
+            except Exception as error:
+                errors.append(error)
+
+        thread: threading.Thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        thread.join(timeout=60)
+
+        self.assertFalse(thread.is_alive(), 'the crawl hung after a worker failed')
+
+        return errors[0] if errors != [] else None
+
+    def check_failure(self, engine: str) -> None:
+        expected_dir: str = os.path.join(self.work_dir.name, 'expected')
+        output_dir: str = os.path.join(self.work_dir.name, 'data')
+
+        crawl(self.server.url, expected_dir, max_retry_count=3, engine=engine)
+
+        with unittest.mock.patch.object(main, 'parse_word_info', FailingParser(20)):
+            error: Exception | None = self.crawl_in_thread(output_dir, engine=engine)
+
+        self.assertIsInstance(error, RuntimeError)
+        self.assertGreater(len(main.load_journal(f'{output_dir}.db')), 0)
+
+        self.assertIsNone(self.crawl_in_thread(output_dir, engine=engine, resume=True))
+        self.assertEqual(load_output(output_dir), load_output(expected_dir))
+
+    def test_worker_exception_is_raised(self) -> None:
+        self.check_failure('thread')
+
+    @unittest.skipIf(main.aiohttp is None, 'aiohttp is not installed')
+    def test_worker_exception_is_raised_async(self) -> None:
+        self.check_failure('async')
+
+
+if __name__ == "__main__":
+    unittest.main()